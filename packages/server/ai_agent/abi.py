@@ -0,0 +1,85 @@
+import functools
+import threading
+from typing import Any, Dict, List, Sequence
+
+# ABIs registered by name; their encoders are built on first use
+_abis: Dict[str, List[dict]] = {}
+_encoders: Dict[str, "ContractEncoder"] = {}
+_lock = threading.Lock()
+
+
+class ContractEncoder:
+    """
+    Calldata encoder for the functions of one ABI.
+
+    The selector and input types of every function are computed once, so
+    encoding a call is a single `codec.encode`. The output is the same as
+    `Web3().eth.contract(abi=abi).encode_abi(name, args=args)`.
+    """
+
+    def __init__(self, abi: List[dict]):
+        from web3 import Web3
+        from eth_utils import function_abi_to_4byte_selector, get_abi_input_types
+
+        self.codec = Web3().codec
+        self.functions = {}
+        for item in abi:
+            if item.get("type") == "function":
+                self.functions[item["name"]] = (function_abi_to_4byte_selector(item), get_abi_input_types(item))
+
+    def encode(self, function_name: str, args: Sequence[Any]) -> str:
+        """
+        Encode a call to `function_name`.
+
+        Args:
+            function_name (str): Name of the function in the ABI.
+            args (Sequence[Any]): The positional arguments.
+
+        Returns:
+            str: The calldata as a 0x-prefixed hex string.
+
+        Raises:
+            ValueError: If the ABI has no function with that name.
+        """
+        try:
+            selector, types = self.functions[function_name]
+        except KeyError:
+            raise ValueError(f"Function {function_name} not found in the ABI.")
+        return "0x" + (selector + self.codec.encode(types, list(args))).hex()
+
+
+def register_abi(name: str, abi: List[dict]) -> None:
+    """
+    Register an ABI under a name so `get_encoder` can build its encoder.
+    """
+    with _lock:
+        _abis[name] = abi
+        _encoders.pop(name, None)
+
+
+def get_encoder(name: str) -> ContractEncoder:
+    """
+    Return the encoder of a registered ABI, building it on first use.
+
+    Raises:
+        ValueError: If no ABI is registered under `name`.
+    """
+    encoder = _encoders.get(name)
+    if encoder is None:
+        with _lock:
+            if name not in _abis:
+                raise ValueError(f"No ABI registered as {name}.")
+            encoder = _encoders.get(name)
+            if encoder is None:
+                encoder = _encoders[name] = ContractEncoder(_abis[name])
+    return encoder
+
+
+@functools.lru_cache(maxsize=4096)
+def namehash(name: str) -> bytes:
+    """
+    Return the ENS namehash of a name, memoized (normalizing a name is the
+    most expensive step of encoding registration calldata).
+    """
+    from ens import ENS
+    return ENS.namehash(name)
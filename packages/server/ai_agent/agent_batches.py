@@ -0,0 +1,129 @@
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+from ai_agent.db import agent_collection, get_collection
+
+# Batch agent creations and their per-agent checkpoints
+agent_batch_collection = get_collection("agent_batches")
+agent_batch_item_collection = get_collection("agent_batch_items")
+
+# Number of items written per insert_many call
+INSERT_CHUNK_SIZE = 1000
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def create_agent_batch(agents: List[dict]) -> str:
+    """
+    Store a batch of agents to create and one pending checkpoint per agent.
+
+    Args:
+        agents (List[dict]): Dicts with `name`, `instructions` and optional
+            `active`, `interval` and `tools`.
+
+    Returns:
+        str: The ID of the batch.
+
+    Raises:
+        ValueError: If there are no agents.
+    """
+    if not agents:
+        raise ValueError("No agents given.")
+
+    await agent_batch_item_collection.create_index([("batch_id", 1), ("index", 1)], unique=True)
+
+    result = await agent_batch_collection.insert_one({"total": len(agents), "created_at": _now()})
+    batch_id = result.inserted_id
+
+    for start in range(0, len(agents), INSERT_CHUNK_SIZE):
+        await agent_batch_item_collection.insert_many([
+            {
+                "batch_id": batch_id,
+                "index": start + offset,
+                "name": agent["name"],
+                "instructions": agent["instructions"],
+                "active": bool(agent.get("active")),
+                "interval": agent.get("interval"),
+                "tools": agent.get("tools"),
+                "status": "pending",
+            }
+            for offset, agent in enumerate(agents[start:start + INSERT_CHUNK_SIZE])
+        ], ordered=False)
+    return str(batch_id)
+
+
+async def get_agent_batch(batch_id: str) -> Optional[dict]:
+    """
+    Retrieve an agent batch by ID.
+
+    Raises:
+        ValueError: If the batch ID is invalid.
+    """
+    try:
+        batch_id = ObjectId(batch_id)
+    except InvalidId:
+        raise ValueError("Invalid batch ID format.")
+
+    return await agent_batch_collection.find_one({"_id": batch_id})
+
+
+async def reconcile_agent_batch(batch_id) -> None:
+    """
+    Mark as created the items whose agent was saved before the batch was
+    interrupted, so resuming never creates the same agent twice.
+    """
+    updates = []
+    async for agent_data in agent_collection.find({"batch_id": ObjectId(batch_id)}, {"batch_index": 1}):
+        updates.append(UpdateOne(
+            {"batch_id": ObjectId(batch_id), "index": agent_data["batch_index"], "status": {"$ne": "created"}},
+            {"$set": {"status": "created", "agent_id": str(agent_data["_id"]), "updated_at": _now()}},
+        ))
+        if len(updates) >= INSERT_CHUNK_SIZE:
+            await agent_batch_item_collection.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await agent_batch_item_collection.bulk_write(updates, ordered=False)
+
+
+def unfinished_agent_batch_items(batch_id) -> AsyncIterator[dict]:
+    """
+    Iterate over the agents of a batch that are not created yet, in order.
+    """
+    return agent_batch_item_collection.find(
+        {"batch_id": ObjectId(batch_id), "status": {"$ne": "created"}}
+    ).sort("index", 1)
+
+
+async def update_agent_batch_items(updates: List[tuple]) -> None:
+    """
+    Record the checkpoint state of several items at once.
+
+    Args:
+        updates (List[tuple]): (item ID, status, fields) tuples.
+    """
+    if not updates:
+        return
+    await agent_batch_item_collection.bulk_write([
+        UpdateOne({"_id": item_id}, {"$set": {**fields, "status": status, "updated_at": _now()}})
+        for item_id, status, fields in updates
+    ], ordered=False)
+
+
+async def count_agent_batch_items(batch_id) -> dict:
+    """
+    Count the agents of a batch by status.
+    """
+    counts = {}
+    pipeline = [
+        {"$match": {"batch_id": ObjectId(batch_id)}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+    async for row in agent_batch_item_collection.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return counts
@@ -1,37 +1,177 @@
 import json
+import copy
+import hashlib
 from swarm import Agent
-from cdp import *
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple, TYPE_CHECKING
 import os
-from openai import OpenAI # type: ignore
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from typing import Union
-from web3 import Web3
-from web3.exceptions import ContractLogicError
-from cdp.errors import ApiError, UnsupportedAssetError
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
+import inspect
+import functools
+import logging
+import threading
 from bson import ObjectId
 from bson.errors import InvalidId
 import time
+from datetime import datetime, timedelta, timezone
 
 from dotenv import load_dotenv
+from ai_agent.abi import get_encoder, namehash, register_abi
+from ai_agent.cache import TTLCache
+from ai_agent.executor import run_blocking
+from ai_agent.runner import read_only
+from ai_agent.db import agent_collection
+from ai_agent.ens_scheduler import record_reveal_tx, schedule_reveal
+from ai_agent.jobs import FINISHED_STATES, get_job, record_tx_hash, submit_job
+from ai_agent.telemetry import instrument_tool
+from ai_agent.tool_loop import sync_tools
+from ai_agent.agent_batches import create_agent_batch, get_agent_batch, reconcile_agent_batch, unfinished_agent_batch_items, update_agent_batch_items, count_agent_batch_items
+from ai_agent.wallet_pool import claim_wallet, release_wallet, remove_claimed_wallets
+from ai_agent.mint_runs import create_mint_run, get_mint_run, set_mint_run_job, unfinished_mint_items, interrupted_mint_items, claimed_tx_hashes, update_mint_item, mint_item_events, count_mint_items
+
+# The CDP SDK, web3 and OpenAI are imported where they are first used,
+# so importing this module (server workers, the CLI, tests) stays fast
+if TYPE_CHECKING:
+    from cdp import Wallet
 
 # Load environment variables from .env file
 load_dotenv()
 
-# MongoDB connection setup
-MONGODB_URL = os.getenv("MONGODB_URL")
-# Get configuration from environment variables
-API_KEY_NAME = os.environ.get("CDP_API_KEY_NAME")
-PRIVATE_KEY = os.environ.get("CDP_PRIVATE_KEY").replace('\\n', '\n')
+logger = logging.getLogger(__name__)
 
-# MongoDB connection setup
-client = AsyncIOMotorClient(MONGODB_URL)
-db = client.get_database("ai")
-agent_collection = db.get_collection("agents")
-# Configure CDP with environment variables
-Cdp.configure(API_KEY_NAME, PRIVATE_KEY)
+_cdp_configured = False
+_cdp_lock = threading.Lock()
+
+
+def configure_cdp() -> None:
+    """
+    Configure the CDP SDK from the environment on first use.
+
+    Raises:
+        ValueError: If CDP_PRIVATE_KEY is not set.
+    """
+    global _cdp_configured
+    with _cdp_lock:
+        if _cdp_configured:
+            return
+
+        # Get configuration from environment variables
+        api_key_name = os.environ.get("CDP_API_KEY_NAME")
+        private_key = os.environ.get("CDP_PRIVATE_KEY")
+        if not private_key:
+            raise ValueError("CDP_PRIVATE_KEY is not set.")
+
+        from cdp import Cdp
+        Cdp.configure(api_key_name, private_key.replace('\\n', '\n'))
+        _cdp_configured = True
+
+
+async def warm_up_cdp() -> None:
+    """
+    Import and configure the CDP SDK in the background, so the first tool
+    call does not pay for it.
+    """
+    try:
+        await run_blocking(configure_cdp)
+    except Exception as e:
+        print(f"CDP is not configured: {str(e)}")
+
+
+def _create_wallet() -> "Wallet":
+    configure_cdp()
+    from cdp import Wallet
+    return Wallet.create()
+
+
+def _import_wallet(wallet_data: dict) -> "Wallet":
+    configure_cdp()
+    from cdp import Wallet, WalletData
+    return Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
+
+
+@functools.lru_cache(maxsize=None)
+def _seed_encryption_key(private_key: str) -> bytes:
+    # The key `Wallet.save_seed(encrypt=True)` uses, derived from the CDP API key
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    key = serialization.load_pem_private_key(private_key.encode(), password=None)
+    return hashlib.sha256(key.exchange(ec.ECDH(), key.public_key())).digest()
+
+
+def _encrypt_wallet_data(wallet_data: dict) -> dict:
+    """
+    Encrypt the seed of exported wallet data before it is stored, the way
+    `Wallet.save_seed(file_path, encrypt=True)` does: AES-GCM with a key
+    derived from the CDP API key, so a database dump alone cannot sign.
+    """
+    configure_cdp()
+    from cdp import Cdp
+    from Crypto.Cipher import AES
+
+    cipher = AES.new(_seed_encryption_key(Cdp.private_key), AES.MODE_GCM)
+    seed, auth_tag = cipher.encrypt_and_digest(bytes.fromhex(wallet_data["seed"]))
+    return {**wallet_data, "seed": seed.hex(), "encrypted": True, "auth_tag": auth_tag.hex(),
+            "iv": cipher.nonce.hex()}
+
+
+def _decrypt_wallet_data(wallet_data: dict) -> dict:
+    """
+    Return stored wallet data with its seed decrypted, ready to import.
+    Wallet data stored before seeds were encrypted is returned as is.
+
+    Raises:
+        ValueError: If the seed cannot be decrypted (e.g. it was encrypted
+            with another CDP API key).
+    """
+    if not wallet_data.get("encrypted"):
+        return wallet_data
+
+    configure_cdp()
+    from cdp import Cdp
+    from Crypto.Cipher import AES
+
+    cipher = AES.new(_seed_encryption_key(Cdp.private_key), AES.MODE_GCM, nonce=bytes.fromhex(wallet_data["iv"]))
+    try:
+        seed = cipher.decrypt_and_verify(bytes.fromhex(wallet_data["seed"]), bytes.fromhex(wallet_data["auth_tag"]))
+    except (ValueError, KeyError) as e:
+        raise ValueError(f"Unable to decrypt the seed of wallet {wallet_data.get('wallet_id')}.") from e
+    return {"wallet_id": wallet_data.get("wallet_id"), "seed": seed.hex()}
+
+# Agent documents keyed by agent_id, read through by get_agent
+agent_cache = TTLCache(
+    max_size=int(os.getenv("AGENT_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("AGENT_CACHE_TTL", "300")),
+)
+# Seconds unknown and invalid agent IDs are remembered, so bad clients do not reach MongoDB
+AGENT_CACHE_NEGATIVE_TTL = float(os.getenv("AGENT_CACHE_NEGATIVE_TTL", "30"))
+_AGENT_NOT_FOUND = object()
+_INVALID_AGENT_ID = object()
+
+# Imported wallets keyed by agent_id, shared by every tool call
+wallet_cache = TTLCache(
+    max_size=int(os.getenv("WALLET_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("WALLET_CACHE_TTL", "900")),
+)
+
+# Base produces a block about every 2 seconds
+BASE_BLOCK_TIME = 2
+# Balances stay cached for BALANCE_CACHE_BLOCKS blocks if set, else BALANCE_CACHE_TTL seconds.
+# The block window is approximated with wall-clock time (BALANCE_CACHE_BLOCKS * BASE_BLOCK_TIME
+# seconds): CDP exposes no chain head, so block numbers are never read.
+BALANCE_CACHE_BLOCKS = int(os.getenv("BALANCE_CACHE_BLOCKS", "0"))
+BALANCE_CACHE_TTL = (BALANCE_CACHE_BLOCKS * BASE_BLOCK_TIME if BALANCE_CACHE_BLOCKS
+                     else float(os.getenv("BALANCE_CACHE_TTL", "10")))
+# Assets returned by the /balances endpoint even when the wallet holds none
+TRACKED_ASSETS = [asset.strip().lower() for asset in os.getenv("TRACKED_ASSETS", "eth,usdc").split(",") if asset.strip()]
+
+# Balances keyed by (address, asset_id), dropped whenever the address sends a transaction
+balance_cache = TTLCache(
+    max_size=int(os.getenv("BALANCE_CACHE_SIZE", "4096")),
+    ttl=BALANCE_CACHE_TTL,
+)
+# Invalidation count per address: a read that spans an invalidation is not cached
+_balance_versions: Dict[str, int] = {}
 
 # Create a new wallet on the Base Sepolia testnet
 # You could make this a function for the agent to create a wallet on any network
@@ -67,45 +207,234 @@ Cdp.configure(API_KEY_NAME, PRIVATE_KEY)
 # print(f"Agent wallet address: {agent_wallet.default_address.address_id}")
 
 # Function to create and save an agent
-async def create_agent(name: str, instructions: str) -> dict:
+async def create_agent(name: str, instructions: str, active: bool = False, interval: float = None,
+                       tools: List[str] = None) -> dict:
     """
     Create a new agent and save it in MongoDB.
 
     Args:
         name (str): The name of the agent.
         instructions (str): Instructions for the agent.
+        active (bool): Whether the agent runtime runs the agent autonomously.
+        interval (float, optional): Seconds between its autonomous turns.
+        tools (List[str], optional): Names of the tools the agent can call,
+            defaults to `AGENT_DEFAULT_TOOLS`.
 
     Returns:
         dict: The agent data saved in MongoDB.
+
+    Raises:
+        ValueError: If a tool name is unknown.
     """
-    agent_wallet = Wallet.create()
-    
-    wallet_data = agent_wallet.export_data()
-    wallet_dict = wallet_data.to_dict()
-    # print(wallet_dict)
+    validate_tool_names(tools)
+    # Take a wallet created ahead of time, so creation is a single write
+    agent_id = ObjectId()
+    address, wallet_data = await _new_agent_wallet(agent_id)
 
     # Request funds from the faucet (only works on testnet)
     # faucet = agent_wallet.faucet()
     # print(f"Faucet transaction: {faucet}")
     # print(f"Agent wallet address: {agent_wallet.default_address.address_id}")
-    agent_data = {
+    agent_data = _agent_document(name, instructions, address, wallet_data, active, interval, tools)
+    agent_data["_id"] = agent_id
+    # Save to MongoDB
+    try:
+        await agent_collection.insert_one(agent_data)
+    except Exception:
+        await release_wallet(agent_id, address, wallet_data)
+        raise
+    await remove_claimed_wallets([agent_id])
+    invalidate_agent(agent_id)
+    agent_data["_id"] = str(agent_id)  # Convert ObjectId to string
+    return agent_data
+
+
+async def create_pooled_wallet() -> dict:
+    """
+    Create a wallet for the wallet pool.
+
+    Returns:
+        dict: The wallet `address` and its exported `wallet_data`, with the
+            seed encrypted.
+    """
+    agent_wallet = await run_blocking(_create_wallet)
+    return {
+        "address": agent_wallet.default_address.address_id,
+        "wallet_data": _encrypt_wallet_data(agent_wallet.export_data().to_dict()),
+    }
+
+
+async def _new_agent_wallet(agent_id: ObjectId) -> Tuple[str, dict]:
+    """
+    Claim a pooled wallet for an agent, creating one on demand if the pool is empty.
+
+    Returns:
+        tuple: The address of the wallet and its exported wallet data
+        (`wallet_id` and encrypted `seed`), needed to import it again later.
+    """
+    pooled = await claim_wallet(agent_id)
+    if pooled is not None:
+        return pooled["address"], pooled["wallet_data"]
+
+    pooled = await create_pooled_wallet()
+    return pooled["address"], pooled["wallet_data"]
+
+
+def _agent_document(name: str, instructions: str, address: str, wallet_data: dict, active: bool = False,
+                    interval: float = None, tools: List[str] = None) -> dict:
+    return {
         "name": name,
         "instructions": instructions,
-        "wallet": agent_wallet.default_address.address_id
+        # The address is kept apart from the wallet data, so lookups and
+        # prompts never need to touch the seed
+        "address": address,
+        "wallet": wallet_data,
+        "active": active,
+        "interval": interval,
+        "tools": tools,
+        "created_at": datetime.now(timezone.utc),
     }
-    # Save to MongoDB
-    result = await agent_collection.insert_one(agent_data)
-    agent_data["_id"] = str(result.inserted_id)  # Convert ObjectId to string
-    return agent_data
 
 
+# Maximum number of wallets created at the same time by create_agents_bulk
+AGENT_BATCH_CONCURRENCY = int(os.getenv("AGENT_BATCH_CONCURRENCY", "16"))
+# Number of created agents saved per insert_many call
+AGENT_BATCH_CHUNK_SIZE = int(os.getenv("AGENT_BATCH_CHUNK_SIZE", "500"))
+# Maximum seconds a created agent waits for its chunk to be saved
+AGENT_BATCH_FLUSH_INTERVAL = float(os.getenv("AGENT_BATCH_FLUSH_INTERVAL", "1"))
 
-async def get_agent(agent_id: str) -> dict:
+
+async def create_agents_bulk(agents: List[dict] = None, batch_id: str = None,
+                             concurrency: int = None) -> AsyncIterator[dict]:
+    """
+    Create many agents, yielding progress events.
+
+    Wallets are claimed from the wallet pool or created by a bounded pool
+    of `concurrency` workers, and the
+    agents are saved with `insert_many` in chunks. Every agent is
+    checkpointed in MongoDB, so a batch with failed wallet creations (or
+    one interrupted by a crash) can be resumed by passing its `batch_id`:
+    created agents are kept and the others are retried.
+
+    Args:
+        agents (List[dict]): Dicts with `name`, `instructions` and optional
+            `active`, `interval` and `tools` (new batches only).
+        batch_id (str, optional): The ID of a batch to resume.
+        concurrency (int, optional): Maximum number of wallets created at once.
+
+    Yields:
+        dict: Progress events (`started`, `created`, `failed`, `finished`).
+    """
+    if batch_id is None:
+        for agent in agents or []:
+            validate_tool_names(agent.get("tools"))
+        batch_id = await create_agent_batch(agents)
+
+    batch = await get_agent_batch(batch_id)
+    if not batch:
+        raise ValueError(f"Agent batch {batch_id} not found.")
+
+    await reconcile_agent_batch(batch_id)
+    counts = await count_agent_batch_items(batch_id)
+    yield {"event": "started", "batch_id": batch_id, "total": batch["total"], "created": counts.get("created", 0)}
+
+    outcomes = asyncio.Queue()
+    slots = asyncio.Semaphore(concurrency or AGENT_BATCH_CONCURRENCY)
+
+    async def _create_wallet_for(item):
+        try:
+            agent_id = ObjectId()
+            await outcomes.put((item, (agent_id, await _new_agent_wallet(agent_id)), None))
+        except Exception as e:
+            await outcomes.put((item, None, str(e)))
+        finally:
+            slots.release()
+
+    async def _produce():
+        tasks = set()
+        try:
+            async for item in unfinished_agent_batch_items(batch_id):
+                await slots.acquire()
+                task = asyncio.create_task(_create_wallet_for(item))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            await outcomes.put(None)
+
+    async def _save(created):
+        documents = []
+        for item, (agent_id, (address, wallet_data)) in created:
+            agent_data = _agent_document(item["name"], item["instructions"], address, wallet_data,
+                                         item.get("active", False), item.get("interval"), item.get("tools"))
+            agent_data.update(_id=agent_id, batch_id=ObjectId(batch_id), batch_index=item["index"])
+            documents.append(agent_data)
+        error = None
+        try:
+            await agent_collection.insert_many(documents, ordered=False)
+            saved = {agent_id for _, (agent_id, _) in created}
+        except Exception as e:
+            # Unordered inserts may have saved some agents; the others give their wallets back
+            error = str(e)
+            saved = {agent_data["_id"] async for agent_data in agent_collection.find(
+                {"_id": {"$in": [agent_id for _, (agent_id, _) in created]}}, {"_id": 1})}
+
+        await remove_claimed_wallets(list(saved))
+        events, updates = [], []
+        for item, (agent_id, (address, wallet_data)) in created:
+            if agent_id in saved:
+                invalidate_agent(agent_id)
+                updates.append((item["_id"], "created", {"agent_id": str(agent_id)}))
+                events.append({"event": "created", "index": item["index"], "name": item["name"],
+                               "agent_id": str(agent_id), "wallet": address})
+            else:
+                await release_wallet(agent_id, address, wallet_data)
+                updates.append((item["_id"], "failed", {"error": error}))
+                events.append({"event": "failed", "index": item["index"], "name": item["name"], "error": error})
+        await update_agent_batch_items(updates)
+        return events
+
+    producer = asyncio.create_task(_produce())
+    created = []
+    try:
+        while True:
+            try:
+                outcome = await asyncio.wait_for(outcomes.get(), AGENT_BATCH_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                outcome = False
+
+            if outcome:
+                item, wallet, error = outcome
+                if error is None:
+                    created.append((item, wallet))
+                else:
+                    await update_agent_batch_items([(item["_id"], "failed", {"error": error})])
+                    yield {"event": "failed", "index": item["index"], "name": item["name"], "error": error}
+
+            # Save a chunk when it is full, when creations stall, and at the end
+            if created and (outcome is None or outcome is False or len(created) >= AGENT_BATCH_CHUNK_SIZE):
+                for event in await _save(created):
+                    yield event
+                created = []
+            if outcome is None:
+                break
+        await producer
+    finally:
+        producer.cancel()
+
+    counts = await count_agent_batch_items(batch_id)
+    yield {"event": "finished", "batch_id": batch_id, "total": batch["total"], **counts}
+
+
+
+async def get_agent(agent_id: str, projection: Union[List[str], dict] = None) -> dict:
     """
     Retrieve agent details from the database.
 
     Args:
         agent_id (str): The ID of the agent.
+        projection (Union[List[str], dict], optional): Only return these fields
+            (and `_id`), or a MongoDB projection document.
 
     Returns:
         dict: The agent data, including wallet information.
@@ -113,22 +442,312 @@ async def get_agent(agent_id: str) -> dict:
     Raises:
         ValueError: If the agent ID is invalid or the agent is not found.
     """
-    # Convert agent_id to ObjectId
+    key = str(agent_id)
+    # Projection documents are passed to MongoDB; field lists are served from the cache
+    cacheable = not isinstance(projection, dict)
+
+    agent_data = agent_cache.get(key) if cacheable else None
+    if agent_data is None:
+        started = time.perf_counter()
+        # Convert agent_id to ObjectId
+        try:
+            object_id = ObjectId(agent_id)
+        except InvalidId:
+            agent_cache.set(key, _INVALID_AGENT_ID, ttl=AGENT_CACHE_NEGATIVE_TTL)
+            raise ValueError("Invalid agent ID format.")
+
+        # Retrieve agent data from MongoDB
+        agent_data = await agent_collection.find_one({"_id": object_id}, None if cacheable else projection)
+        if cacheable:
+            agent_cache.record_load(time.perf_counter() - started)
+            if agent_data:
+                agent_cache.set(key, agent_data)
+            else:
+                agent_cache.set(key, _AGENT_NOT_FOUND, ttl=AGENT_CACHE_NEGATIVE_TTL)
+
+    if agent_data is _INVALID_AGENT_ID:
+        raise ValueError("Invalid agent ID format.")
+    if not agent_data or agent_data is _AGENT_NOT_FOUND:
+        raise ValueError(f"Agent with ID {agent_id} not found.")
+
+    if not cacheable:
+        return agent_data
+    if projection:
+        return {field: copy.deepcopy(agent_data[field]) for field in ["_id", *projection] if field in agent_data}
+    # Callers may modify the result; the cached document must stay intact
+    return copy.deepcopy(agent_data)
+
+
+def invalidate_agent(agent_id: str) -> None:
+    """
+    Drop a cached agent document (or cached "not found") after a write.
+
+    The agent's imported wallet is dropped with it, so a changed or
+    replaced wallet is never served from the wallet cache.
+    """
+    agent_cache.invalidate(str(agent_id))
+    wallet_cache.invalidate(str(agent_id))
+
+
+# Fields left out of agent listings (wallet seeds never leave the database there)
+AGENT_LIST_EXCLUDED_FIELDS = {"instructions": 0, "wallet.seed": 0}
+
+
+async def ensure_agent_indexes() -> None:
+    """
+    Create the indexes of the `agents` collection used by listings and lookups.
+    """
+    await agent_collection.create_index("address")
+    # Agents saved before the address had its own field keep it in `wallet`
+    await agent_collection.create_index("wallet")
+    await agent_collection.create_index([("name", 1), ("_id", -1)])
+    await agent_collection.create_index("created_at")
+    await agent_collection.create_index("active", sparse=True)
+    # Agents created by a batch, so an interrupted batch never saves one twice
+    await agent_collection.create_index([("batch_id", 1), ("batch_index", 1)], unique=True, sparse=True)
+
+
+async def list_agents(cursor: str = None, name: str = None, limit: int = 50) -> tuple:
+    """
+    List agents newest first, one page at a time.
+
+    Pages are cut on `_id` rather than skipped, so every page is an index
+    range scan however deep it is.
+
+    Args:
+        cursor (str, optional): The `next_cursor` of the previous page.
+        name (str, optional): Only agents with this exact name.
+        limit (int): Maximum number of agents returned.
+
+    Returns:
+        tuple: The agents and the cursor of the next page (None on the last page).
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    query = {}
+    if name:
+        query["name"] = name
+    if cursor:
+        try:
+            query["_id"] = {"$lt": ObjectId(cursor)}
+        except InvalidId:
+            raise ValueError("Invalid cursor.")
+
+    agents = await agent_collection.find(query, AGENT_LIST_EXCLUDED_FIELDS) \
+        .sort("_id", -1).limit(limit).to_list(length=limit)
+    next_cursor = str(agents[-1]["_id"]) if len(agents) == limit else None
+    return agents, next_cursor
+
+
+async def find_agent_by_address(address: str) -> dict:
+    """
+    Find the agent that owns a wallet address.
+
+    Args:
+        address (str): The wallet address, in any letter case.
+
+    Returns:
+        dict: The agent data, without its instructions and wallet seed.
+
+    Raises:
+        ValueError: If the address is invalid or no agent owns it.
+    """
+    from eth_utils import is_address, to_checksum_address
+    if not is_address(address):
+        raise ValueError("Invalid wallet address.")
+
+    # Addresses are stored checksummed, as returned by CDP
+    address = to_checksum_address(address)
+    agent_data = await agent_collection.find_one({"$or": [{"address": address}, {"wallet": address}]},
+                                                 AGENT_LIST_EXCLUDED_FIELDS)
+    if not agent_data:
+        raise ValueError(f"No agent found for address {address}.")
+    return agent_data
+
+
+async def set_agent_active(agent_id: str, active: bool, interval: float = None) -> None:
+    """
+    Turn the autonomous mode of an agent on or off.
+
+    Args:
+        agent_id (str): The ID of the agent.
+        active (bool): Whether the agent runtime runs the agent.
+        interval (float, optional): New number of seconds between its turns.
+
+    Raises:
+        ValueError: If the agent ID is invalid or the agent is not found.
+    """
     try:
-        agent_id = ObjectId(agent_id)
+        object_id = ObjectId(agent_id)
     except InvalidId:
         raise ValueError("Invalid agent ID format.")
 
-    # Retrieve agent data from MongoDB
-    agent_data = await agent_collection.find_one({"_id": agent_id})
-    if not agent_data:
+    update = {"active": active}
+    if interval is not None:
+        if interval <= 0:
+            raise ValueError("Interval must be a positive number of seconds.")
+        update["interval"] = interval
+    result = await agent_collection.update_one({"_id": object_id}, {"$set": update})
+    invalidate_agent(agent_id)
+    if result.matched_count == 0:
         raise ValueError(f"Agent with ID {agent_id} not found.")
 
-    return agent_data
+
+async def load_wallet(agent_id: str) -> "Wallet":
+    """
+    Return the imported CDP wallet of an agent, using the wallet cache.
+
+    On a miss the agent is read from MongoDB and its wallet is hydrated
+    with `Wallet.import_data`; the result is cached for later tool calls.
+    Inside a tool bound by `bind_agent_context`, the wallet resolved for
+    the turn is returned directly.
+
+    Args:
+        agent_id (str): The ID of the agent.
+
+    Returns:
+        Wallet: The agent's wallet.
+
+    Raises:
+        ValueError: If the agent is not found or has no wallet data.
+    """
+    agent_wallet = wallet_cache.get(agent_id)
+    if agent_wallet is not None:
+        return agent_wallet
+
+    started = time.perf_counter()
+    agent_data = await get_agent(agent_id)
+
+    wallet_data = agent_data.get("wallet")
+    if not isinstance(wallet_data, dict) or not wallet_data.get("seed"):
+        # Agents saved with only their address cannot sign anything
+        raise ValueError("Wallet data not found for the agent.")
+
+    # Import the wallet
+    agent_wallet = await run_blocking(_import_wallet, _decrypt_wallet_data(wallet_data))
+    wallet_cache.record_load(time.perf_counter() - started)
+    wallet_cache.set(agent_id, agent_wallet)
+    return agent_wallet
+
+
+def invalidate_wallet(agent_id: str = None) -> None:
+    """
+    Drop a cached wallet so the next tool call re-imports it.
+
+    Args:
+        agent_id (str, optional): The agent to invalidate. Clears every
+            cached wallet when omitted.
+    """
+    if agent_id is None:
+        wallet_cache.clear()
+    else:
+        wallet_cache.invalidate(agent_id)
+
+
+def invalidate_balances(address_id: str) -> None:
+    """
+    Drop every cached balance of a wallet address.
+
+    Also bumps the address's balance version, so a balance read that was
+    already in flight (and may predate the transaction) is not cached.
+    """
+    _balance_versions[address_id] = _balance_versions.get(address_id, 0) + 1
+    balance_cache.invalidate_where(lambda key: key[0] == address_id)
+
+
+async def get_wallet_balance(agent_wallet: "Wallet", asset_id: str) -> Decimal:
+    """
+    Return the balance of an asset in a loaded wallet, using the balance cache.
+
+    Cached balances expire after BALANCE_CACHE_TTL seconds; a block window
+    (BALANCE_CACHE_BLOCKS) is converted to seconds with BASE_BLOCK_TIME, so
+    it is approximate when blocks are slower or faster than that. Sending a
+    transaction from the wallet drops its balances right away.
+
+    Args:
+        agent_wallet (Wallet): The wallet to read.
+        asset_id (str): Asset identifier ("eth", "usdc") or contract address of an ERC-20 token
+
+    Returns:
+        Decimal: The balance.
+    """
+    address_id = agent_wallet.default_address.address_id
+    key = (address_id, asset_id.lower())
+    balance = balance_cache.get(key)
+    if balance is None:
+        version = _balance_versions.get(address_id, 0)
+        started = time.perf_counter()
+        balance = await run_blocking(agent_wallet.balance, asset_id)
+        balance_cache.record_load(time.perf_counter() - started)
+        if _balance_versions.get(address_id, 0) == version:
+            balance_cache.set(key, balance)
+    return balance
+
+
+async def submit_transaction(agent_wallet: "Wallet", operation: str, *args, **kwargs):
+    """
+    Submit a wallet write (e.g. `transfer`, `invoke_contract`) without
+    waiting for confirmation, off the event loop.
+
+    Only the submission holds the wallet's slot in `ai_agent.executor`, so
+    the next transaction of the same wallet can be sent while this one is
+    still confirming.
+
+    Args:
+        agent_wallet (Wallet): The wallet sending the transaction.
+        operation (str): Name of the `Wallet` method to call.
+
+    Returns:
+        The submitted CDP object (Transfer, SmartContract, ContractInvocation, Trade).
+    """
+    address_id = agent_wallet.default_address.address_id
+    try:
+        return await run_blocking(getattr(agent_wallet, operation), *args,
+                                  wallet_key=address_id, **kwargs)
+    finally:
+        invalidate_balances(address_id)
+
+
+async def wait_for_transaction(agent_wallet: "Wallet", submitted):
+    """
+    Wait for a submitted CDP object to be confirmed, off the event loop.
+
+    Args:
+        agent_wallet (Wallet): The wallet that sent the transaction.
+        submitted: The object returned by `submit_transaction`.
+
+    Returns:
+        The confirmed CDP object.
+    """
+    try:
+        result = await run_blocking(submitted.wait)
+    finally:
+        # Balances read while the transaction was pending are stale now
+        invalidate_balances(agent_wallet.default_address.address_id)
+    transaction = getattr(result, "transaction", None)
+    record_tx_hash(getattr(transaction, "transaction_hash", None))
+    return result
+
+
+async def submit_and_wait(agent_wallet: "Wallet", operation: str, *args, **kwargs):
+    """
+    Submit a wallet write and wait for it to be confirmed, off the event loop.
+
+    Args:
+        agent_wallet (Wallet): The wallet sending the transaction.
+        operation (str): Name of the `Wallet` method to call.
+
+    Returns:
+        The confirmed CDP object (Transfer, SmartContract, ContractInvocation, Trade).
+    """
+    submitted = await submit_transaction(agent_wallet, operation, *args, **kwargs)
+    return await wait_for_transaction(agent_wallet, submitted)
 
 
 # Function to create a new ERC-20 token
-async def create_token(agent_id: str, name: str, symbol: str, initial_supply: int) -> str:
+@instrument_tool
+async def create_token(agent_id: str, name: str, symbol: str, initial_supply: int, *, agent_wallet: "Wallet" = None) -> str:
     """
     Create a new ERC-20 token.
 
@@ -141,20 +760,13 @@ async def create_token(agent_id: str, name: str, symbol: str, initial_supply: in
     Returns:
         str: A message confirming the token creation with details.
     """
-    # Get agent details
-    agent_data = await get_agent(agent_id)
-
-    wallet_data = agent_data.get("wallet")
-    if not wallet_data:
-        raise ValueError("Wallet data not found for the agent.")
-
-    # Import the wallet
-    agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
+    # Load the agent wallet (cached across tool calls)
+    if agent_wallet is None:
+        agent_wallet = await load_wallet(agent_id)
 
     # Deploy the ERC-20 token
     try:
-        deployed_contract = agent_wallet.deploy_token(name, symbol, initial_supply)
-        deployed_contract.wait()
+        deployed_contract = await submit_and_wait(agent_wallet, "deploy_token", name, symbol, initial_supply)
     except Exception as e:
         raise RuntimeError(f"Failed to deploy token: {str(e)}")
 
@@ -163,8 +775,42 @@ async def create_token(agent_id: str, name: str, symbol: str, initial_supply: in
         f"and contract address {deployed_contract.contract_address}."
     )
 
+async def _submit_transfer(agent_wallet: "Wallet", amount, asset_id: str, destination_address: str):
+    """
+    Submit a transfer from an already loaded wallet without waiting for it.
+
+    Returns:
+        tuple: The submitted Transfer and a confirmation message.
+    """
+    # Check if we're on Base Mainnet and the asset is USDC for gasless transfer
+    is_mainnet = agent_wallet.network_id == "base-mainnet"
+    is_usdc = asset_id.lower() == "usdc"
+    gasless = is_mainnet and is_usdc
+
+    transfer = await submit_transaction(agent_wallet,
+                                        "transfer",
+                                        amount,
+                                        asset_id,
+                                        destination_address,
+                                        gasless=gasless)
+    gasless_msg = " (gasless)" if gasless else ""
+    return transfer, f"Transferred {amount} {asset_id}{gasless_msg} to {destination_address}"
+
+
+async def _send_transfer(agent_wallet: "Wallet", amount, asset_id: str, destination_address: str):
+    """
+    Submit a transfer from an already loaded wallet and wait for it.
+
+    Returns:
+        tuple: The confirmed Transfer and a confirmation message.
+    """
+    transfer, message = await _submit_transfer(agent_wallet, amount, asset_id, destination_address)
+    return await wait_for_transaction(agent_wallet, transfer), message
+
+
 # Function to transfer assets
-async def transfer_asset(agent_id, amount, asset_id, destination_address):
+@instrument_tool
+async def transfer_asset(agent_id, amount, asset_id, destination_address, *, agent_wallet: "Wallet" = None):
     """
     Transfer an asset to a specific address.
     
@@ -177,48 +823,142 @@ async def transfer_asset(agent_id, amount, asset_id, destination_address):
         str: A message confirming the transfer or describing an error
     """
     try:
-        # Get agent details
-        agent_data = await get_agent(agent_id)
-
-        wallet_data = agent_data.get("wallet")
-        if not wallet_data:
-            raise ValueError("Wallet data not found for the agent.")
-
-        # Import the wallet
-        agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
-        # Check if we're on Base Mainnet and the asset is USDC for gasless transfer
-        is_mainnet = agent_wallet.network_id == "base-mainnet"
-        is_usdc = asset_id.lower() == "usdc"
-        gasless = is_mainnet and is_usdc
+        # Load the agent wallet (cached across tool calls)
+        if agent_wallet is None:
+            agent_wallet = await load_wallet(agent_id)
+        from cdp.errors import UnsupportedAssetError
 
         # For ETH and USDC, we can transfer directly without checking balance
         if asset_id.lower() in ["eth", "usdc"]:
-            transfer = agent_wallet.transfer(amount,
-                                             asset_id,
-                                             destination_address,
-                                             gasless=gasless)
-            transfer.wait()
-            gasless_msg = " (gasless)" if gasless else ""
-            return f"Transferred {amount} {asset_id}{gasless_msg} to {destination_address}"
+            _, message = await _send_transfer(agent_wallet, amount, asset_id, destination_address)
+            return message
 
         # For other assets, check balance first
         try:
-            balance = agent_wallet.balance(asset_id)
+            balance = await get_wallet_balance(agent_wallet, asset_id)
         except UnsupportedAssetError:
             return f"Error: The asset {asset_id} is not supported on this network. It may have been recently deployed. Please try again in about 30 minutes."
 
         if balance < amount:
             return f"Insufficient balance. You have {balance} {asset_id}, but tried to transfer {amount}."
 
-        transfer = agent_wallet.transfer(amount, asset_id, destination_address)
-        transfer.wait()
-        return f"Transferred {amount} {asset_id} to {destination_address}"
+        _, message = await _send_transfer(agent_wallet, amount, asset_id, destination_address)
+        return message
     except Exception as e:
         return f"Error transferring asset: {str(e)}. If this is a custom token, it may have been recently deployed. Please try again in about 30 minutes, as it needs to be indexed by CDP first."
 
 
+async def _transfer_wallet_batch(agent_id: str, items: List[tuple], results: List[dict]) -> None:
+    """
+    Send the transfers of one agent in order, checking each asset balance
+    once, then wait for their confirmations together. A failing item is
+    marked failed without stopping the others.
+    """
+    try:
+        agent_wallet = await load_wallet(agent_id)
+    except Exception as e:
+        for index, _ in items:
+            results[index].update(status="failed", error=str(e))
+        return
+    from cdp.errors import UnsupportedAssetError
+
+    # One balance lookup per asset for the whole batch
+    balances = {}
+    submitted = []
+    for index, item in items:
+        try:
+            asset_id = item["asset_id"]
+            try:
+                amount = Decimal(str(item["amount"]))
+            except InvalidOperation:
+                raise ValueError(f"Invalid amount {item['amount']!r}.")
+            if asset_id.lower() not in balances:
+                try:
+                    balances[asset_id.lower()] = await get_wallet_balance(agent_wallet, asset_id)
+                except UnsupportedAssetError:
+                    balances[asset_id.lower()] = None
+            balance = balances[asset_id.lower()]
+            if balance is None:
+                results[index].update(status="failed", error=f"The asset {asset_id} is not supported on this network.")
+                continue
+            if balance < amount:
+                results[index].update(
+                    status="failed",
+                    error=f"Insufficient balance. You have {balance} {asset_id}, but tried to transfer {amount}.")
+                continue
+
+            transfer, message = await _submit_transfer(agent_wallet, amount, asset_id, item["destination_address"])
+        except Exception as e:
+            results[index].update(status="failed", error=f"Error transferring asset: {str(e)}")
+            continue
+
+        balances[asset_id.lower()] = balance - amount
+        submitted.append((index, transfer, message))
+
+    # Submitted in order above; the confirmations do not depend on each other
+    confirmations = await asyncio.gather(
+        *(wait_for_transaction(agent_wallet, transfer) for _, transfer, _ in submitted),
+        return_exceptions=True,
+    )
+    for (index, transfer, message), confirmation in zip(submitted, confirmations):
+        if isinstance(confirmation, BaseException):
+            results[index].update(status="failed", tx_hash=transfer.transaction_hash,
+                                  error=f"Transfer submitted but not confirmed: {str(confirmation)}")
+        else:
+            results[index].update(status="succeeded", result=message, tx_hash=transfer.transaction_hash)
+
+
+async def transfer_batch(transfers: List[dict]) -> dict:
+    """
+    Transfer assets for many (agent, destination) pairs at once.
+
+    Transfers of the same agent are submitted in the given order and then
+    confirm together, and balances are checked once per (agent, asset)
+    for the whole batch. Different agents are processed in parallel under
+    the executor limits. An item that fails (or a wallet that fails as a
+    whole) is reported in its result; the other items still run.
+
+    Args:
+        transfers (List[dict]): Items with agent_id, amount, asset_id and
+            destination_address.
+
+    Returns:
+        dict: Success and failure counts, and one result per item in input order.
+    """
+    results = []
+    by_agent = {}
+    for index, item in enumerate(transfers):
+        results.append({
+            "index": index,
+            "agent_id": item.get("agent_id"),
+            "asset_id": item.get("asset_id"),
+            "amount": item.get("amount"),
+            "destination_address": item.get("destination_address"),
+        })
+        by_agent.setdefault(item.get("agent_id"), []).append((index, item))
+
+    outcomes = await asyncio.gather(*(
+        _transfer_wallet_batch(agent_id, items, results)
+        for agent_id, items in by_agent.items()
+    ), return_exceptions=True)
+    for items, outcome in zip(by_agent.values(), outcomes):
+        if isinstance(outcome, BaseException):
+            for index, _ in items:
+                if "status" not in results[index]:
+                    results[index].update(status="failed", error=f"Error transferring asset: {str(outcome)}")
+
+    succeeded = sum(1 for result in results if result["status"] == "succeeded")
+    return {
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+
+
 # Function to get the balance of a specific asset
-async def get_balance(agent_id, asset_id):
+@read_only
+@instrument_tool
+async def get_balance(agent_id, asset_id, *, agent_wallet: "Wallet" = None):
     """
     Get the balance of a specific asset in the agent's wallet.
     
@@ -228,44 +968,73 @@ async def get_balance(agent_id, asset_id):
     Returns:
         str: A message showing the current balance of the specified asset
     """
-    # Get agent details
-    agent_data = await get_agent(agent_id)
+    # Load the agent wallet (cached across tool calls)
+    if agent_wallet is None:
+        agent_wallet = await load_wallet(agent_id)
+    balance = await get_wallet_balance(agent_wallet, asset_id)
+    return f"Current balance of {asset_id}: {balance}"
 
-    wallet_data = agent_data.get("wallet")
-    if not wallet_data:
-        raise ValueError("Wallet data not found for the agent.")
 
-    # Import the wallet
-    agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
-    balance = agent_wallet.balance(asset_id)
-    return f"Current balance of {asset_id}: {balance}"
+async def get_balances(agent_id: str, assets: List[str] = None) -> Dict[str, str]:
+    """
+    Get the balances of several assets in the agent's wallet at once.
+
+    Cached balances are reused; otherwise all balances of the wallet are
+    fetched with a single `balances()` call and cached per asset.
+
+    Args:
+        agent_id (str): The ID of the agent.
+        assets (List[str], optional): Assets to report, defaults to `TRACKED_ASSETS`.
+
+    Returns:
+        Dict[str, str]: Balance per requested asset, plus every other asset
+            the wallet holds when the balances were fetched.
+    """
+    agent_wallet = await load_wallet(agent_id)
+    address_id = agent_wallet.default_address.address_id
+    assets = [asset.lower() for asset in (assets or TRACKED_ASSETS)]
+
+    cached = {asset: balance_cache.get((address_id, asset)) for asset in assets}
+    if all(balance is not None for balance in cached.values()):
+        return {asset: str(balance) for asset, balance in cached.items()}
+
+    version = _balance_versions.get(address_id, 0)
+    started = time.perf_counter()
+    balances = {asset.lower(): amount for asset, amount in (await run_blocking(agent_wallet.balances)).items()}
+    balance_cache.record_load(time.perf_counter() - started)
+    if _balance_versions.get(address_id, 0) == version:
+        for asset, amount in balances.items():
+            balance_cache.set((address_id, asset), amount)
+
+    # Assets not held (or listed under another ID) are read one by one
+    for asset in assets:
+        if asset not in balances:
+            balances[asset] = await get_wallet_balance(agent_wallet, asset)
+    return {asset: str(amount) for asset, amount in balances.items()}
 
 
 # Function to request ETH from the faucet (testnet only)
-async def request_eth_from_faucet(agent_id):
+@instrument_tool
+async def request_eth_from_faucet(agent_id, *, agent_wallet: "Wallet" = None):
     """
     Request ETH from the Base Sepolia testnet faucet.
     
     Returns:
         str: Status message about the faucet request
     """
-    # Get agent details
-    agent_data = await get_agent(agent_id)
-
-    wallet_data = agent_data.get("wallet")
-    if not wallet_data:
-        raise ValueError("Wallet data not found for the agent.")
-
-    # Import the wallet
-    agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
+    # Load the agent wallet (cached across tool calls)
+    if agent_wallet is None:
+        agent_wallet = await load_wallet(agent_id)
     if agent_wallet.network_id == "base-mainnet":
         return "Error: The faucet is only available on Base Sepolia testnet."
 
-    faucet_tx = agent_wallet.faucet()
+    faucet_tx = await run_blocking(agent_wallet.faucet, wallet_key=agent_wallet.default_address.address_id)
     return f"Requested ETH from faucet. Transaction: {faucet_tx}"
 
 
 # Function to generate art using DALL-E (requires separate OpenAI API key)
+@read_only
+@instrument_tool
 def generate_art(prompt):
     """
     Generate art using DALL-E based on a text prompt.
@@ -277,6 +1046,7 @@ def generate_art(prompt):
         str: Status message about the art generation, including the image URL if successful
     """
     try:
+        from openai import OpenAI
         client = OpenAI()
         response = client.images.generate(
             model="dall-e-3",
@@ -294,7 +1064,8 @@ def generate_art(prompt):
 
 
 # Function to deploy an ERC-721 NFT contract
-async def deploy_nft(agent_id, name, symbol, base_uri):
+@instrument_tool
+async def deploy_nft(agent_id, name, symbol, base_uri, *, agent_wallet: "Wallet" = None):
     """
     Deploy an ERC-721 NFT contract.
     
@@ -307,17 +1078,10 @@ async def deploy_nft(agent_id, name, symbol, base_uri):
         str: Status message about the NFT deployment, including the contract address
     """
     try:
-        # Get agent details
-        agent_data = await get_agent(agent_id)
-
-        wallet_data = agent_data.get("wallet")
-        if not wallet_data:
-            raise ValueError("Wallet data not found for the agent.")
-
-        # Import the wallet
-        agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
-        deployed_nft = agent_wallet.deploy_nft(name, symbol, base_uri)
-        deployed_nft.wait()
+        # Load the agent wallet (cached across tool calls)
+        if agent_wallet is None:
+            agent_wallet = await load_wallet(agent_id)
+        deployed_nft = await submit_and_wait(agent_wallet, "deploy_nft", name, symbol, base_uri)
         contract_address = deployed_nft.contract_address
 
         return f"Successfully deployed NFT contract '{name}' ({symbol}) at address {contract_address} with base URI: {base_uri}"
@@ -327,7 +1091,8 @@ async def deploy_nft(agent_id, name, symbol, base_uri):
 
 
 # Function to mint an NFT
-async def mint_nft(agent_id, contract_address, mint_to):
+@instrument_tool
+async def mint_nft(agent_id, contract_address, mint_to, *, agent_wallet: "Wallet" = None):
     """
     Mint an NFT to a specified address.
     
@@ -339,20 +1104,13 @@ async def mint_nft(agent_id, contract_address, mint_to):
         str: Status message about the NFT minting
     """
     try:
-        # Get agent details
-        agent_data = await get_agent(agent_id)
-
-        wallet_data = agent_data.get("wallet")
-        if not wallet_data:
-            raise ValueError("Wallet data not found for the agent.")
-
-        # Import the wallet
-        agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
+        # Load the agent wallet (cached across tool calls)
+        if agent_wallet is None:
+            agent_wallet = await load_wallet(agent_id)
         mint_args = {"to": mint_to, "quantity": "1"}
 
-        mint_invocation = agent_wallet.invoke_contract(
+        await submit_and_wait(agent_wallet, "invoke_contract",
             contract_address=contract_address, method="mint", args=mint_args)
-        mint_invocation.wait()
 
         return f"Successfully minted NFT to {mint_to}"
 
@@ -360,9 +1118,269 @@ async def mint_nft(agent_id, contract_address, mint_to):
         return f"Error minting NFT: {str(e)}"
 
 
+# Maximum number of bulk mints confirming at the same time
+BULK_MINT_CONCURRENCY = int(os.getenv("BULK_MINT_CONCURRENCY", "8"))
+# Seconds between two reads of a bulk mint's progress by its event stream
+BULK_MINT_POLL_INTERVAL = float(os.getenv("BULK_MINT_POLL_INTERVAL", "0.5"))
+# Contract invocations of the wallet read on resume to settle interrupted mints
+BULK_MINT_RECONCILE_LIMIT = int(os.getenv("BULK_MINT_RECONCILE_LIMIT", "10000"))
+
+
+def _list_contract_invocations(agent_wallet: "Wallet", limit: int) -> Tuple[List[dict], bool]:
+    """
+    Read up to `limit` contract invocations CDP recorded for the wallet.
+
+    Returns:
+        tuple: (invocations as dicts with `contract_address`, `method`,
+        `args`, `status` and `tx_hash`, whether all of them were read).
+    """
+    configure_cdp()
+    from cdp import ContractInvocation
+
+    invocations = []
+    for invocation in ContractInvocation.list(agent_wallet.id, agent_wallet.default_address.address_id):
+        if len(invocations) >= limit:
+            return invocations, False
+        transaction = invocation.transaction
+        invocations.append({
+            "contract_address": invocation.contract_address,
+            "method": invocation.method,
+            "args": invocation.args,
+            "status": str(transaction.status) if transaction else None,
+            "tx_hash": transaction.transaction_hash if transaction else None,
+        })
+    return invocations, True
+
+
+def _mints_to(invocation: dict, item: dict) -> bool:
+    args = invocation["args"]
+    return (str(args.get("to", "")).lower() == item["to"].lower()
+            and str(args.get("quantity")) == str(item["quantity"]))
+
+
+async def _reconcile_mint_items(run: dict, agent_wallet: "Wallet", job_id: ObjectId) -> None:
+    """
+    Settle the recipients of a resumed run whose mint was being sent or
+    confirmed when the run stopped, from the contract invocations CDP
+    recorded for the wallet.
+
+    A mint whose transaction completed is marked minted. One that was never
+    broadcast (no invocation, or an unsigned one) or that failed on chain
+    is minted again. One still in flight, or that cannot be found because
+    the wallet has more than `BULK_MINT_RECONCILE_LIMIT` invocations, is
+    reported as `skipped` and checked again on the next resume.
+    """
+    items = await interrupted_mint_items(run["_id"])
+    if not items:
+        return
+
+    try:
+        invocations, complete = await run_blocking(_list_contract_invocations, agent_wallet,
+                                                   BULK_MINT_RECONCILE_LIMIT)
+    except Exception as e:
+        logger.warning("Could not list the contract invocations of mint run %s: %s", run["_id"], e)
+        invocations, complete = [], False
+
+    contract_address = run["contract_address"].lower()
+    mints = [invocation for invocation in invocations
+             if invocation["contract_address"].lower() == contract_address and invocation["method"] == "mint"]
+    by_hash = {invocation["tx_hash"]: invocation for invocation in mints if invocation["tx_hash"]}
+    claimed = await claimed_tx_hashes(run["_id"], list(by_hash))
+    # Invocations of mints sent without a recorded hash, matched by recipient
+    unclaimed = [invocation for invocation in mints if invocation["tx_hash"] not in claimed]
+
+    for item in items:
+        if item["status"] == "submitted":
+            invocation = by_hash.get(item.get("tx_hash"))
+        else:
+            invocation = next((invocation for invocation in unclaimed if _mints_to(invocation, item)), None)
+            if invocation is not None:
+                unclaimed.remove(invocation)
+        status = invocation["status"] if invocation else None
+        tx_hash = (invocation and invocation["tx_hash"]) or item.get("tx_hash")
+
+        if status == "complete":
+            await update_mint_item(item["_id"], "minted", event="minted", job_id=job_id, tx_hash=tx_hash)
+        elif status == "failed":
+            await update_mint_item(item["_id"], "failed", job_id=job_id, tx_hash=tx_hash,
+                                   error="The mint transaction failed on chain.")
+        elif item["status"] == "submitting" and (status == "pending" or (invocation is None and complete)):
+            # Never signed and broadcast, so it cannot land: send it again
+            await update_mint_item(item["_id"], "pending", job_id=job_id, error=None)
+        else:
+            error = ("Still pending on chain." if invocation else
+                     "Sent before the run was interrupted and not found among the wallet's invocations; "
+                     "check the transaction.")
+            await update_mint_item(item["_id"], "submitted" if tx_hash else item["status"], event="skipped",
+                                   job_id=job_id, tx_hash=tx_hash, error=error)
+
+
+async def run_mint(run_id: str, job_id: str = None, concurrency: int = None) -> dict:
+    """
+    Mint the pending and failed recipients of a bulk mint run: the job
+    behind `mint_nft_bulk`.
+
+    Every recipient is checkpointed in MongoDB with the event to report
+    for it. Recipients interrupted while being sent or confirmed are first
+    settled against the wallet's contract invocations; a mint that may
+    still land is never sent twice. Mints are submitted in order and up to
+    `concurrency` of them confirm at the same time.
+
+    Args:
+        run_id (str): The ID of the run.
+        job_id (str, optional): The ID of this job; it stops at once if the
+            run was handed to another job in the meantime.
+        concurrency (int, optional): Maximum number of mints in flight.
+
+    Returns:
+        dict: The run ID, total and the number of recipients per status.
+    """
+    run = await get_mint_run(run_id)
+    if not run:
+        raise ValueError(f"Mint run {run_id} not found.")
+    if job_id is not None and str(run.get("job_id")) != job_id:
+        return {"run_id": run_id, "superseded_by": str(run.get("job_id"))}
+
+    job_id = run.get("job_id")
+    agent_wallet = await load_wallet(run["agent_id"])
+    await _reconcile_mint_items(run, agent_wallet, job_id)
+    slots = asyncio.Semaphore(concurrency or BULK_MINT_CONCURRENCY)
+
+    async def _mint(item):
+        try:
+            # Checkpointed first, so a crash while sending is never taken for "not sent"
+            await update_mint_item(item["_id"], "submitting", job_id=job_id)
+            mint_args = {"to": item["to"], "quantity": str(item["quantity"])}
+            invocation = await submit_transaction(agent_wallet, "invoke_contract",
+                contract_address=run["contract_address"], method="mint", args=mint_args)
+        except Exception as e:
+            await update_mint_item(item["_id"], "failed", event="failed", job_id=job_id, error=str(e))
+        else:
+            tx_hash = invocation.transaction_hash
+            try:
+                await update_mint_item(item["_id"], "submitted", job_id=job_id, tx_hash=tx_hash)
+                await wait_for_transaction(agent_wallet, invocation)
+                await update_mint_item(item["_id"], "minted", event="minted", job_id=job_id, error=None)
+            except Exception as e:
+                # The mint was sent and may still land: keep it "submitted" so it is never resent
+                await update_mint_item(item["_id"], "submitted", event="unconfirmed", job_id=job_id,
+                                       tx_hash=tx_hash, error=str(e))
+        finally:
+            slots.release()
+
+    tasks = set()
+    async for item in unfinished_mint_items(run_id):
+        # Settled above: either in flight (reported as skipped) or unknown
+        if item["status"] in ("submitting", "submitted"):
+            continue
+        await slots.acquire()
+        task = asyncio.create_task(_mint(item))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+
+    counts = await count_mint_items(run_id)
+    return {"run_id": run_id, "total": run["total"], **counts}
+
+
+async def _mint_run_job(run: dict, concurrency: int = None) -> ObjectId:
+    # Watch the job already minting the run, or hand the run to a new one
+    while True:
+        previous = run.get("job_id")
+        if previous is not None:
+            job = await get_job(str(previous))
+            if job and job["state"] not in FINISHED_STATES:
+                return previous
+        job_id = ObjectId()
+        if await set_mint_run_job(run["_id"], previous, job_id):
+            await submit_job("mint_nft_bulk", {"run_id": str(run["_id"]), "job_id": str(job_id),
+                                               "concurrency": concurrency}, job_id=job_id)
+            return job_id
+        run = await get_mint_run(str(run["_id"]))
+
+
+def _mint_event(item: dict) -> dict:
+    event = {"event": item["event"], "index": item["index"], "to": item["to"], "quantity": item["quantity"]}
+    if item.get("tx_hash"):
+        event["tx_hash"] = item["tx_hash"]
+    if item.get("error") and item["event"] != "minted":
+        event["error"] = item["error"]
+    return event
+
+
+async def mint_nft_bulk(agent_id: str = None, contract_address: str = None, recipients=None,
+                        run_id: str = None, concurrency: int = None) -> AsyncIterator[dict]:
+    """
+    Mint NFTs to many recipients, yielding progress events.
+
+    The minting runs as a `mint_nft_bulk` job (see `run_mint`), so it needs
+    running job workers; this generator only watches it, and closing it
+    (e.g. a client disconnecting) does not stop the run. Passing the
+    `run_id` of an unfinished run watches the job still minting it, or
+    resumes the run in a new job if it was interrupted: minted recipients
+    are skipped and failed ones are retried.
+
+    Args:
+        agent_id (str): The ID of the minting agent (new runs only).
+        contract_address (str): Address of the NFT contract (new runs only).
+        recipients: Iterable or async iterable of dicts with `to` and an
+            optional `quantity` (new runs only).
+        run_id (str, optional): The ID of a run to resume or watch.
+        concurrency (int, optional): Maximum number of mints in flight.
+
+    Yields:
+        dict: Progress events (`started`, `minted`, `failed`, `unconfirmed`,
+        `skipped`, `error`, `finished`).
+
+    Raises:
+        ValueError: If a recipient is invalid or the run does not exist,
+            before anything is minted.
+    """
+    if run_id is None:
+        run_id = await create_mint_run(agent_id, contract_address, recipients)
+
+    run = await get_mint_run(run_id)
+    if not run:
+        raise ValueError(f"Mint run {run_id} not found.")
+
+    # Fail here, not in the job, when the agent's wallet cannot be loaded
+    await load_wallet(run["agent_id"])
+    job_id = await _mint_run_job(run, concurrency)
+    counts = await count_mint_items(run_id)
+    yield {"event": "started", "run_id": run_id, "job_id": str(job_id), "total": run["total"],
+           "minted": counts.get("minted", 0)}
+
+    since, reported = None, set()
+    while True:
+        job = await get_job(str(job_id))
+        async for item in mint_item_events(run_id, job_id, since):
+            if item["updated_at"] != since:
+                since, reported = item["updated_at"], set()
+            if (item["_id"], item["event"]) in reported:
+                continue
+            reported.add((item["_id"], item["event"]))
+            yield _mint_event(item)
+
+        if job is None or job["state"] in FINISHED_STATES:
+            run = await get_mint_run(run_id)
+            if run.get("job_id") == job_id:
+                break
+            # Another stream handed the run to a newer job: follow it
+            job_id, since, reported = run["job_id"], None, set()
+            continue
+        await asyncio.sleep(BULK_MINT_POLL_INTERVAL)
+
+    if job is None or (job["state"] == "failed" and "result" not in job):
+        yield {"event": "error", "run_id": run_id,
+               "error": job.get("error") if job else "The mint job was never stored."}
+    counts = await count_mint_items(run_id)
+    yield {"event": "finished", "run_id": run_id, "total": run["total"], **counts}
+
+
 # Function to swap assets (only works on Base Mainnet)
+@instrument_tool
 async def swap_assets(agent_id: str, amount: Union[int, float, Decimal], from_asset_id: str,
-                to_asset_id: str):
+                to_asset_id: str, *, agent_wallet: "Wallet" = None):
     """
     Swap one asset for another using the trade function.
     This function only works on Base Mainnet.
@@ -375,22 +1393,15 @@ async def swap_assets(agent_id: str, amount: Union[int, float, Decimal], from_as
     Returns:
         str: Status message about the swap
     """
-    # Get agent details
-    agent_data = await get_agent(agent_id)
-
-    wallet_data = agent_data.get("wallet")
-    if not wallet_data:
-        raise ValueError("Wallet data not found for the agent.")
-
-    # Import the wallet
-    agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
+    # Load the agent wallet (cached across tool calls)
+    if agent_wallet is None:
+        agent_wallet = await load_wallet(agent_id)
 
     if agent_wallet.network_id != "base-mainnet":
         return "Error: Asset swaps are only available on Base Mainnet. Current network is not Base Mainnet."
 
     try:
-        trade = agent_wallet.trade(amount, from_asset_id, to_asset_id)
-        trade.wait()
+        await submit_and_wait(agent_wallet, "trade", amount, from_asset_id, to_asset_id)
         return f"Successfully swapped {amount} {from_asset_id} for {to_asset_id}"
     except Exception as e:
         return f"Error swapping assets: {str(e)}"
@@ -403,6 +1414,11 @@ L2_RESOLVER_ADDRESS_MAINNET = "0xC6d566A56A1aFf6508b41f6c90ff131615583BCD"
 L2_RESOLVER_ADDRESS_TESTNET = "0x6533C94869D28fAA8dF77cc63f9e2b2D6Cf77eBA"
 ENS_REGISTRAR_CONTROLLER_ADDRESS = ""
 
+# Basenames are registered for 1 year (in seconds)
+BASENAME_REGISTRATION_DURATION = 31557600
+# Margin paid over the quoted Basename price; the registrar refunds the excess
+BASENAME_PRICE_MARGIN = Decimal(os.getenv("BASENAME_PRICE_MARGIN", "0.1"))
+
 
 # Function to create registration arguments for Basenames
 def create_register_contract_method_args(base_name: str, address_id: str,
@@ -418,24 +1434,20 @@ def create_register_contract_method_args(base_name: str, address_id: str,
     Returns:
         dict: Formatted arguments for the register contract method
     """
-    w3 = Web3()
+    resolver_encoder = get_encoder("l2_resolver")
 
-    resolver_contract = w3.eth.contract(abi=l2_resolver_abi)
+    name_hash = namehash(base_name)
 
-    name_hash = w3.ens.namehash(base_name)
+    address_data = resolver_encoder.encode("setAddr", [name_hash, address_id])
 
-    address_data = resolver_contract.encode_abi("setAddr",
-                                                args=[name_hash, address_id])
-
-    name_data = resolver_contract.encode_abi("setName",
-                                             args=[name_hash, base_name])
+    name_data = resolver_encoder.encode("setName", [name_hash, base_name])
 
     register_args = {
         "request": [
             base_name.replace(".base.eth" if is_mainnet else ".basetest.eth",
                               ""),
             address_id,
-            "31557600",  # 1 year in seconds
+            str(BASENAME_REGISTRATION_DURATION),
             L2_RESOLVER_ADDRESS_MAINNET
             if is_mainnet else L2_RESOLVER_ADDRESS_TESTNET,
             [address_data, name_data],
@@ -447,7 +1459,8 @@ def create_register_contract_method_args(base_name: str, address_id: str,
 
 
 # Function to register a basename
-async def register_basename(agent_id: str, basename: str, amount: float = 0.002):
+@instrument_tool
+async def register_basename(agent_id: str, basename: str, amount: float = 0.002, *, agent_wallet: "Wallet" = None):
     """
     Register a basename for the agent's wallet.
     
@@ -458,15 +1471,11 @@ async def register_basename(agent_id: str, basename: str, amount: float = 0.002)
     Returns:
         str: Status message about the basename registration
     """
-    # Get agent details
-    agent_data = await get_agent(agent_id)
-
-    wallet_data = agent_data.get("wallet")
-    if not wallet_data:
-        raise ValueError("Wallet data not found for the agent.")
+    from web3.exceptions import ContractLogicError
 
-    # Import the wallet
-    agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
+    # Load the agent wallet (cached across tool calls)
+    if agent_wallet is None:
+        agent_wallet = await load_wallet(agent_id)
 
     address_id = agent_wallet.default_address.address_id
     is_mainnet = agent_wallet.network_id == "base-mainnet"
@@ -483,7 +1492,9 @@ async def register_basename(agent_id: str, basename: str, amount: float = 0.002)
                             if is_mainnet else
                             BASENAMES_REGISTRAR_CONTROLLER_ADDRESS_TESTNET)
 
-        invocation = agent_wallet.invoke_contract(
+        await submit_and_wait(
+            agent_wallet,
+            "invoke_contract",
             contract_address=contract_address,
             method="register",
             args=register_args,
@@ -491,7 +1502,6 @@ async def register_basename(agent_id: str, basename: str, amount: float = 0.002)
             amount=amount,
             asset_id="eth",
         )
-        invocation.wait()
         return f"Successfully registered basename {basename} for address {address_id}"
     except ContractLogicError as e:
         return f"Error registering basename: {str(e)}"
@@ -499,17 +1509,179 @@ async def register_basename(agent_id: str, basename: str, amount: float = 0.002)
         return f"Unexpected error registering basename: {str(e)}"
     
 
+def _basename_controller(agent_wallet: "Wallet") -> str:
+    if agent_wallet.network_id == "base-mainnet":
+        return BASENAMES_REGISTRAR_CONTROLLER_ADDRESS_MAINNET
+    return BASENAMES_REGISTRAR_CONTROLLER_ADDRESS_TESTNET
+
+
+async def check_basename(agent_wallet: "Wallet", basename: str) -> tuple:
+    """
+    Check whether a Basename is available and quote its price, without
+    sending a transaction.
+
+    Args:
+        agent_wallet (Wallet): A wallet on the network to check.
+        basename (str): The full Basename (e.g. "myname.basetest.eth").
+
+    Returns:
+        tuple: (available, price in ETH) for a registration of one year.
+    """
+    from cdp import SmartContract
+
+    label = basename.rsplit(".", 2)[0]
+    contract_address = _basename_controller(agent_wallet)
+    available, price = await asyncio.gather(
+        run_blocking(SmartContract.read, agent_wallet.network_id, contract_address, "available",
+                     abi=registrar_read_abi, args={"name": label}),
+        run_blocking(SmartContract.read, agent_wallet.network_id, contract_address, "registerPrice",
+                     abi=registrar_read_abi, args={"name": label, "duration": str(BASENAME_REGISTRATION_DURATION)}),
+    )
+    return bool(available), Decimal(int(price)) / Decimal(10 ** 18)
+
+
+async def _register_wallet_basenames(agent_id: str, items: List[tuple], results: List[dict]) -> None:
+    """
+    Check the Basenames of one agent in parallel, then register the
+    available ones in order and wait for them together.
+    """
+    try:
+        agent_wallet = await load_wallet(agent_id)
+    except Exception as e:
+        for index, _ in items:
+            results[index].update(status="failed", error=str(e))
+        return
+
+    address_id = agent_wallet.default_address.address_id
+    is_mainnet = agent_wallet.network_id == "base-mainnet"
+    suffix = ".base.eth" if is_mainnet else ".basetest.eth"
+    for index, item in items:
+        basename = item["basename"]
+        results[index]["basename"] = basename if basename.endswith(suffix) else basename + suffix
+
+    checks = await asyncio.gather(
+        *(check_basename(agent_wallet, results[index]["basename"]) for index, _ in items),
+        return_exceptions=True,
+    )
+
+    # Taken names are dropped before spending gas
+    to_register = []
+    for (index, item), check in zip(items, checks):
+        if isinstance(check, Exception):
+            results[index].update(status="failed", error=f"Error checking basename: {str(check)}")
+            continue
+        available, price = check
+        results[index]["price"] = str(price)
+        if not available:
+            results[index].update(status="taken")
+            continue
+        amount = item.get("amount") or price * (1 + BASENAME_PRICE_MARGIN)
+        to_register.append((index, Decimal(str(amount))))
+
+    # Submissions go through the wallet's queue in order; confirmations are awaited together
+    submitted = []
+    for index, amount in to_register:
+        # The resolver encoder and namehashes are cached, so each name costs one encode per record
+        register_args = create_register_contract_method_args(results[index]["basename"], address_id, is_mainnet)
+        try:
+            invocation = await submit_transaction(
+                agent_wallet,
+                "invoke_contract",
+                contract_address=_basename_controller(agent_wallet),
+                method="register",
+                args=register_args,
+                abi=registrar_abi,
+                amount=amount,
+                asset_id="eth",
+            )
+        except Exception as e:
+            results[index].update(status="failed", error=f"Error registering basename: {str(e)}")
+            continue
+        results[index]["amount"] = str(amount)
+        submitted.append((index, invocation))
+
+    confirmations = await asyncio.gather(
+        *(wait_for_transaction(agent_wallet, invocation) for _, invocation in submitted),
+        return_exceptions=True,
+    )
+    for (index, _), confirmed in zip(submitted, confirmations):
+        if isinstance(confirmed, Exception):
+            results[index].update(status="failed", error=f"Error registering basename: {str(confirmed)}")
+        else:
+            results[index].update(status="registered", tx_hash=confirmed.transaction_hash)
+
+
+async def register_basenames(registrations: List[dict]) -> dict:
+    """
+    Register Basenames for many agents at once.
+
+    Availability and price are checked in parallel with read-only calls,
+    names that are already taken are skipped before any gas is spent, and
+    the remaining registrations are submitted in order per wallet, under
+    the executor's global concurrency limit.
+
+    Args:
+        registrations (List[dict]): Items with agent_id, basename and an
+            optional amount of ETH to pay (defaults to the quoted price
+            plus `BASENAME_PRICE_MARGIN`).
+
+    Returns:
+        dict: Counts per status (registered, taken, failed, skipped) and
+            one result per item in input order.
+    """
+    results = []
+    by_agent = {}
+    seen = set()
+    for index, item in enumerate(registrations):
+        results.append({"index": index, "agent_id": item["agent_id"], "basename": item["basename"]})
+        # The same name can only be registered once per batch
+        name = item["basename"].lower().removesuffix(".base.eth").removesuffix(".basetest.eth")
+        if name in seen:
+            results[index].update(status="skipped", error="Duplicate basename in the batch.")
+            continue
+        seen.add(name)
+        by_agent.setdefault(item["agent_id"], []).append((index, item))
+
+    await asyncio.gather(*(
+        _register_wallet_basenames(agent_id, items, results)
+        for agent_id, items in by_agent.items()
+    ))
+
+    report = {status: 0 for status in ("registered", "taken", "failed", "skipped")}
+    for result in results:
+        report[result["status"]] += 1
+    report["results"] = results
+    return report
+
+
+# Minimum age of an ENS commitment before the register step is accepted
+ENS_COMMITMENT_WAIT_TIME = 60
+
+
+def _to_bytes32(secret: str) -> str:
+    """Return `secret` as a bytes32 hex string, hashing it if it is not one already."""
+    if secret.startswith("0x") and len(secret) == 66:
+        return secret
+    from web3 import Web3
+    return Web3.keccak(text=secret).to_0x_hex()
+
+
 def generate_commitment(name, owner, secret):
-    return web3.solidityKeccak(
+    from web3 import Web3
+    return Web3.solidity_keccak(
         ["string", "address", "bytes32"],
         [name, owner, secret]
-)
-    
+    ).to_0x_hex()
 
-async def register_ens_domain(agent_id:str, domain: str, owner: str, duration: int, secret: str, amount: float):
+
+@instrument_tool
+async def register_ens_domain(agent_id:str, domain: str, owner: str, duration: int, secret: str, amount: float, *, agent_wallet: "Wallet" = None):
     """
     Register an ENS domain.
 
+    The commit step is submitted right away; the register step is stored
+    and sent by the reveal worker once the commitment is old enough.
+
     Args:
         domain (str): The domain to register (e.g., "mydomain.eth")
         owner (str): Address of the owner.
@@ -520,52 +1692,92 @@ async def register_ens_domain(agent_id:str, domain: str, owner: str, duration: i
     Returns:
         str: Status message about the ENS domain registration.
     """
-    COMMITMENT_WAIT_TIME = 60  # Minimum wait time in seconds
+    from web3.exceptions import ContractLogicError
     try:
-        commitment = generate_commitment(domain, owner, secret)
+        label = domain.removesuffix(".eth")
+        secret = _to_bytes32(secret)
+        commitment = generate_commitment(label, owner, secret)
 
-        # Get agent details
-        agent_data = await get_agent(agent_id)
-
-        wallet_data = agent_data.get("wallet")
-        if not wallet_data:
-            raise ValueError("Wallet data not found for the agent.")
-
-        # Import the wallet
-        agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
+        # Load the agent wallet (cached across tool calls)
+        if agent_wallet is None:
+            agent_wallet = await load_wallet(agent_id)
 
         # Commit step
-        agent_wallet.invoke_contract(
+        await submit_and_wait(
+            agent_wallet,
+            "invoke_contract",
             contract_address=ENS_REGISTRAR_CONTROLLER_ADDRESS,
             method="commit",
-            args=[commitment],
+            args={"commitment": commitment},
             abi=commit_abi_ens,
         )
 
-        # Wait for the commitment period (ENS-specific delay)
-        time.sleep(COMMITMENT_WAIT_TIME)
-
-        # Register step
-        args = create_register_contract_method_args(domain, owner, duration, secret)
-        invocation = agent_wallet.invoke_contract(
-            contract_address=ENS_REGISTRAR_CONTROLLER_ADDRESS,
-            method="register",
-            args=args,
-            abi=registrar_abi_ens,
-            amount=amount,
-            asset_id="eth",
+        # The register step is due once the commitment period has passed
+        due_at = datetime.now(timezone.utc) + timedelta(seconds=ENS_COMMITMENT_WAIT_TIME)
+        reveal_id = await schedule_reveal(agent_id, domain, owner, duration, secret, amount, due_at)
+        return (
+            f"Commitment for domain {domain} submitted. Registration for owner {owner} "
+            f"is scheduled after {due_at.isoformat()} (reveal ID {reveal_id})."
         )
-        invocation.wait()
-        return f"Successfully registered domain {domain} for owner {owner}"
     except ContractLogicError as e:
         return f"Error registering ENS domain: {str(e)}"
     except Exception as e:
         return f"Unexpected error registering ENS domain: {str(e)}"
 
-    
+
+async def reveal_ens_domain(reveal: dict) -> str:
+    """
+    Submit the register step of a scheduled ENS registration.
+
+    Called by the reveal worker in `ai_agent.ens_scheduler`. The hash of
+    the register transaction is stored on the reveal before waiting for
+    it. When an earlier attempt already sent one, the name is checked on
+    chain instead: a taken name means that registration went through, and
+    only a name that is still available is registered again.
+
+    Args:
+        reveal (dict): The scheduled reveal record.
+
+    Returns:
+        str: Status message about the ENS domain registration.
+    """
+    from cdp import SmartContract
+
+    agent_wallet = await load_wallet(reveal["agent_id"])
+    label = reveal["domain"].removesuffix(".eth")
+
+    if reveal.get("tx_hash"):
+        available = await run_blocking(SmartContract.read, agent_wallet.network_id, ENS_REGISTRAR_CONTROLLER_ADDRESS,
+                                       "available", abi=registrar_read_abi, args={"name": label})
+        if not available:
+            return (f"Successfully registered domain {reveal['domain']} for owner {reveal['owner']} "
+                    f"(transaction {reveal['tx_hash']})")
+        # The earlier transaction failed or was dropped; if it is only late, the new one reverts
+
+    args = {
+        "name": label,
+        "owner": reveal["owner"],
+        "duration": str(reveal["duration"]),
+        "secret": reveal["secret"],
+    }
+    invocation = await submit_transaction(
+        agent_wallet,
+        "invoke_contract",
+        contract_address=ENS_REGISTRAR_CONTROLLER_ADDRESS,
+        method="register",
+        args=args,
+        abi=registrar_abi_ens,
+        amount=reveal["amount"],
+        asset_id="eth",
+    )
+    await record_reveal_tx(reveal["_id"], invocation.transaction_hash)
+    await wait_for_transaction(agent_wallet, invocation)
+    return f"Successfully registered domain {reveal['domain']} for owner {reveal['owner']}"
+
 
 # Function to register a basename
-async def interact_vault(agent_id: str, vault_address: str, action: str, amount: float, receiver: str):
+@instrument_tool
+async def interact_vault(agent_id: str, vault_address: str, action: str, amount: float, receiver: str, *, agent_wallet: "Wallet" = None):
     """
     Interact with a vault contract (deposit or withdraw).
 
@@ -579,21 +1791,18 @@ async def interact_vault(agent_id: str, vault_address: str, action: str, amount:
     Returns:
         str: Status message about the vault interaction.
     """
-    # Get agent details
-    agent_data = await get_agent(agent_id)
-
-    wallet_data = agent_data.get("wallet")
-    if not wallet_data:
-        raise ValueError("Wallet data not found for the agent.")
-
-    # Import the wallet
-    agent_wallet = Wallet.import_data(WalletData(wallet_data.get("wallet_id"), wallet_data.get("seed")))
+    from web3.exceptions import ContractLogicError
+    # Load the agent wallet (cached across tool calls)
+    if agent_wallet is None:
+        agent_wallet = await load_wallet(agent_id)
 
     try:
         if action == "deposit":
             # Prepare arguments for deposit
             vault_args = [amount, receiver]
-            invocation = agent_wallet.invoke_contract(
+            await submit_and_wait(
+                agent_wallet,
+                "invoke_contract",
                 contract_address=vault_address,
                 method="deposit",
                 args=vault_args,
@@ -603,7 +1812,9 @@ async def interact_vault(agent_id: str, vault_address: str, action: str, amount:
             # Prepare arguments for withdraw
             owner = agent_wallet.default_address.address_id
             vault_args = [amount, receiver, owner]
-            invocation = agent_wallet.invoke_contract(
+            await submit_and_wait(
+                agent_wallet,
+                "invoke_contract",
                 contract_address=vault_address,
                 method="withdraw",
                 args=vault_args,
@@ -612,7 +1823,6 @@ async def interact_vault(agent_id: str, vault_address: str, action: str, amount:
         else:
             return f"Invalid action '{action}'. Valid actions are 'deposit' or 'withdraw'."
 
-        invocation.wait()
         return f"Successfully performed {action} of {amount} assets on the vault for receiver {receiver}."
     except ContractLogicError as e:
         return f"Error performing {action} on vault: {str(e)}"
@@ -625,7 +1835,7 @@ based_agent = Agent(
     name="Based Agent",
     instructions=
     "You are a helpful agent that can interact onchain on the Base Layer 2 using the Coinbase Developer Platform SDK. You can create tokens, transfer assets, generate art, deploy NFTs, mint NFTs, register basenames, and swap assets (on mainnet only). If you ever need to know your address, it is {agent_wallet.default_address.address_id}. If you ever need funds, you can request them from the faucet. You can also deploy your own ERC-20 tokens, NFTs, and interact with them. If someone asks you to do something you can't do, you can say so, and encourage them to implement it themselves using the CDP SDK, recommend they go to docs.cdp.coinbase.com for more informaton. You can also offer to help them implement it by writing the function and telling them to add it to the agents.py file and within your list of callable functions.",
-    functions=[
+    functions=sync_tools([
         create_token,
         transfer_asset,
         get_balance,
@@ -637,9 +1847,166 @@ based_agent = Agent(
         register_basename,
         register_ens_domain,
         interact_vault
-    ],
+    ]),
 )
 
+
+class BoundWallet:
+    """
+    The resolved wallet of an agent, passed to its tools through Swarm
+    `context_variables`. Swarm deep-copies the context variables of every
+    run, so the handle copies to itself instead of cloning the wallet.
+    """
+
+    def __init__(self, agent_id: str, wallet: "Wallet"):
+        self.agent_id = agent_id
+        self.wallet = wallet
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+async def agent_context(agent_id: str) -> dict:
+    """
+    Build the Swarm `context_variables` of a turn of an agent: its ID and
+    its wallet, resolved once for all the tool calls of the turn.
+
+    Args:
+        agent_id (str): The ID of the agent.
+
+    Returns:
+        dict: `agent_id`, and `agent_wallet` when the wallet could be loaded
+            (otherwise tools load it themselves and report the error).
+    """
+    context_variables = {"agent_id": agent_id}
+    try:
+        context_variables["agent_wallet"] = BoundWallet(agent_id, await load_wallet(agent_id))
+    except Exception:
+        logger.warning("Failed to load the wallet of agent %s", agent_id, exc_info=True)
+    return context_variables
+
+
+def bind_agent_context(fn):
+    """
+    Wrap a tool taking `agent_id` and `agent_wallet` so the agent and its
+    loaded wallet come from Swarm `context_variables` instead of from the
+    model.
+
+    Both are removed from the signature (and so from the JSON schema sent
+    to the model) and a `context_variables` parameter is added, which
+    Swarm fills in. The wallet resolved by `agent_context` is passed to
+    the tool as `agent_wallet`; without one the tool loads it itself.
+    """
+    signature = inspect.signature(fn)
+    parameters = [parameter for name, parameter in signature.parameters.items()
+                  if name not in ("agent_id", "agent_wallet")]
+    parameters.append(inspect.Parameter("context_variables", inspect.Parameter.KEYWORD_ONLY, default=None))
+
+    @functools.wraps(fn)
+    def _tool(*args, context_variables: dict = None, **kwargs):
+        agent_id = (context_variables or {}).get("agent_id")
+        if not agent_id:
+            return "Error: No agent is bound to this conversation."
+        bound = context_variables.get("agent_wallet")
+        return fn(*args, agent_id=agent_id, agent_wallet=bound.wallet if bound is not None else None, **kwargs)
+
+    _tool.__signature__ = signature.replace(parameters=parameters)
+    return _tool
+
+
+# Tools of the Based Agent by name, bound to the agent of the turn
+agent_tools = {function.__name__: bind_agent_context(function) for function in based_agent.functions}
+
+# Comma-separated tools given to agents without a `tools` list (empty for all of them)
+AGENT_DEFAULT_TOOLS = [name.strip() for name in os.getenv("AGENT_DEFAULT_TOOLS", "").split(",") if name.strip()]
+
+
+def validate_tool_names(tools: List[str] = None) -> None:
+    """
+    Check that every name of a per-agent `tools` list is a Based Agent tool.
+
+    Raises:
+        ValueError: If a tool name is unknown.
+    """
+    unknown = [name for name in tools or [] if name not in agent_tools]
+    if unknown:
+        raise ValueError(f"Unknown tools: {', '.join(unknown)}. Available tools: {', '.join(agent_tools)}.")
+
+
+async def set_agent_tools(agent_id: str, tools: List[str] = None) -> None:
+    """
+    Set the tools an agent can call.
+
+    Args:
+        agent_id (str): The ID of the agent.
+        tools (List[str], optional): Names of the tools, or None for `AGENT_DEFAULT_TOOLS`.
+
+    Raises:
+        ValueError: If the agent ID or a tool name is invalid, or the agent is not found.
+    """
+    try:
+        object_id = ObjectId(agent_id)
+    except InvalidId:
+        raise ValueError("Invalid agent ID format.")
+    validate_tool_names(tools)
+
+    result = await agent_collection.update_one({"_id": object_id}, {"$set": {"tools": tools}})
+    invalidate_agent(agent_id)
+    if result.matched_count == 0:
+        raise ValueError(f"Agent with ID {agent_id} not found.")
+
+
+def agent_address(agent_data: dict) -> Optional[str]:
+    """
+    Return the wallet address of an agent document, or None if it has none.
+
+    Agents saved before the address had its own field keep it in `wallet`.
+    """
+    if agent_data.get("address"):
+        return agent_data["address"]
+    wallet = agent_data.get("wallet")
+    return wallet if isinstance(wallet, str) else None
+
+
+def build_agent(agent_data: dict) -> Agent:
+    """
+    Build a Swarm agent from an `agents` document, with the Based Agent tools.
+
+    Only the tools named in the document's `tools` list (or in
+    `AGENT_DEFAULT_TOOLS`) are given to the model, so an agent that never
+    registers ENS domains does not pay for that tool's schema on every turn.
+    The tools take the agent from the `context_variables` built by
+    `agent_context`, so the model never has to pass `agent_id`.
+
+    Args:
+        agent_data (dict): The agent document from MongoDB.
+
+    Returns:
+        Agent: The Swarm agent.
+    """
+    # Only the address goes into the prompt; the wallet data holds the seed
+    address = agent_address(agent_data)
+    instructions = agent_data.get("instructions", "")
+    if address:
+        instructions = f"{instructions}\n\nYour wallet address is {address}."
+    return Agent(
+        name=agent_data.get("name") or based_agent.name,
+        instructions=instructions,
+        functions=select_tools(agent_data.get("tools")),
+    )
+
+
+def select_tools(tools: List[str] = None) -> list:
+    """
+    Return the bound Based Agent tools named in `tools`, in the Based Agent
+    order. Unknown names (e.g. tools removed since the agent was saved) are ignored.
+    """
+    if tools is None:
+        if not AGENT_DEFAULT_TOOLS:
+            return list(agent_tools.values())
+        tools = AGENT_DEFAULT_TOOLS
+    return [function for name, function in agent_tools.items() if name in tools]
+
 # ABIs for smart contracts (used in basename registration)
 l2_resolver_abi = [{
     "inputs": [{
@@ -720,6 +2087,41 @@ registrar_abi = [{
     "function"
 }]
 
+# Read-only functions of the Basenames registrar controller
+registrar_read_abi = [{
+    "inputs": [{
+        "internalType": "string",
+        "name": "name",
+        "type": "string"
+    }],
+    "name": "available",
+    "outputs": [{
+        "internalType": "bool",
+        "name": "",
+        "type": "bool"
+    }],
+    "stateMutability": "view",
+    "type": "function"
+}, {
+    "inputs": [{
+        "internalType": "string",
+        "name": "name",
+        "type": "string"
+    }, {
+        "internalType": "uint256",
+        "name": "duration",
+        "type": "uint256"
+    }],
+    "name": "registerPrice",
+    "outputs": [{
+        "internalType": "uint256",
+        "name": "",
+        "type": "uint256"
+    }],
+    "stateMutability": "view",
+    "type": "function"
+}]
+
 commit_abi_ens = [
     {
         "inputs": [
@@ -801,4 +2203,11 @@ vault_abi = [
         "stateMutability": "nonpayable",
         "type": "function"
     }
-]
\ No newline at end of file
+]
+
+# Calldata encoders are built once per ABI, on first use
+register_abi("l2_resolver", l2_resolver_abi)
+register_abi("registrar", registrar_abi)
+register_abi("registrar_ens", registrar_abi_ens)
+register_abi("commit_ens", commit_abi_ens)
+register_abi("vault", vault_abi)
@@ -0,0 +1,59 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# MongoDB connection setup
+MONGODB_URL = os.getenv("MONGODB_URL")
+
+# The Motor client is created on first use, so importing this module stays cheap
+_client = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the shared Motor client, creating it on first use.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            _client = AsyncIOMotorClient(MONGODB_URL)
+        return _client
+
+
+def get_database():
+    """
+    Return the `ai` database of the shared client.
+    """
+    return get_client().get_database("ai")
+
+
+class LazyCollection:
+    """
+    A collection of the `ai` database that is only resolved (and the
+    client created) when it is first used.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._collection = None
+
+    def __getattr__(self, attribute):
+        if self._collection is None:
+            self._collection = get_database().get_collection(self.name)
+        return getattr(self._collection, attribute)
+
+
+def get_collection(name: str) -> LazyCollection:
+    """
+    Return a lazily resolved collection of the `ai` database.
+    """
+    return LazyCollection(name)
+
+
+agent_collection = get_collection("agents")
@@ -0,0 +1,193 @@
+import os
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+from ai_agent.db import get_collection
+
+# Pending ENS reveals (the register step of commit/reveal) are persisted here
+reveal_collection = get_collection("ens_reveals")
+
+# Seconds between polls for due reveals when none are scheduled sooner
+REVEAL_POLL_INTERVAL = float(os.getenv("ENS_REVEAL_POLL_INTERVAL", "5"))
+# Maximum number of reveals submitted at the same time
+REVEAL_CONCURRENCY = int(os.getenv("ENS_REVEAL_CONCURRENCY", "8"))
+# Seconds after which a claimed reveal that never finished is picked up again
+REVEAL_LEASE = float(os.getenv("ENS_REVEAL_LEASE", "600"))
+# Number of times a reveal is attempted before it is marked as failed
+REVEAL_MAX_ATTEMPTS = int(os.getenv("ENS_REVEAL_MAX_ATTEMPTS", "3"))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def schedule_reveal(agent_id: str, domain: str, owner: str, duration: int,
+                          secret: str, amount: float, due_at: datetime) -> str:
+    """
+    Store a pending ENS reveal to be submitted once the commitment has aged.
+
+    Args:
+        agent_id (str): The ID of the agent that made the commitment.
+        domain (str): The domain being registered.
+        owner (str): Address of the owner.
+        duration (int): Duration of the registration in seconds.
+        secret (str): The bytes32 secret used in the commitment (hex).
+        amount (float): Amount of ETH to pay for registration.
+        due_at (datetime): Earliest time the register step may be sent.
+
+    Returns:
+        str: The ID of the scheduled reveal.
+    """
+    reveal = {
+        "agent_id": agent_id,
+        "domain": domain,
+        "owner": owner,
+        "duration": duration,
+        "secret": secret,
+        "amount": amount,
+        "due_at": due_at,
+        "status": "pending",
+        "attempts": 0,
+        "created_at": _now(),
+    }
+    result = await reveal_collection.insert_one(reveal)
+    return str(result.inserted_id)
+
+
+async def get_reveal(reveal_id: str) -> Optional[dict]:
+    """
+    Retrieve a scheduled reveal by ID, without its commitment secret.
+
+    Raises:
+        ValueError: If the reveal ID is invalid.
+    """
+    try:
+        reveal_id = ObjectId(reveal_id)
+    except InvalidId:
+        raise ValueError("Invalid reveal ID format.")
+
+    # Anyone holding the secret could front-run the registration before it is revealed
+    return await reveal_collection.find_one({"_id": reveal_id}, {"secret": 0})
+
+
+async def record_reveal_tx(reveal_id: ObjectId, tx_hash: str) -> None:
+    """
+    Store the hash of a submitted register transaction on its reveal,
+    before waiting for it, so a retry checks that registration instead of
+    sending it again.
+    """
+    await reveal_collection.update_one({"_id": reveal_id},
+                                       {"$set": {"tx_hash": tx_hash, "submitted_at": _now()}})
+
+
+async def claim_due_reveal() -> Optional[dict]:
+    """
+    Atomically claim the oldest reveal that is due, or whose previous claim
+    expired (e.g. the process restarted mid-reveal).
+
+    Returns:
+        dict: The claimed reveal, or None if nothing is due.
+    """
+    now = _now()
+    return await reveal_collection.find_one_and_update(
+        {
+            "$or": [
+                {"status": "pending", "due_at": {"$lte": now}},
+                {"status": "revealing", "lease_expires_at": {"$lte": now}},
+            ]
+        },
+        {
+            "$set": {
+                "status": "revealing",
+                "lease_expires_at": now + timedelta(seconds=REVEAL_LEASE),
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("due_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _seconds_until_next_due() -> float:
+    """Seconds until the next pending reveal is due, capped at the poll interval."""
+    upcoming = await reveal_collection.find_one(
+        {"status": "pending"}, sort=[("due_at", 1)], projection={"due_at": 1})
+    if not upcoming:
+        return REVEAL_POLL_INTERVAL
+
+    due_at = upcoming["due_at"]
+    if due_at.tzinfo is None:
+        due_at = due_at.replace(tzinfo=timezone.utc)
+    return max(0.1, min(REVEAL_POLL_INTERVAL, (due_at - _now()).total_seconds()))
+
+
+async def _process_reveal(reveal: dict, handler: Callable[[dict], Awaitable[str]]) -> None:
+    try:
+        result = await handler(reveal)
+        update = {"status": "done", "result": result, "finished_at": _now()}
+    except Exception as e:
+        # Retry later unless we are out of attempts
+        if reveal["attempts"] < REVEAL_MAX_ATTEMPTS:
+            update = {"status": "pending", "error": str(e),
+                      "due_at": _now() + timedelta(seconds=REVEAL_POLL_INTERVAL)}
+        else:
+            update = {"status": "failed", "error": str(e), "finished_at": _now()}
+
+    await reveal_collection.update_one({"_id": reveal["_id"]}, {"$set": update})
+
+
+async def run_reveal_worker(handler: Callable[[dict], Awaitable[str]]) -> None:
+    """
+    Background loop that submits ENS reveals as they become due.
+
+    Reveals are claimed one at a time from MongoDB and processed
+    concurrently (up to `REVEAL_CONCURRENCY`), so many registrations can
+    overlap. Because pending reveals live in MongoDB, they are resumed
+    after a restart.
+
+    Args:
+        handler (Callable): Coroutine function that submits the register
+            step for a reveal record and returns a status message. It
+            records the transaction with `record_reveal_tx` before waiting
+            for it, and checks a recorded one before submitting again.
+    """
+    slots = asyncio.Semaphore(REVEAL_CONCURRENCY)
+    tasks = set()
+
+    async def _run(reveal):
+        try:
+            await _process_reveal(reveal, handler)
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            try:
+                while True:
+                    await slots.acquire()
+                    try:
+                        reveal = await claim_due_reveal()
+                    except Exception:
+                        slots.release()
+                        raise
+                    if reveal is None:
+                        slots.release()
+                        break
+                    task = asyncio.create_task(_run(reveal))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                await asyncio.sleep(await _seconds_until_next_due())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"ENS reveal worker error: {str(e)}")
+                await asyncio.sleep(REVEAL_POLL_INTERVAL)
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,186 @@
+import os
+import asyncio
+import contextvars
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Size of the thread pool used for blocking CDP SDK / web3 calls
+MAX_WORKERS = int(os.getenv("CDP_EXECUTOR_WORKERS", "32"))
+# Maximum number of blocking calls in flight across all wallets
+MAX_CONCURRENCY = int(os.getenv("CDP_MAX_CONCURRENCY", "16"))
+# Maximum number of writes queued behind a single wallet before callers are rejected
+MAX_PENDING_PER_WALLET = int(os.getenv("CDP_MAX_PENDING_PER_WALLET", "100"))
+# Seconds an idle wallet writer waits for new work before it exits
+WRITER_IDLE_TIMEOUT = float(os.getenv("CDP_WRITER_IDLE_TIMEOUT", "30"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+# Queues and semaphores are bound to an event loop, so keep one set per loop
+_loop_limits = weakref.WeakKeyDictionary()
+
+
+class WalletBusyError(RuntimeError):
+    """Raised when a wallet already has too many writes queued."""
+
+
+class _WalletQueue:
+    """
+    Ordered submission queue of one wallet address.
+
+    A single writer task drains the queue, so writes from the same address
+    never race for a nonce, while different addresses write in parallel.
+    """
+
+    def __init__(self, limits: "_Limits", wallet_key: str):
+        self.limits = limits
+        self.wallet_key = wallet_key
+        self.queue = asyncio.Queue(maxsize=MAX_PENDING_PER_WALLET)
+        self.writer = None
+
+    def submit(self, call: Callable) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((call, future))
+        except asyncio.QueueFull:
+            raise WalletBusyError(
+                f"Wallet {self.wallet_key} has {MAX_PENDING_PER_WALLET} transactions pending. Please retry later.")
+
+        if self.writer is None or self.writer.done():
+            self.writer = asyncio.create_task(self._write())
+        return future
+
+    async def _write(self):
+        while True:
+            try:
+                call, future = await asyncio.wait_for(self.queue.get(), WRITER_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if self.queue.empty():
+                    # Forget idle wallets so the table does not grow without bound
+                    self.limits.wallets.pop(self.wallet_key, None)
+                    return
+                continue
+
+            # The caller gave up while the write was queued
+            if future.cancelled():
+                continue
+            try:
+                result = await self.limits.run(call)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+
+class _Limits:
+    """Global semaphore and per-wallet submission queues for one event loop."""
+
+    def __init__(self):
+        self.global_slots = asyncio.Semaphore(MAX_CONCURRENCY)
+        self.wallets = {}
+        self.in_flight = 0
+
+    async def run(self, call: Callable) -> Any:
+        async with self.global_slots:
+            self.in_flight += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(get_executor(), call)
+            finally:
+                self.in_flight -= 1
+
+    def wallet(self, wallet_key: str) -> _WalletQueue:
+        queue = self.wallets.get(wallet_key)
+        if queue is None:
+            queue = self.wallets[wallet_key] = _WalletQueue(self, wallet_key)
+        return queue
+
+
+def _limits() -> _Limits:
+    loop = asyncio.get_running_loop()
+    limits = _loop_limits.get(loop)
+    if limits is None:
+        limits = _loop_limits[loop] = _Limits()
+    return limits
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the shared thread pool for blocking CDP work, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="cdp")
+    return _executor
+
+
+def configure_executor(max_workers: int = None, max_concurrency: int = None,
+                       max_pending_per_wallet: int = None) -> None:
+    """
+    Change the executor limits. Takes effect for event loops and wallets
+    that have not been used yet; the thread pool is rebuilt on next use.
+
+    Args:
+        max_workers (int, optional): Size of the thread pool.
+        max_concurrency (int, optional): Global cap on blocking calls in flight.
+        max_pending_per_wallet (int, optional): Cap on writes queued per wallet.
+    """
+    global MAX_WORKERS, MAX_CONCURRENCY, MAX_PENDING_PER_WALLET, _executor
+    if max_workers is not None:
+        MAX_WORKERS = max_workers
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+    if max_concurrency is not None:
+        MAX_CONCURRENCY = max_concurrency
+    if max_pending_per_wallet is not None:
+        MAX_PENDING_PER_WALLET = max_pending_per_wallet
+    _loop_limits.clear()
+
+
+async def run_blocking(fn: Callable, *args, wallet_key: str = None, **kwargs) -> Any:
+    """
+    Run a blocking function in the CDP thread pool without blocking the event loop.
+
+    Calls are capped globally by `MAX_CONCURRENCY`. Calls that pass a
+    `wallet_key` (writes) go through that wallet's ordered submission
+    queue: one write at a time per address, in arrival order. A wallet
+    queue holding `MAX_PENDING_PER_WALLET` writes rejects new ones.
+
+    Args:
+        fn (Callable): The blocking function to run.
+        wallet_key (str, optional): Address of the wallet the call writes from.
+
+    Returns:
+        Any: The return value of `fn`.
+
+    Raises:
+        WalletBusyError: If the wallet's submission queue is full.
+    """
+    limits = _limits()
+    # Carry context variables (e.g. tracing state) into the worker thread
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    if wallet_key is None:
+        return await limits.run(call)
+    return await limits.wallet(wallet_key).submit(call)
+
+
+def executor_stats() -> dict:
+    """
+    Return the executor configuration and the load of the current event loop.
+    """
+    try:
+        limits = _limits()
+    except RuntimeError:
+        limits = None
+    wallets = limits.wallets.values() if limits else []
+    return {
+        "max_workers": MAX_WORKERS,
+        "max_concurrency": MAX_CONCURRENCY,
+        "max_pending_per_wallet": MAX_PENDING_PER_WALLET,
+        "in_flight": limits.in_flight if limits else 0,
+        "active_wallets": len(wallets),
+        "pending_writes": sum(queue.queue.qsize() for queue in wallets),
+    }
@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from ai_agent.db import get_collection
+from ai_agent.jobs import job_collection
+
+# Idempotency keys of write requests and the job each one started
+idempotency_collection = get_collection("idempotency_keys")
+
+# Seconds an idempotency key is remembered (enforced by a TTL index)
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+# Longest accepted Idempotency-Key header
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Seconds after which a reservation whose job was never stored (the process
+# died in between) is taken over by a retry
+IDEMPOTENCY_RESERVATION_GRACE = float(os.getenv("IDEMPOTENCY_RESERVATION_GRACE", "30"))
+
+
+class IdempotencyKeyReusedError(ValueError):
+    """Raised when an idempotency key is sent again with a different request."""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _fingerprint(kind: str, params: dict) -> str:
+    payload = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def ensure_idempotency_indexes() -> None:
+    """
+    Create the TTL index that expires idempotency keys after `IDEMPOTENCY_KEY_TTL` seconds.
+    """
+    await idempotency_collection.create_index("created_at", expireAfterSeconds=IDEMPOTENCY_KEY_TTL)
+
+
+async def reserve_idempotency_key(key: str, kind: str, params: dict) -> Tuple[ObjectId, bool]:
+    """
+    Bind an idempotency key to a new job ID, or return the job ID it is
+    already bound to.
+
+    The key is stored with the job ID before the job is submitted, so a
+    retry that arrives while the first request is still running attaches
+    to the same job instead of sending the transaction again. If that job
+    was still not stored `IDEMPOTENCY_RESERVATION_GRACE` seconds later,
+    the request that reserved it is gone and the retry takes the key over
+    with a new job ID.
+
+    Args:
+        key (str): The Idempotency-Key header.
+        kind (str): The job kind of the request.
+        params (dict): The job params of the request.
+
+    Returns:
+        tuple: The job ID and whether it is new (the caller must submit it).
+
+    Raises:
+        ValueError: If the key is empty or too long.
+        IdempotencyKeyReusedError: If the key was used for a different request.
+    """
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise ValueError(f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters.")
+
+    fingerprint = _fingerprint(kind, params)
+    job_id = ObjectId()
+    try:
+        await idempotency_collection.insert_one({
+            "_id": key,
+            "kind": kind,
+            "fingerprint": fingerprint,
+            "job_id": job_id,
+            "created_at": _now(),
+        })
+        return job_id, True
+    except DuplicateKeyError:
+        pass
+
+    existing = await idempotency_collection.find_one({"_id": key})
+    if existing is None:
+        # Expired between the insert and the read; a fresh reservation is safe
+        return await reserve_idempotency_key(key, kind, params)
+    if existing["fingerprint"] != fingerprint:
+        raise IdempotencyKeyReusedError("Idempotency-Key was already used for a different request.")
+
+    if await job_collection.find_one({"_id": existing["job_id"]}, {"_id": 1}) is None:
+        # Conditional on the old job ID, so only one retry takes an abandoned key over
+        result = await idempotency_collection.update_one(
+            {"_id": key, "job_id": existing["job_id"],
+             "created_at": {"$lt": _now() - timedelta(seconds=IDEMPOTENCY_RESERVATION_GRACE)}},
+            {"$set": {"job_id": job_id, "created_at": _now()}},
+        )
+        if result.modified_count:
+            return job_id, True
+        # Still within the grace period, or another retry took it over first
+        existing = await idempotency_collection.find_one({"_id": key}) or existing
+    return existing["job_id"], False
+
+
+async def release_idempotency_key(key: str, job_id: ObjectId) -> None:
+    """
+    Forget a reservation whose job could not be submitted, so a retry
+    with the same key can run.
+    """
+    await idempotency_collection.delete_one({"_id": key, "job_id": job_id})
@@ -0,0 +1,275 @@
+import os
+import socket
+import asyncio
+import contextvars
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from ai_agent.db import get_collection
+
+# Job records for asynchronous transaction endpoints
+job_collection = get_collection("jobs")
+
+# Number of background workers executing jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "8"))
+# Seconds a running job stays owned by its process without a heartbeat;
+# after that it is considered interrupted (the process died)
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+
+# Owner recorded on the jobs this process runs
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{ObjectId()}"
+
+# Coroutine functions that can be run as jobs, keyed by job kind
+_job_handlers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+_job_queue: Optional[asyncio.Queue] = None
+
+# Transaction hashes recorded while the current job runs
+_tx_hashes = contextvars.ContextVar("tx_hashes", default=None)
+
+# Tool functions report failures as messages starting with these prefixes
+_ERROR_PREFIXES = ("Error", "Unexpected error", "Insufficient balance", "Invalid action")
+
+# States of a job that will not change anymore
+FINISHED_STATES = ("succeeded", "partial", "failed")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def register_job(kind: str, handler: Callable[..., Awaitable[Any]]) -> None:
+    """
+    Register a coroutine function that can be submitted as a job.
+
+    Args:
+        kind (str): The job kind (e.g. "create_token").
+        handler (Callable): Coroutine function called with the job params.
+    """
+    _job_handlers[kind] = handler
+
+
+def record_tx_hash(tx_hash: Optional[str]) -> None:
+    """
+    Attach a transaction hash to the job running in the current context.
+    Does nothing outside of a job.
+    """
+    hashes = _tx_hashes.get()
+    if hashes is not None and tx_hash:
+        hashes.append(tx_hash)
+
+
+def serialize_job(job: dict) -> dict:
+    """
+    Convert a job record into a JSON-serializable dict.
+    """
+    job = dict(job)
+    job["id"] = str(job.pop("_id"))
+    for start, end, field in (("created_at", "started_at", "queue_time"),
+                              ("started_at", "finished_at", "run_time")):
+        if job.get(start) and job.get(end):
+            job[field] = (job[end] - job[start]).total_seconds()
+    return job
+
+
+async def submit_job(kind: str, params: dict, job_id: ObjectId = None) -> str:
+    """
+    Store a new job and hand it to the workers.
+
+    Args:
+        kind (str): A registered job kind.
+        params (dict): Keyword arguments for the job handler.
+        job_id (ObjectId, optional): ID to store the job with, when the
+            caller handed it out before submitting (idempotency keys).
+
+    Returns:
+        str: The ID of the job.
+
+    Raises:
+        ValueError: If the job kind is not registered.
+    """
+    if kind not in _job_handlers:
+        raise ValueError(f"Unknown job kind '{kind}'.")
+
+    job = {
+        "kind": kind,
+        "params": params,
+        "agent_id": params.get("agent_id"),
+        "state": "queued",
+        "tx_hashes": [],
+        "created_at": _now(),
+    }
+    if job_id is not None:
+        job["_id"] = job_id
+    result = await job_collection.insert_one(job)
+    # Without running workers (e.g. CLI use) the job is picked up at next startup
+    if _job_queue is not None:
+        _job_queue.put_nowait(result.inserted_id)
+    return str(result.inserted_id)
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    """
+    Retrieve a job by ID.
+
+    Raises:
+        ValueError: If the job ID is invalid.
+    """
+    try:
+        job_id = ObjectId(job_id)
+    except InvalidId:
+        raise ValueError("Invalid job ID format.")
+
+    return await job_collection.find_one({"_id": job_id})
+
+
+async def list_jobs(state: str = None, kind: str = None, agent_id: str = None,
+                    limit: int = 50) -> List[dict]:
+    """
+    List the most recent jobs, optionally filtered.
+
+    Args:
+        state (str, optional): Only jobs in this state.
+        kind (str, optional): Only jobs of this kind.
+        agent_id (str, optional): Only jobs of this agent.
+        limit (int): Maximum number of jobs returned.
+
+    Returns:
+        List[dict]: The jobs, newest first.
+    """
+    query = {}
+    if state:
+        query["state"] = state
+    if kind:
+        query["kind"] = kind
+    if agent_id:
+        query["agent_id"] = agent_id
+
+    cursor = job_collection.find(query).sort("created_at", -1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def _heartbeat(job_id: ObjectId) -> None:
+    # Renew the lease well before it runs out, so a slow write never loses it
+    while True:
+        await asyncio.sleep(JOB_LEASE / 3)
+        await job_collection.update_one(
+            {"_id": job_id, "state": "running", "owner": WORKER_ID},
+            {"$set": {"lease_until": _now() + timedelta(seconds=JOB_LEASE)}},
+        )
+
+
+def _result_state(result: Any) -> Dict[str, Any]:
+    """
+    Derive the final state of a job from its handler's result.
+
+    Batch handlers return a count of failed items along with either their
+    per-item results or a `total`: the job is "partial" when only some of
+    the items failed, and "failed" when all of them did.
+    """
+    if isinstance(result, str) and result.startswith(_ERROR_PREFIXES):
+        return {"state": "failed", "error": result}
+    if isinstance(result, dict) and result.get("failed"):
+        failed = result["failed"]
+        total = len(result["results"]) if isinstance(result.get("results"), list) else result.get("total")
+        if total:
+            return {"state": "failed" if failed >= total else "partial",
+                    "error": f"{failed} of {total} items failed."}
+    return {"state": "succeeded"}
+
+
+async def _run_job(job_id: ObjectId) -> None:
+    job = await job_collection.find_one_and_update(
+        {"_id": job_id, "state": "queued"},
+        {"$set": {"state": "running", "started_at": _now(), "owner": WORKER_ID,
+                  "lease_until": _now() + timedelta(seconds=JOB_LEASE)}},
+    )
+    if job is None:
+        return
+
+    hashes = []
+    _tx_hashes.set(hashes)
+    update = {}
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        result = await _job_handlers[job["kind"]](**job["params"])
+        update["result"] = result
+        update.update(_result_state(result))
+    except Exception as e:
+        update.update(state="failed", error=str(e))
+    finally:
+        heartbeat.cancel()
+
+    update.update(tx_hashes=hashes, finished_at=_now())
+    await job_collection.update_one({"_id": job_id}, {"$set": update})
+
+
+async def recover_interrupted_jobs() -> int:
+    """
+    Mark as failed the running jobs whose lease expired, i.e. whose
+    process stopped while running them. Their transactions may already
+    have been sent, so they are not run again. Jobs of other live
+    processes keep renewing their lease and are left alone.
+
+    Returns:
+        int: The number of jobs marked as failed.
+    """
+    result = await job_collection.update_many(
+        # Jobs started before leases were recorded have none
+        {"state": "running", "$or": [{"lease_until": {"$lt": _now()}}, {"lease_until": None}]},
+        {"$set": {"state": "failed", "error": "Interrupted: the process running it stopped.",
+                  "finished_at": _now()}},
+    )
+    return result.modified_count
+
+
+async def _recover_loop() -> None:
+    while True:
+        try:
+            await recover_interrupted_jobs()
+        except Exception as e:
+            print(f"Job recovery error: {str(e)}")
+        await asyncio.sleep(JOB_LEASE)
+
+
+async def _job_worker(queue: asyncio.Queue) -> None:
+    while True:
+        job_id = await queue.get()
+        try:
+            # Each job runs in its own context so tx hashes do not leak between jobs
+            await asyncio.create_task(_run_job(job_id))
+        except Exception as e:
+            print(f"Job worker error: {str(e)}")
+        finally:
+            queue.task_done()
+
+
+async def run_job_workers(workers: int = None) -> None:
+    """
+    Run the job workers until cancelled.
+
+    Jobs that were still queued when the process stopped are resumed.
+    Running jobs hold a lease renewed by their process; jobs whose lease
+    expired (their process died) are marked as interrupted, at startup
+    and then every `JOB_LEASE` seconds, because their transactions may
+    already have been sent.
+
+    Args:
+        workers (int, optional): Number of workers, defaults to `JOB_WORKERS`.
+    """
+    global _job_queue
+    queue = _job_queue = asyncio.Queue()
+
+    async for job in job_collection.find({"state": "queued"}, {"_id": 1}).sort("created_at", 1):
+        queue.put_nowait(job["_id"])
+
+    tasks = [asyncio.create_task(_job_worker(queue)) for _ in range(workers or JOB_WORKERS)]
+    tasks.append(asyncio.create_task(_recover_loop()))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        _job_queue = None
+        for task in tasks:
+            task.cancel()
@@ -1,37 +1,43 @@
 import time
 import json
-from swarm import Swarm
 from swarm.repl import run_demo_loop
 from ai_agent.agents import based_agent
-from openai import OpenAI
+from ai_agent.memory import ConversationMemory, openai_summarizer
+from ai_agent.runner import AgentRunner
+from ai_agent.telemetry import instrument_stream
+
+# the prompt sent to an agent on every autonomous turn
+AUTONOMOUS_THOUGHT = (
+    "Be creative and do something interesting on the Base blockchain. "
+    "Don't take any more input from me. Choose an action and execute it now. Choose those that highlight your identity and abilities best."
+)
+
 
 # this is the main loop that runs the agent in autonomous mode
 # you can modify this to change the behavior of the agent
 # the interval is the number of seconds between each thought
 def run_autonomous_loop(agent, interval=10):
-    client = Swarm()
-    messages = []
+    client = AgentRunner()
+    memory = ConversationMemory()
 
     print("Starting autonomous Based Agent loop...")
 
     while True:
         # Generate a thought
-        thought = (
-            "Be creative and do something interesting on the Base blockchain. "
-            "Don't take any more input from me. Choose an action and execute it now. Choose those that highlight your identity and abilities best."
-        )
-        messages.append({"role": "user", "content": thought})
+        thought = AUTONOMOUS_THOUGHT
+        memory.add_user(thought)
 
         print(f"\n\033[90mAgent's Thought:\033[0m {thought}")
 
         # Run the agent to generate a response and take action
-        response = client.run(agent=agent, messages=messages, stream=True)
+        messages = memory.messages()
+        response = instrument_stream(client.run(agent=agent, messages=messages, stream=True), agent, messages)
 
         # Process and print the streaming response
         response_obj = process_and_print_streaming_response(response)
 
-        # Update messages with the new response
-        messages.extend(response_obj.messages)
+        # Update memory with the new response
+        memory.extend(response_obj.messages)
 
         # Wait for the specified interval
         time.sleep(interval)
@@ -41,50 +47,42 @@ def run_autonomous_loop(agent, interval=10):
 # you can modify this to change the behavior of the agent
 def run_openai_conversation_loop(agent):
     """Facilitates a conversation between an OpenAI-powered agent and the Based Agent."""
-    client = Swarm()
+    from openai import OpenAI
+    client = AgentRunner()
     openai_client = OpenAI()
-    messages = []
+    memory = ConversationMemory(summarizer=openai_summarizer(openai_client))
 
     print("Starting OpenAI-Based Agent conversation loop...")
 
     # Initial prompt to start the conversation
-    openai_messages = [{
-        "role":
-        "system",
-        "content":
+    guide_memory = ConversationMemory(summarizer=openai_summarizer(openai_client), system=(
         "You are a user guiding a blockchain agent through various tasks on the Base blockchain. Engage in a conversation, suggesting actions and responding to the agent's outputs. Be creative and explore different blockchain capabilities. Options include creating tokens, transferring assets, minting NFTs, and getting balances. You're not simulating a conversation, but you will be in one yourself. Make sure you follow the rules of improv and always ask for some sort of function to occur. Be unique and interesting."
-    }, {
-        "role":
-        "user",
-        "content":
-        "Start a conversation with the Based Agent and guide it through some blockchain tasks."
-    }]
+    ))
+    guide_memory.add_user(
+        "Start a conversation with the Based Agent and guide it through some blockchain tasks.")
 
     while True:
         # Generate OpenAI response
         openai_response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo", messages=openai_messages)
+            model="gpt-3.5-turbo", messages=guide_memory.messages())
 
         openai_message = openai_response.choices[0].message.content
         print(f"\n\033[92mOpenAI Guide:\033[0m {openai_message}")
+        guide_memory.extend([{"role": "assistant", "content": openai_message}])
 
         # Send OpenAI's message to Based Agent
-        messages.append({"role": "user", "content": openai_message})
-        response = client.run(agent=agent, messages=messages, stream=True)
+        memory.add_user(openai_message)
+        messages = memory.messages()
+        response = instrument_stream(client.run(agent=agent, messages=messages, stream=True), agent, messages)
         response_obj = process_and_print_streaming_response(response)
 
-        # Update messages with Based Agent's response
-        messages.extend(response_obj.messages)
+        # Update memory with Based Agent's response
+        memory.extend(response_obj.messages)
 
         # Add Based Agent's response to OpenAI conversation
         based_agent_response = response_obj.messages[-1][
             "content"] if response_obj.messages else "No response from Based Agent."
-        openai_messages.append({
-            "role":
-            "user",
-            "content":
-            f"Based Agent response: {based_agent_response}"
-        })
+        guide_memory.add_user(f"Based Agent response: {based_agent_response}")
 
         # Check if user wants to continue
         user_input = input(
@@ -118,21 +116,24 @@ def choose_mode():
         print("Invalid choice. Please try again.")
 
 
-# Boring stuff to make the logs pretty
-def process_and_print_streaming_response(response):
-    content = ""
-    last_sender = ""
+def stream_events(response):
+    """
+    Turn a Swarm stream into higher-level events.
+
+    Yields:
+        dict: `{"type": "content", "sender", "delta"}` for content deltas,
+            `{"type": "tool_call", "sender", "name"}` when a tool is called,
+            `{"type": "end", "sender"}` at the end of each assistant message and
+            `{"type": "response", "response"}` with the final Swarm Response.
+    """
+    sender = ""
 
     for chunk in response:
         if "sender" in chunk:
-            last_sender = chunk["sender"]
+            sender = chunk["sender"]
 
         if "content" in chunk and chunk["content"] is not None:
-            if not content and last_sender:
-                print(f"\033[94m{last_sender}:\033[0m", end=" ", flush=True)
-                last_sender = ""
-            print(chunk["content"], end="", flush=True)
-            content += chunk["content"]
+            yield {"type": "content", "sender": sender, "delta": chunk["content"]}
 
         if "tool_calls" in chunk and chunk["tool_calls"] is not None:
             for tool_call in chunk["tool_calls"]:
@@ -140,14 +141,36 @@ def process_and_print_streaming_response(response):
                 name = f["name"]
                 if not name:
                     continue
-                print(f"\033[94m{last_sender}: \033[95m{name}\033[0m()")
+                yield {"type": "tool_call", "sender": sender, "name": name}
+
+        if "delim" in chunk and chunk["delim"] == "end":
+            yield {"type": "end", "sender": sender}
+
+        if "response" in chunk:
+            yield {"type": "response", "response": chunk["response"]}
+            return
+
 
-        if "delim" in chunk and chunk["delim"] == "end" and content:
+# Boring stuff to make the logs pretty
+def process_and_print_streaming_response(response):
+    content = ""
+
+    for event in stream_events(response):
+        if event["type"] == "content":
+            if not content and event["sender"]:
+                print(f"\033[94m{event['sender']}:\033[0m", end=" ", flush=True)
+            print(event["delta"], end="", flush=True)
+            content += event["delta"]
+
+        elif event["type"] == "tool_call":
+            print(f"\033[94m{event['sender']}: \033[95m{event['name']}\033[0m()")
+
+        elif event["type"] == "end" and content:
             print()  # End of response message
             content = ""
 
-        if "response" in chunk:
-            return chunk["response"]
+        elif event["type"] == "response":
+            return event["response"]
 
 
 def pretty_print_messages(messages) -> None:
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+from typing import Callable, List, Optional
+
+# Number of recent turns kept verbatim
+MEMORY_MAX_TURNS = int(os.getenv("MEMORY_MAX_TURNS", "8"))
+# Approximate token budget for the whole history sent to the model
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "6000"))
+# Maximum number of earlier tool results kept because later turns refer to them
+MEMORY_MAX_PINNED = int(os.getenv("MEMORY_MAX_PINNED", "20"))
+# Model used to fold old turns into the rolling summary
+MEMORY_SUMMARY_MODEL = os.getenv("MEMORY_SUMMARY_MODEL", "gpt-4o-mini")
+
+# Addresses, transaction hashes and other hex identifiers that later turns refer back to
+_REFERENCE_PATTERN = re.compile(r"0x[0-9a-fA-F]{8,}")
+
+SUMMARY_PROMPT = (
+    "You maintain the running summary of a conversation between a user and a blockchain agent "
+    "on Base. Merge the new messages into the existing summary. Keep every address, transaction "
+    "hash, contract, token, name and amount exactly as written. Answer with the updated summary only."
+)
+
+
+def estimate_tokens(messages: List[dict]) -> int:
+    """
+    Roughly estimate the number of tokens in a list of chat messages
+    (about 4 characters per token).
+    """
+    return sum(len(json.dumps(message, default=str)) for message in messages) // 4
+
+
+def _references(message: dict) -> set:
+    text = message.get("content") or ""
+    for tool_call in message.get("tool_calls") or []:
+        text += (tool_call.get("function") or {}).get("arguments") or ""
+    return set(_REFERENCE_PATTERN.findall(text))
+
+
+def openai_summarizer(client=None, model: str = MEMORY_SUMMARY_MODEL) -> Callable[[str, str], str]:
+    """
+    Build a summarizer that uses an OpenAI chat model.
+
+    Args:
+        client (OpenAI, optional): The OpenAI client, created on first use if omitted.
+        model (str): The model used for summaries.
+
+    Returns:
+        Callable: Function taking (summary, transcript) and returning the new summary.
+    """
+    def _summarize(summary: str, transcript: str) -> str:
+        nonlocal client
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI()
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Summary so far:\n{summary or '(empty)'}\n\nNew messages:\n{transcript}"},
+            ],
+        )
+        return response.choices[0].message.content
+
+    return _summarize
+
+
+class ConversationMemory:
+    """
+    Bounded conversation history for the Swarm loops.
+
+    Keeps a sliding window of recent turns verbatim, folds older turns
+    into a rolling summary, keeps older tool results that recent turns
+    still refer to (by address or hash), and trims the history to stay
+    within a token budget.
+    """
+
+    def __init__(self, system: str = None, max_turns: int = MEMORY_MAX_TURNS,
+                 token_budget: int = MEMORY_TOKEN_BUDGET,
+                 summarizer: Optional[Callable[[str, str], str]] = None):
+        """
+        Args:
+            system (str, optional): A system prompt always sent first.
+            max_turns (int): Number of recent turns kept verbatim.
+            token_budget (int): Approximate token budget for the history.
+            summarizer (Callable, optional): Function taking (summary, transcript)
+                and returning the new summary. Defaults to an OpenAI summarizer.
+        """
+        self.system = system
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summarizer = summarizer or openai_summarizer()
+        self.summary = ""
+        self.turns: List[List[dict]] = []
+        self.pinned: List[dict] = []
+
+    def add_user(self, content: str) -> None:
+        """Start a new turn with a user message."""
+        self.turns.append([{"role": "user", "content": content}])
+
+    def extend(self, messages: List[dict]) -> None:
+        """Append assistant and tool messages to the current turn."""
+        if not self.turns:
+            self.turns.append([])
+        self.turns[-1].extend(messages)
+
+    def messages(self) -> List[dict]:
+        """
+        Return the history to send to the model, compacting it first if it
+        is over the turn window or token budget.
+        """
+        self._compact()
+        return self._render()
+
+    def _render(self) -> List[dict]:
+        history = []
+        if self.system:
+            history.append({"role": "system", "content": self.system})
+        if self.summary:
+            history.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        if self.pinned:
+            notes = "\n".join(f"- {note['tool_name']}: {note['content']}" for note in self.pinned)
+            history.append({"role": "system", "content": f"Earlier tool results still referenced:\n{notes}"})
+        for turn in self.turns:
+            history.extend(turn)
+        return history
+
+    def _compact(self) -> None:
+        folded = []
+        unpinned = []
+        # Always keep the current turn, even if it alone is over budget
+        while len(self.turns) > 1 and (len(self.turns) > self.max_turns
+                                       or estimate_tokens(self._render()) > self.token_budget):
+            turn = self.turns.pop(0)
+            unpinned.extend(self._pin_referenced_results(turn))
+            folded.extend(turn)
+
+        if folded:
+            # Pinned results pushed out by newer ones are older than the folded turns
+            self._fold([{"role": "tool", **note} for note in unpinned] + folded)
+
+    def _pin_referenced_results(self, turn: List[dict]) -> List[dict]:
+        """
+        Keep tool results of a folded turn that later turns still mention,
+        and return the oldest pinned results dropped to stay under the cap.
+        """
+        later = set()
+        for message in (m for t in self.turns for m in t):
+            later |= _references(message)
+
+        for message in turn:
+            if message.get("role") == "tool" and _references(message) & later:
+                self.pinned.append({"tool_name": message.get("tool_name", "tool"),
+                                    "content": message.get("content")})
+        # The oldest pinned results over the cap are folded into the summary by the caller
+        excess = max(0, len(self.pinned) - MEMORY_MAX_PINNED)
+        dropped = self.pinned[:excess]
+        del self.pinned[:excess]
+        return dropped
+
+    def _fold(self, messages: List[dict]) -> None:
+        lines = []
+        for message in messages:
+            role = message.get("sender") or message.get("tool_name") or message.get("role")
+            if message.get("content"):
+                lines.append(f"{role}: {message['content']}")
+            for tool_call in message.get("tool_calls") or []:
+                function = tool_call.get("function") or {}
+                lines.append(f"{role} called {function.get('name')}({function.get('arguments')})")
+        transcript = "\n".join(lines)
+
+        try:
+            self.summary = self.summarizer(self.summary, transcript)
+        except Exception as e:
+            # Keep the loop running if the summary model fails; keep the tail of the text,
+            # at most half the token budget (about 4 characters per token)
+            print(f"Failed to summarize conversation: {str(e)}")
+            self.summary = (self.summary + "\n" + transcript)[-(self.token_budget // 2) * 4:]
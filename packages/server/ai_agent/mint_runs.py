@@ -0,0 +1,196 @@
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from eth_utils import is_address
+
+from ai_agent.db import get_collection
+
+# Bulk mint runs and their per-recipient checkpoints
+mint_run_collection = get_collection("mint_runs")
+mint_item_collection = get_collection("mint_items")
+
+# Number of recipients written per insert_many call
+INSERT_CHUNK_SIZE = 1000
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _mint_item(run_id: ObjectId, index: int, recipient) -> dict:
+    try:
+        to = recipient["to"]
+        quantity = recipient.get("quantity")
+        quantity = 1 if quantity in (None, "") else int(quantity)
+    except (TypeError, KeyError, AttributeError, ValueError):
+        raise ValueError(f"Recipient {index}: expected `to` and an optional integer `quantity`.")
+    if not isinstance(to, str) or not is_address(to):
+        raise ValueError(f"Recipient {index}: invalid address {to!r}.")
+    if quantity < 1:
+        raise ValueError(f"Recipient {index}: quantity must be at least 1.")
+    return {"run_id": run_id, "index": index, "to": to, "quantity": quantity,
+            "status": "pending", "event": None}
+
+
+async def create_mint_run(agent_id: str, contract_address: str, recipients) -> str:
+    """
+    Store a bulk mint run and one pending checkpoint per recipient.
+
+    Recipients are validated while they are stored; if one is invalid (or
+    the upload cannot be read) the partly written run is deleted, so a
+    rejected run never leaves anything behind.
+
+    Args:
+        agent_id (str): The ID of the minting agent.
+        contract_address (str): Address of the NFT contract.
+        recipients: Sync or async iterable of dicts with `to` and an
+            optional `quantity` (default 1).
+
+    Returns:
+        str: The ID of the run.
+
+    Raises:
+        ValueError: If the contract address or a recipient is invalid, or
+            there are no recipients.
+    """
+    if not isinstance(contract_address, str) or not is_address(contract_address):
+        raise ValueError(f"Invalid contract address {contract_address!r}.")
+
+    await mint_item_collection.create_index([("run_id", 1), ("index", 1)], unique=True)
+    await mint_item_collection.create_index([("run_id", 1), ("job_id", 1), ("updated_at", 1)])
+
+    result = await mint_run_collection.insert_one({
+        "agent_id": agent_id,
+        "contract_address": contract_address,
+        "total": 0,
+        "created_at": _now(),
+    })
+    run_id = result.inserted_id
+
+    total = 0
+    chunk = []
+
+    async def _flush():
+        if chunk:
+            await mint_item_collection.insert_many(chunk, ordered=False)
+            chunk.clear()
+
+    async def _iterate():
+        if hasattr(recipients, "__aiter__"):
+            async for recipient in recipients:
+                yield recipient
+        else:
+            for recipient in recipients:
+                yield recipient
+
+    try:
+        async for recipient in _iterate():
+            chunk.append(_mint_item(run_id, total, recipient))
+            total += 1
+            if len(chunk) >= INSERT_CHUNK_SIZE:
+                await _flush()
+        await _flush()
+        if total == 0:
+            raise ValueError("No recipients given.")
+    except Exception:
+        await mint_item_collection.delete_many({"run_id": run_id})
+        await mint_run_collection.delete_one({"_id": run_id})
+        raise
+
+    await mint_run_collection.update_one({"_id": run_id}, {"$set": {"total": total}})
+    return str(run_id)
+
+
+async def set_mint_run_job(run_id, previous_job_id: Optional[ObjectId], job_id: ObjectId) -> bool:
+    """
+    Point a run at the job minting it, unless another caller replaced
+    `previous_job_id` first.
+
+    Returns:
+        bool: Whether the run now points at `job_id`.
+    """
+    result = await mint_run_collection.update_one(
+        {"_id": ObjectId(run_id), "job_id": previous_job_id},
+        {"$set": {"job_id": job_id}},
+    )
+    return result.modified_count == 1
+
+
+async def get_mint_run(run_id: str) -> Optional[dict]:
+    """
+    Retrieve a bulk mint run by ID.
+
+    Raises:
+        ValueError: If the run ID is invalid.
+    """
+    try:
+        run_id = ObjectId(run_id)
+    except InvalidId:
+        raise ValueError("Invalid run ID format.")
+
+    return await mint_run_collection.find_one({"_id": run_id})
+
+
+def unfinished_mint_items(run_id) -> AsyncIterator[dict]:
+    """
+    Iterate over the recipients of a run that are not minted yet, in order.
+    """
+    return mint_item_collection.find(
+        {"run_id": ObjectId(run_id), "status": {"$ne": "minted"}}
+    ).sort("index", 1)
+
+
+async def interrupted_mint_items(run_id) -> List[dict]:
+    """
+    List the recipients of a run whose mint was being sent or confirmed
+    when the run stopped.
+    """
+    return await mint_item_collection.find(
+        {"run_id": ObjectId(run_id), "status": {"$in": ["submitting", "submitted"]}}
+    ).sort("index", 1).to_list(length=None)
+
+
+async def claimed_tx_hashes(run_id, tx_hashes: List[str]) -> set:
+    """
+    Return which of `tx_hashes` are already recorded on a recipient of the run.
+    """
+    cursor = mint_item_collection.find(
+        {"run_id": ObjectId(run_id), "tx_hash": {"$in": tx_hashes}}, {"tx_hash": 1}
+    )
+    return {item["tx_hash"] async for item in cursor}
+
+
+async def update_mint_item(item_id, status: str, event: str = None, **fields) -> None:
+    """
+    Record the checkpoint state of one recipient, and the progress `event`
+    to report for it (None while there is nothing to report yet).
+    """
+    fields.update(status=status, event=event, updated_at=_now())
+    await mint_item_collection.update_one({"_id": item_id}, {"$set": fields})
+
+
+def mint_item_events(run_id, job_id: ObjectId, since: datetime = None) -> AsyncIterator[dict]:
+    """
+    Iterate over the recipients a job reported an event for, updated at or
+    after `since`, oldest first.
+    """
+    query = {"run_id": ObjectId(run_id), "job_id": job_id, "event": {"$ne": None}}
+    if since is not None:
+        query["updated_at"] = {"$gte": since}
+    return mint_item_collection.find(query).sort("updated_at", 1)
+
+
+async def count_mint_items(run_id) -> dict:
+    """
+    Count the recipients of a run by status.
+    """
+    counts = {}
+    pipeline = [
+        {"$match": {"run_id": ObjectId(run_id)}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+    async for row in mint_item_collection.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return counts
@@ -0,0 +1,113 @@
+import os
+import time
+import asyncio
+
+from pymongo.errors import OperationFailure, PyMongoError
+from swarm import Agent
+
+from ai_agent.agents import build_agent, get_agent, invalidate_agent
+from ai_agent.cache import TTLCache
+from ai_agent.db import agent_collection
+
+# Maximum number of built agents kept in memory
+AGENT_REGISTRY_SIZE = int(os.getenv("AGENT_REGISTRY_SIZE", "1024"))
+# Seconds a built agent is kept; a safety net in case a change is missed
+AGENT_REGISTRY_TTL = float(os.getenv("AGENT_REGISTRY_TTL", "3600"))
+# Seconds between polls for changes when change streams are not available
+AGENT_REGISTRY_POLL_INTERVAL = float(os.getenv("AGENT_REGISTRY_POLL_INTERVAL", "5"))
+
+# Error code of a change stream opened on a standalone server
+_CHANGE_STREAM_UNSUPPORTED = 40573
+
+# Built Swarm agents keyed by agent ID, as (agent document, Agent)
+agent_registry = TTLCache(max_size=AGENT_REGISTRY_SIZE, ttl=AGENT_REGISTRY_TTL)
+
+
+async def get_registered_agent(agent_id: str) -> Agent:
+    """
+    Return the Swarm agent of an agent ID, building it from MongoDB on first use.
+
+    Args:
+        agent_id (str): The ID of the agent.
+
+    Returns:
+        Agent: The Swarm agent.
+
+    Raises:
+        ValueError: If the agent ID is invalid or the agent is not found.
+    """
+    entry = agent_registry.get(agent_id)
+    if entry is not None:
+        return entry[1]
+
+    started = time.perf_counter()
+    agent_data = await get_agent(agent_id)
+    agent = build_agent(agent_data)
+    agent_registry.set(agent_id, (agent_data, agent))
+    agent_registry.record_load(time.perf_counter() - started)
+    return agent
+
+
+def _apply_change(agent_id: str, agent_data: dict = None) -> None:
+    """Rebuild a registered agent from its new document, or drop it if deleted."""
+    invalidate_agent(agent_id)
+    if agent_id not in agent_registry.keys():
+        # Agents nobody asked for are built lazily
+        return
+    if agent_data is None:
+        agent_registry.invalidate(agent_id)
+    else:
+        agent_registry.set(agent_id, (agent_data, build_agent(agent_data)))
+
+
+async def _watch_changes() -> None:
+    """Apply agent changes from a change stream (replica sets and Atlas)."""
+    async with agent_collection.watch(full_document="updateLookup") as stream:
+        async for change in stream:
+            agent_id = str(change["documentKey"]["_id"])
+            _apply_change(agent_id, change.get("fullDocument"))
+
+
+async def _poll_changes() -> None:
+    """Compare the registered agents with MongoDB (standalone servers)."""
+    while True:
+        await asyncio.sleep(AGENT_REGISTRY_POLL_INTERVAL)
+        cached = {agent_id: agent_registry.get(agent_id) for agent_id in agent_registry.keys()}
+        cached = {agent_id: entry for agent_id, entry in cached.items() if entry is not None}
+        if not cached:
+            continue
+
+        current = {}
+        async for agent_data in agent_collection.find({"_id": {"$in": [entry[0]["_id"] for entry in cached.values()]}}):
+            current[str(agent_data["_id"])] = agent_data
+        for agent_id, (agent_data, _) in cached.items():
+            if current.get(agent_id) != agent_data:
+                _apply_change(agent_id, current.get(agent_id))
+
+
+async def run_registry_watcher() -> None:
+    """
+    Keep the agent registry consistent with the `agents` collection.
+
+    Uses a change stream when the server supports it and falls back to
+    polling the registered agents every `AGENT_REGISTRY_POLL_INTERVAL`
+    seconds on a standalone server.
+    """
+    polling = False
+    while True:
+        try:
+            if polling:
+                await _poll_changes()
+            else:
+                await _watch_changes()
+        except OperationFailure as e:
+            if not polling and e.code == _CHANGE_STREAM_UNSUPPORTED:
+                print("Change streams are not supported, polling for agent changes.")
+                polling = True
+                continue
+            print(f"Agent registry {'poll' if polling else 'watch'} error: {str(e)}")
+        except PyMongoError as e:
+            print(f"Agent registry {'poll' if polling else 'watch'} error: {str(e)}")
+        # Changes made while the stream (or polling) was down are not replayed
+        agent_registry.clear()
+        await asyncio.sleep(AGENT_REGISTRY_POLL_INTERVAL)
@@ -0,0 +1,172 @@
+import os
+import json
+import inspect
+import functools
+import threading
+import contextvars
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from swarm import Swarm
+from swarm.types import Response
+from swarm.util import debug_print, function_to_json
+
+# Maximum number of tool calls of one assistant message running at the same time
+RUNNER_MAX_TOOL_CONCURRENCY = int(os.getenv("RUNNER_MAX_TOOL_CONCURRENCY", "4"))
+
+# Threads running tool calls, shared by every runner of the process
+RUNNER_TOOL_THREADS = int(os.getenv("RUNNER_TOOL_THREADS", "32"))
+
+_tool_pool: Optional[ThreadPoolExecutor] = None
+_tool_pool_lock = threading.Lock()
+
+
+def read_only(function: Callable) -> Callable:
+    """
+    Mark a tool as read-only: its calls never wait for the writes of its
+    wallet. Apply it on top of other decorators; `functools.wraps`
+    carries the mark over to wrappers made later (bound and sync tools).
+    """
+    function.read_only = True
+    return function
+
+
+def _get_tool_pool() -> ThreadPoolExecutor:
+    global _tool_pool
+    if _tool_pool is None:
+        with _tool_pool_lock:
+            if _tool_pool is None:
+                _tool_pool = ThreadPoolExecutor(max_workers=RUNNER_TOOL_THREADS, thread_name_prefix="agent-tool")
+    return _tool_pool
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts_context_variables(function: Callable) -> bool:
+    # inspect.signature follows functools.wraps, unlike __code__.co_varnames
+    return "context_variables" in inspect.signature(function).parameters
+
+
+@functools.lru_cache(maxsize=None)
+def tool_schema(function: Callable) -> dict:
+    """
+    Return the JSON schema of a tool function as sent to the model, computed
+    once per function (Swarm re-derives it on every completion request).
+
+    `context_variables` is hidden from the model, like Swarm does. The
+    returned dict is shared and must not be modified.
+    """
+    schema = function_to_json(function)
+    parameters = schema["function"]["parameters"]
+    parameters["properties"].pop("context_variables", None)
+    if "context_variables" in parameters["required"]:
+        parameters["required"].remove("context_variables")
+    return schema
+
+
+class AgentRunner(Swarm):
+    """
+    Swarm client that runs the tool calls of one assistant message
+    concurrently instead of one after another.
+
+    Calls are split into lanes: each call of a tool marked `read_only`
+    gets its own lane, and the writes of one wallet share a lane so they are sent in
+    the order the model gave them. The wallet is the agent bound to the
+    conversation (`context_variables["agent_id"]`), or the `agent_id`
+    argument of tools that still take one. At most
+    `max_tool_concurrency` lanes of a message run at the same time, on a
+    thread pool shared by all runners, and the tool messages are returned
+    in the original order, so the conversation is the same as with `Swarm`.
+
+    Tool schemas come from the `tool_schema` cache instead of being
+    introspected again for every completion request.
+    """
+
+    def __init__(self, client=None, max_tool_concurrency: int = RUNNER_MAX_TOOL_CONCURRENCY):
+        super().__init__(client)
+        self.max_tool_concurrency = max_tool_concurrency
+
+    def get_chat_completion(self, agent, history: list, context_variables: dict, model_override: str,
+                            stream: bool, debug: bool):
+        context_variables = defaultdict(str, context_variables)
+        instructions = agent.instructions(context_variables) if callable(agent.instructions) else agent.instructions
+        messages = [{"role": "system", "content": instructions}] + history
+        debug_print(debug, "Getting chat completion for...:", messages)
+
+        tools = [tool_schema(function) for function in agent.functions]
+        create_params = {
+            "model": model_override or agent.model,
+            "messages": messages,
+            "tools": tools or None,
+            "tool_choice": agent.tool_choice,
+            "stream": stream,
+        }
+        if tools:
+            create_params["parallel_tool_calls"] = agent.parallel_tool_calls
+        return self.client.chat.completions.create(**create_params)
+
+    def _call_tool(self, tool_call, function_map: Dict[str, Callable], context_variables: dict, debug: bool):
+        name = tool_call.function.name
+        if name not in function_map:
+            return {"role": "tool", "tool_call_id": tool_call.id, "tool_name": name,
+                    "content": f"Error: Tool {name} not found."}, None
+
+        function = function_map[name]
+        args = json.loads(tool_call.function.arguments)
+        if _accepts_context_variables(function):
+            args["context_variables"] = context_variables
+        result = self.handle_function_result(function(**args), debug)
+        return {"role": "tool", "tool_call_id": tool_call.id, "tool_name": name, "content": result.value}, result
+
+    def _lanes(self, tool_calls, function_map: Dict[str, Callable], context_variables: dict) -> List[List[int]]:
+        lanes = {}
+        bound_agent_id = context_variables.get("agent_id")
+        for index, tool_call in enumerate(tool_calls):
+            name = tool_call.function.name
+            if getattr(function_map.get(name), "read_only", False):
+                key = ("read", index)
+            else:
+                try:
+                    agent_id = json.loads(tool_call.function.arguments).get("agent_id")
+                except (ValueError, AttributeError):
+                    agent_id = None
+                key = ("wallet", agent_id or bound_agent_id)
+            lanes.setdefault(key, []).append(index)
+        return list(lanes.values())
+
+    def handle_tool_calls(self, tool_calls, functions, context_variables: dict, debug: bool) -> Response:
+        function_map = {function.__name__: function for function in functions}
+        outcomes = [None] * len(tool_calls)
+
+        def _run_lane(indices: List[int]) -> None:
+            for index in indices:
+                outcomes[index] = self._call_tool(tool_calls[index], function_map, context_variables, debug)
+
+        lanes = self._lanes(tool_calls, function_map, context_variables)
+        if len(lanes) == 1 or self.max_tool_concurrency <= 1:
+            for lane in lanes:
+                _run_lane(lane)
+        else:
+            pool = _get_tool_pool()
+            pending, futures = list(reversed(lanes)), []
+            running = set()
+            while pending or running:
+                # A lane starts when one of this message's lanes finishes
+                while pending and len(running) < self.max_tool_concurrency:
+                    # Each lane gets its own copy of the caller's context (e.g. the telemetry turn)
+                    future = pool.submit(contextvars.copy_context().run, _run_lane, pending.pop())
+                    futures.append(future)
+                    running.add(future)
+                _, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in futures:
+                # Re-raise tool exceptions like Swarm does
+                future.result()
+
+        partial_response = Response(messages=[], agent=None, context_variables={})
+        for message, result in outcomes:
+            partial_response.messages.append(message)
+            if result is not None:
+                partial_response.context_variables.update(result.context_variables)
+                if result.agent:
+                    partial_response.agent = result.agent
+        return partial_response
@@ -0,0 +1,210 @@
+import os
+import heapq
+import random
+import asyncio
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from ai_agent.agents import agent_context, build_agent
+from ai_agent.db import agent_collection
+from ai_agent.main import AUTONOMOUS_THOUGHT, stream_events
+from ai_agent.memory import ConversationMemory
+from ai_agent.runner import AgentRunner
+from ai_agent.telemetry import instrument_stream
+from ai_agent.tool_loop import set_tool_loop
+
+# Maximum number of agent turns (LLM calls) in flight across all agents
+RUNTIME_MAX_IN_FLIGHT = int(os.getenv("RUNTIME_MAX_IN_FLIGHT", "16"))
+# Seconds between turns of an agent that has no `interval` of its own
+RUNTIME_DEFAULT_INTERVAL = float(os.getenv("RUNTIME_DEFAULT_INTERVAL", "60"))
+# Seconds between reloads of the active agents from MongoDB
+RUNTIME_REFRESH_INTERVAL = float(os.getenv("RUNTIME_REFRESH_INTERVAL", "30"))
+
+
+class _AgentState:
+    """Scheduling state of one autonomous agent."""
+
+    def __init__(self, agent_data: dict):
+        self.memory = ConversationMemory()
+        self.turns = 0
+        self.errors = 0
+        self.last_error = None
+        self.running = False
+        self.update(agent_data)
+
+    def update(self, agent_data: dict) -> None:
+        if agent_data == getattr(self, "agent_data", None):
+            return
+        self.agent_data = agent_data
+        self.agent = build_agent(agent_data)
+        self.interval = float(agent_data.get("interval") or RUNTIME_DEFAULT_INTERVAL)
+
+
+class AgentRuntime:
+    """
+    Runs every active agent of the `agents` collection autonomously.
+
+    Each agent takes a turn every `interval` seconds (stored on its
+    document). Turns are dispatched earliest-due first, an agent never
+    has more than one turn in flight, and at most `max_in_flight` turns
+    run at the same time, so hundreds of agents share one process fairly.
+    """
+
+    def __init__(self, max_in_flight: int = RUNTIME_MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self.agents: Dict[str, _AgentState] = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._turns = set()
+        self._client = None
+        # Swarm and the OpenAI client are blocking, so turns run in these threads
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="agent-turn")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the runtime on the current event loop."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop scheduling new turns and wait for the turns in flight to finish."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Their tools run on this loop, so it must outlive them
+        await asyncio.gather(*self._turns, return_exceptions=True)
+        self.agents.clear()
+        self._heap.clear()
+
+    async def refresh(self) -> None:
+        """
+        Reload the active agents from MongoDB, scheduling new ones and
+        dropping those that were deactivated.
+        """
+        active = set()
+        loop = asyncio.get_running_loop()
+        async for agent_data in agent_collection.find({"active": True}):
+            agent_id = str(agent_data["_id"])
+            active.add(agent_id)
+            state = self.agents.get(agent_id)
+            if state is None:
+                state = self.agents[agent_id] = _AgentState(agent_data)
+                # Spread first turns over one interval so agents do not start in lockstep
+                self._schedule(agent_id, state, loop.time() + random.uniform(0, state.interval))
+            else:
+                state.update(agent_data)
+
+        for agent_id in set(self.agents) - active:
+            del self.agents[agent_id]
+
+    def _schedule(self, agent_id: str, state: _AgentState, due: float) -> None:
+        # Entries keep the state they were scheduled for: once an agent is
+        # deactivated its entries are stale, even if it is activated again
+        heapq.heappush(self._heap, (due, next(self._sequence), agent_id, state))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        # Tools called from turn threads run on this loop
+        set_tool_loop(asyncio.get_running_loop())
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        refresher = asyncio.create_task(self._refresh_loop())
+        try:
+            await self._dispatch()
+        finally:
+            refresher.cancel()
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Agent runtime refresh error: {str(e)}")
+            await asyncio.sleep(RUNTIME_REFRESH_INTERVAL)
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, _, agent_id, state = self._heap[0]
+            delay = due - loop.time()
+            if delay > 0:
+                # Wake up early if an earlier turn gets scheduled
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            if self.agents.get(agent_id) is not state or state.running:
+                continue
+
+            await self._slots.acquire()
+            state.running = True
+            turn = asyncio.create_task(self._turn(agent_id, state))
+            self._turns.add(turn)
+            turn.add_done_callback(self._turns.discard)
+
+    async def _turn(self, agent_id: str, state: _AgentState) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            context_variables = await agent_context(agent_id)
+            await loop.run_in_executor(self._executor, self._run_turn, state, context_variables)
+            state.turns += 1
+        except Exception as e:
+            state.errors += 1
+            state.last_error = str(e)
+        finally:
+            state.running = False
+            self._slots.release()
+            if self.agents.get(agent_id) is state:
+                self._schedule(agent_id, state, loop.time() + state.interval)
+
+    def _run_turn(self, state: _AgentState, context_variables: dict) -> None:
+        if self._client is None:
+            self._client = AgentRunner()
+
+        state.memory.add_user(AUTONOMOUS_THOUGHT)
+        messages = state.memory.messages()
+        response = self._client.run(agent=state.agent, messages=messages,
+                                    context_variables=context_variables, stream=True)
+        for event in stream_events(instrument_stream(response, state.agent, messages)):
+            if event["type"] == "response":
+                state.memory.extend(event["response"].messages)
+
+    def stats(self) -> dict:
+        """
+        Return the scheduling state of the runtime.
+        """
+        return {
+            "running": self.running,
+            "max_in_flight": self.max_in_flight,
+            "agents": len(self.agents),
+            "in_flight": sum(1 for state in self.agents.values() if state.running),
+            "turns": sum(state.turns for state in self.agents.values()),
+            "errors": sum(state.errors for state in self.agents.values()),
+            "agent_stats": {
+                agent_id: {"name": state.agent.name, "interval": state.interval, "turns": state.turns,
+                           "errors": state.errors, "last_error": state.last_error, "running": state.running}
+                for agent_id, state in self.agents.items()
+            },
+        }
+
+
+# Process-wide runtime controlled from server.py
+runtime = AgentRuntime()
@@ -1,10 +1,75 @@
-from fastapi import FastAPI, HTTPException
+import os
+import csv
+import json
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from ai_agent.agents import create_token, transfer_asset, get_balance, deploy_nft, mint_nft, create_agent
+from ai_agent.agents import create_token, transfer_asset, transfer_batch, register_basenames, get_balance, get_balances, deploy_nft, mint_nft, mint_nft_bulk, run_mint, create_agent, create_agents_bulk, get_agent, agent_context, agent_tools, set_agent_tools, list_agents, find_agent_by_address, ensure_agent_indexes, set_agent_active, warm_up_cdp, create_pooled_wallet, wallet_cache, balance_cache, agent_cache, invalidate_wallet, reveal_ens_domain
+from ai_agent.executor import executor_stats
+from ai_agent.telemetry import telemetry_stats, instrument_stream
+from ai_agent.tool_loop import set_tool_loop
+from ai_agent.main import stream_events
+from ai_agent.ens_scheduler import run_reveal_worker, get_reveal
+from ai_agent.jobs import register_job, submit_job, get_job, list_jobs, serialize_job, run_job_workers, FINISHED_STATES
+from ai_agent.idempotency import IdempotencyKeyReusedError, ensure_idempotency_indexes, reserve_idempotency_key, release_idempotency_key
+from ai_agent.runtime import runtime
+from ai_agent.runner import AgentRunner
+from ai_agent.wallet_pool import run_wallet_pool_filler, wallet_pool_stats
+from ai_agent.registry import agent_registry, get_registered_agent, run_registry_watcher
+
+# Start the autonomous agent runtime with the server
+RUNTIME_AUTOSTART = os.getenv("RUNTIME_AUTOSTART", "false").lower() == "true"
+
+# Tool functions that write on-chain run as background jobs
+register_job("create_token", create_token)
+register_job("transfer_asset", transfer_asset)
+register_job("transfer_batch", transfer_batch)
+register_job("deploy_nft", deploy_nft)
+register_job("mint_nft", mint_nft)
+register_job("mint_nft_bulk", run_mint)
+register_job("register_basenames", register_basenames)
+
+async def _ensure_indexes():
+    try:
+        await ensure_agent_indexes()
+    except Exception as e:
+        print(f"Failed to create agent indexes: {str(e)}")
+    try:
+        await ensure_idempotency_indexes()
+    except Exception as e:
+        print(f"Failed to create idempotency key indexes: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the background workers for the lifetime of the app.
+    """
+    # Tools called by Swarm from worker threads run on this loop
+    set_tool_loop(asyncio.get_running_loop())
+    workers = [
+        asyncio.create_task(run_reveal_worker(reveal_ens_domain)),
+        asyncio.create_task(run_job_workers()),
+        asyncio.create_task(run_registry_watcher()),
+        asyncio.create_task(warm_up_cdp()),
+        asyncio.create_task(_ensure_indexes()),
+        asyncio.create_task(run_wallet_pool_filler(create_pooled_wallet)),
+    ]
+    if RUNTIME_AUTOSTART:
+        runtime.start()
+    yield
+    await runtime.stop()
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    set_tool_loop(None)
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Define the allowed origins
 origins = [
@@ -28,22 +93,51 @@ def read_root():
 
 # --- API Models ---
 class TransferRequest(BaseModel):
+    agent_id: str
     amount: float
     asset_id: str
     destination_address: str
 
+class TransferBatchRequest(BaseModel):
+    transfers: List[TransferRequest]
+
+class BasenameRequest(BaseModel):
+    agent_id: str
+    basename: str
+    amount: Optional[float] = None
+
+class BasenameBatchRequest(BaseModel):
+    registrations: List[BasenameRequest]
+
 class NFTRequest(BaseModel):
+    agent_id: str
     name: str
     symbol: str
     base_uri: str
 
 class MintRequest(BaseModel):
+    agent_id: str
     contract_address: str
     mint_to: str
 
 class AgentRequest(BaseModel):
     name: str
     instructions: str
+    active: bool = False
+    interval: Optional[float] = None
+    tools: Optional[List[str]] = None
+
+class AgentBatchRequest(BaseModel):
+    agents: List[AgentRequest] = []
+
+class AgentScheduleRequest(BaseModel):
+    interval: Optional[float] = None
+
+class AgentToolsRequest(BaseModel):
+    tools: Optional[List[str]] = None
+
+class ChatRequest(BaseModel):
+    messages: List[dict]
 
 class CreateTokenRequest(BaseModel):
     agent_id: str
@@ -51,56 +145,311 @@ class CreateTokenRequest(BaseModel):
     symbol: str
     initial_supply: int
 
+# Shared Swarm client for chat requests (running tool calls concurrently), created on first use
+_swarm_client = None
+
+def get_swarm() -> AgentRunner:
+    global _swarm_client
+    if _swarm_client is None:
+        _swarm_client = AgentRunner()
+    return _swarm_client
+
 # --- API Endpoints ---
-@app.post("/create_token")
-async def api_create_token(request: CreateTokenRequest):
-    try:
-        result = await create_token(
-            agent_id=request.agent_id,
-            name=request.name,
-            symbol=request.symbol,
-            initial_supply=request.initial_supply,
-        )
-        return {"message": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+async def _accept_job(kind: str, params: dict, idempotency_key: str = None,
+                      response: Response = None) -> dict:
+    """
+    Submit a job and build the 202 response pointing at its status.
 
+    With an `Idempotency-Key`, a retry of the same request attaches to the
+    job started by the first one (running or finished) instead of sending
+    the transaction again; the response then also holds the job state and
+    result, and the `Idempotent-Replayed` header is set.
+    """
+    reserved_id = None
+    if idempotency_key is not None:
+        try:
+            reserved_id, created = await reserve_idempotency_key(idempotency_key, kind, params)
+        except IdempotencyKeyReusedError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not created:
+            return await _replay_job(str(reserved_id), response)
 
-@app.post("/transfer_asset")
-def api_transfer_asset(request: TransferRequest):
     try:
-        result = transfer_asset(request.amount, request.asset_id, request.destination_address)
-        return {"result": result}
+        job_id = await submit_job(kind, params, job_id=reserved_id)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        if reserved_id is not None:
+            await release_idempotency_key(idempotency_key, reserved_id)
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
+
+
+async def _replay_job(job_id: str, response: Response = None) -> dict:
+    """
+    Build the response to a retried request from the job of the original one.
+    """
+    if response is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+    result = {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
+    job = await get_job(job_id)
+    # The original request may still be storing its job
+    result["state"] = job["state"] if job else "queued"
+    if job and job["state"] in FINISHED_STATES:
+        result["result"] = job.get("result")
+        result["error"] = job.get("error")
+    return result
+
+
+@app.post("/create_token", status_code=202)
+async def api_create_token(request: CreateTokenRequest, response: Response,
+                           idempotency_key: Optional[str] = Header(None)):
+    """
+    Endpoint to deploy an ERC-20 token in the background.
+    """
+    return await _accept_job("create_token", request.model_dump(), idempotency_key, response)
+
+
+@app.post("/transfer_asset", status_code=202)
+async def api_transfer_asset(request: TransferRequest, response: Response,
+                             idempotency_key: Optional[str] = Header(None)):
+    """
+    Endpoint to transfer an asset in the background.
+    """
+    return await _accept_job("transfer_asset", request.model_dump(), idempotency_key, response)
+
+
+@app.post("/transfer_batch", status_code=202)
+async def api_transfer_batch(request: TransferBatchRequest, response: Response,
+                             idempotency_key: Optional[str] = Header(None)):
+    """
+    Endpoint to run many transfers as one background job. The job result
+    holds one entry per transfer, in request order.
+    """
+    if not request.transfers:
+        raise HTTPException(status_code=400, detail="No transfers given.")
+    return await _accept_job("transfer_batch", request.model_dump(), idempotency_key, response)
+
+
+@app.post("/register_basenames", status_code=202)
+async def api_register_basenames(request: BasenameBatchRequest, response: Response,
+                                 idempotency_key: Optional[str] = Header(None)):
+    """
+    Endpoint to register many Basenames as one background job. Taken names
+    are skipped before any gas is spent; the job result holds one entry
+    per registration, in request order.
+    """
+    if not request.registrations:
+        raise HTTPException(status_code=400, detail="No registrations given.")
+    return await _accept_job("register_basenames", request.model_dump(), idempotency_key, response)
 
 
 @app.get("/balance/{asset_id}")
-def api_get_balance(asset_id: str):
+async def api_get_balance(asset_id: str, agent_id: str):
     try:
-        result = get_balance(asset_id)
+        result = await get_balance(agent_id, asset_id)
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/deploy_nft")
-def api_deploy_nft(request: NFTRequest):
+@app.get("/balances/{agent_id}")
+async def api_get_balances(agent_id: str, assets: Optional[str] = None):
+    """
+    Endpoint to get the balances of all tracked assets (or a comma-separated
+    `assets` list) of an agent in one call.
+    """
     try:
-        result = deploy_nft(request.name, request.symbol, request.base_uri)
+        asset_list = [asset for asset in assets.split(",") if asset] if assets else None
+        result = await get_balances(agent_id, asset_list)
         return {"result": result}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/mint_nft")
-def api_mint_nft(request: MintRequest):
+@app.post("/deploy_nft", status_code=202)
+async def api_deploy_nft(request: NFTRequest, response: Response,
+                         idempotency_key: Optional[str] = Header(None)):
+    """
+    Endpoint to deploy an ERC-721 NFT contract in the background.
+    """
+    return await _accept_job("deploy_nft", request.model_dump(), idempotency_key, response)
+
+
+@app.post("/mint_nft", status_code=202)
+async def api_mint_nft(request: MintRequest, response: Response,
+                       idempotency_key: Optional[str] = Header(None)):
+    """
+    Endpoint to mint an NFT in the background.
+    """
+    return await _accept_job("mint_nft", request.model_dump(), idempotency_key, response)
+
+
+async def _parse_recipients(request: Request):
+    """
+    Parse a streamed CSV (`to,quantity`) or NDJSON upload of mint recipients
+    line by line, without buffering the whole body.
+    """
+    is_csv = "csv" in request.headers.get("content-type", "")
+    buffer = ""
+    first_line = True
+
+    def _parse(line):
+        nonlocal first_line
+        line = line.strip()
+        if not line:
+            return None
+        if not is_csv:
+            return json.loads(line)
+
+        row = next(csv.reader([line]))
+        # Skip an optional header row
+        if first_line and row[0].strip().lower() == "to":
+            first_line = False
+            return None
+        first_line = False
+        return {"to": row[0].strip(), "quantity": row[1].strip() if len(row) > 1 else 1}
+
+    async for chunk in request.stream():
+        buffer += chunk.decode()
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            recipient = _parse(line)
+            if recipient:
+                yield recipient
+
+    recipient = _parse(buffer)
+    if recipient:
+        yield recipient
+
+
+@app.post("/mint_nft_bulk")
+async def api_mint_nft_bulk(request: Request, agent_id: Optional[str] = None,
+                            contract_address: Optional[str] = None, run_id: Optional[str] = None,
+                            concurrency: Optional[int] = None):
+    """
+    Endpoint to mint NFTs to many recipients, streaming NDJSON progress events.
+
+    Recipients are sent either as JSON (`{"agent_id", "contract_address",
+    "recipients": [{"to", "quantity"}]}`) or as a streamed CSV/NDJSON body
+    with `agent_id` and `contract_address` as query parameters. Invalid
+    recipients are rejected with a 400 before anything is minted.
+
+    The mint runs as a job: disconnecting only stops the progress stream.
+    Pass `run_id` to watch the run again, or to resume it if it was
+    interrupted.
+    """
+    recipients = None
+    if run_id is None:
+        if "application/json" in request.headers.get("content-type", ""):
+            body = await request.json()
+            agent_id = body.get("agent_id", agent_id)
+            contract_address = body.get("contract_address", contract_address)
+            recipients = body.get("recipients") or []
+        else:
+            recipients = _parse_recipients(request)
+        if not agent_id or not contract_address:
+            raise HTTPException(status_code=400, detail="agent_id and contract_address are required.")
+
+    events = mint_nft_bulk(agent_id, contract_address, recipients, run_id=run_id, concurrency=concurrency)
     try:
-        result = mint_nft(request.contract_address, request.mint_to)
-        return {"result": result}
+        # Surface setup errors (bad run ID, invalid or empty upload) as HTTP errors
+        started = await events.__anext__()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def _stream():
+        yield json.dumps(started) + "\n"
+        async for event in events:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+@app.get("/jobs/{job_id}")
+async def api_get_job(job_id: str):
+    """
+    Endpoint to poll the state, tx hashes, timings and result of a job.
+    Jobs end "succeeded", "failed", or "partial" when only some items of
+    a batch failed.
+    """
+    try:
+        job = await get_job(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+
+    return {"result": serialize_job(job)}
+
+
+@app.get("/jobs")
+async def api_list_jobs(state: Optional[str] = None, kind: Optional[str] = None,
+                        agent_id: Optional[str] = None, limit: int = 50):
+    """
+    Endpoint to list recent jobs, filtered by state, kind or agent.
+    """
+    jobs = await list_jobs(state=state, kind=kind, agent_id=agent_id, limit=min(limit, 500))
+    return {"result": [serialize_job(job) for job in jobs]}
+
+
+@app.post("/chat/{agent_id}")
+async def api_chat(agent_id: str, request: ChatRequest):
+    """
+    Endpoint to chat with an agent, streaming Server-Sent Events.
+
+    Events are `content` (a text delta), `tool_call` (a tool being called),
+    `end` (end of an assistant message), `error` and finally `done` with
+    the new messages to append to the conversation.
+    """
+    try:
+        agent = await get_registered_agent(agent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    # The tools get the agent and its wallet from here, not from the model
+    context_variables = await agent_context(agent_id)
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    stop = threading.Event()
+
+    def _run():
+        # Swarm and the OpenAI client are blocking, so the turn runs in a thread
+        stream = None
+        try:
+            response = get_swarm().run(agent=agent, messages=request.messages,
+                                       context_variables=context_variables, stream=True)
+            stream = stream_events(instrument_stream(response, agent, request.messages))
+            for event in stream:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(events.put_nowait, event)
+        except Exception as e:
+            loop.call_soon_threadsafe(events.put_nowait, {"type": "error", "error": str(e)})
+        finally:
+            if stream is not None:
+                stream.close()
+            loop.call_soon_threadsafe(events.put_nowait, None)
+
+    loop.run_in_executor(None, _run)
+
+    async def _stream():
+        try:
+            while (event := await events.get()) is not None:
+                if event["type"] == "response":
+                    event = {"type": "done", "messages": event["response"].messages}
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            # Stop the turn if the client went away
+            stop.set()
+
+    return StreamingResponse(_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 
 @app.post("/create_agent")
 async def api_create_agent(request: AgentRequest):
@@ -108,11 +457,246 @@ async def api_create_agent(request: AgentRequest):
     Endpoint to create a new agent and save it in MongoDB.
     """
     try:
-        agent_data = await create_agent(request.name, request.instructions)
+        agent_data = await create_agent(request.name, request.instructions, request.active, request.interval,
+                                        request.tools)
         # Return the agent data as JSON-serializable format
         return {
             "message": "Agent created successfully.",
-            "agent": agent_data
+            "agent": _serialize_agent(agent_data)
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _serialize_agent(agent_data: dict) -> dict:
+    agent_data["_id"] = str(agent_data["_id"])
+    # The wallet seed is never returned by the API
+    if isinstance(agent_data.get("wallet"), dict):
+        agent_data["wallet"] = {key: value for key, value in agent_data["wallet"].items() if key != "seed"}
+    return agent_data
+
+
+@app.get("/agents")
+async def api_list_agents(cursor: Optional[str] = None, name: Optional[str] = None, limit: int = 50):
+    """
+    Endpoint to list agents newest first. Pass the returned `next_cursor`
+    to get the next page.
+    """
+    try:
+        agents, next_cursor = await list_agents(cursor=cursor, name=name, limit=max(1, min(limit, 500)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"result": [_serialize_agent(agent_data) for agent_data in agents], "next_cursor": next_cursor}
+
+
+@app.get("/agents/by_address/{address}")
+async def api_find_agent_by_address(address: str):
+    """
+    Endpoint to find the agent that owns a wallet address.
+    """
+    try:
+        agent_data = await find_agent_by_address(address)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"result": _serialize_agent(agent_data)}
+
+
+@app.get("/agents/{agent_id}")
+async def api_get_agent(agent_id: str, fields: Optional[str] = None):
+    """
+    Endpoint to get an agent, optionally only some comma separated fields.
+    """
+    projection = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    try:
+        agent_data = await get_agent(agent_id, projection)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"result": _serialize_agent(agent_data)}
+
+
+@app.post("/runtime/start")
+async def api_start_runtime():
+    """
+    Endpoint to start running the active agents autonomously.
+    """
+    runtime.start()
+    return {"message": "Agent runtime started."}
+
+
+@app.post("/runtime/stop")
+async def api_stop_runtime():
+    """
+    Endpoint to stop the autonomous agent runtime.
+    """
+    await runtime.stop()
+    return {"message": "Agent runtime stopped."}
+
+
+@app.get("/runtime")
+async def api_runtime_stats():
+    """
+    Endpoint to inspect the agents scheduled by the runtime.
+    """
+    # Async so the runtime state is read on its event loop, not from a worker thread
+    return {"result": runtime.stats()}
+
+
+@app.post("/agents/{agent_id}/start")
+async def api_start_agent(agent_id: str, request: AgentScheduleRequest):
+    """
+    Endpoint to let the runtime run an agent autonomously.
+    """
+    try:
+        await set_agent_active(agent_id, True, request.interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if runtime.running:
+        await runtime.refresh()
+    return {"message": f"Agent {agent_id} activated."}
+
+
+@app.post("/agents/{agent_id}/stop")
+async def api_stop_agent(agent_id: str):
+    """
+    Endpoint to stop running an agent autonomously.
+    """
+    try:
+        await set_agent_active(agent_id, False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if runtime.running:
+        await runtime.refresh()
+    return {"message": f"Agent {agent_id} deactivated."}
+
+
+@app.post("/agents/{agent_id}/tools")
+async def api_set_agent_tools(agent_id: str, request: AgentToolsRequest):
+    """
+    Endpoint to choose the tools an agent can call (null for the default set).
+    """
+    try:
+        await set_agent_tools(agent_id, request.tools)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": f"Tools of agent {agent_id} updated."}
+
+
+@app.get("/tools")
+def api_list_tools():
+    """
+    Endpoint to list the names of the tools agents can be given.
+    """
+    return {"result": list(agent_tools)}
+
+
+@app.post("/create_agents")
+async def api_create_agents(request: AgentBatchRequest, batch_id: Optional[str] = None,
+                            concurrency: Optional[int] = None):
+    """
+    Endpoint to create many agents, streaming NDJSON progress events with
+    the new agent IDs. Pass `batch_id` to retry the agents of a batch that
+    failed or was interrupted.
+    """
+    agents = [agent.model_dump() for agent in request.agents] if batch_id is None else None
+    events = create_agents_bulk(agents, batch_id=batch_id, concurrency=concurrency)
+    try:
+        # Surface setup errors (bad batch ID, no agents) as HTTP errors
+        started = await events.__anext__()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def _stream():
+        yield json.dumps(started) + "\n"
+        async for event in events:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+@app.get("/cache/wallets")
+def api_wallet_cache_stats():
+    """
+    Endpoint to inspect the wallet session cache counters.
+    """
+    return {"result": wallet_cache.stats()}
+
+
+@app.get("/cache/agent_data")
+def api_agent_cache_stats():
+    """
+    Endpoint to inspect the agent document cache counters.
+    """
+    return {"result": agent_cache.stats()}
+
+
+@app.get("/cache/agents")
+def api_agent_registry_stats():
+    """
+    Endpoint to inspect the built agent registry counters.
+    """
+    return {"result": agent_registry.stats()}
+
+
+@app.get("/cache/balances")
+def api_balance_cache_stats():
+    """
+    Endpoint to inspect the balance cache counters.
+    """
+    return {"result": balance_cache.stats()}
+
+
+@app.delete("/cache/wallets/{agent_id}")
+def api_invalidate_wallet(agent_id: str):
+    """
+    Endpoint to drop a cached wallet so the next call re-imports it.
+    """
+    invalidate_wallet(agent_id)
+    return {"message": f"Wallet cache invalidated for agent {agent_id}."}
+
+
+@app.get("/wallet_pool")
+async def api_wallet_pool_stats():
+    """
+    Endpoint to inspect the number of pre-created wallets left in the pool.
+    """
+    try:
+        return {"result": await wallet_pool_stats()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/executor")
+async def api_executor_stats():
+    """
+    Endpoint to inspect the limits and load of the blocking CDP executor.
+    """
+    # The load is tracked per event loop, so this must run on the server loop
+    return {"result": executor_stats()}
+
+
+@app.get("/ens/reveals/{reveal_id}")
+async def api_get_reveal(reveal_id: str):
+    """
+    Endpoint to check the status of a scheduled ENS registration.
+    """
+    try:
+        reveal = await get_reveal(reveal_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not reveal:
+        raise HTTPException(status_code=404, detail=f"Reveal {reveal_id} not found.")
+
+    reveal["_id"] = str(reveal["_id"])
+    return {"result": reveal}
+
+
+@app.get("/telemetry")
+def api_telemetry_stats():
+    """
+    Endpoint to inspect the per-turn LLM and per-tool latency counters.
+    """
+    return {"result": telemetry_stats()}
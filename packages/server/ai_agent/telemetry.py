@@ -0,0 +1,226 @@
+# Per-turn latency and token instrumentation for the Swarm loops.
+# Swarm does not return token usage when streaming, so prompt and
+# completion tokens are estimated at about 4 characters per token.
+import os
+import json
+import time
+import atexit
+import logging
+import functools
+import inspect
+import threading
+from queue import SimpleQueue
+from logging.handlers import QueueHandler, QueueListener
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional
+
+from ai_agent.memory import estimate_tokens
+
+# JSONL file the turn records are appended to (off unless set)
+TELEMETRY_LOG = os.getenv("AGENT_TELEMETRY_LOG", "")
+
+_current_turn: ContextVar[Optional["TurnMetrics"]] = ContextVar("current_turn", default=None)
+_lock = threading.Lock()
+
+# Turn records are handed to a background thread that writes the log file,
+# so neither the event loop nor tool threads wait on disk I/O
+turn_logger = logging.getLogger("ai_agent.telemetry.turns")
+turn_logger.propagate = False
+_log_listener: Optional[QueueListener] = None
+
+counters = {
+    "turns": 0,
+    "llm_calls": 0,
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "turn_time": 0.0,
+    "first_chunk_time": 0.0,
+    "tool_calls": 0,
+    "tool_time": 0.0,
+}
+tool_counters = {}
+
+
+class TurnMetrics:
+    """Measurements of a single Swarm run."""
+
+    def __init__(self, agent, messages: List[dict]):
+        self.agent = agent.name
+        self.started = time.perf_counter()
+        self.prompt_tokens = estimate_tokens(messages) + _instruction_tokens(agent)
+        self.first_chunk_time = None
+        self.completion_chars = 0
+        self.llm_calls = 0
+        self.tool_calls = []
+
+    def on_chunk(self, chunk: dict) -> None:
+        if chunk.get("delim") == "start":
+            self.llm_calls += 1
+            return
+        text = chunk.get("content") or ""
+        for tool_call in chunk.get("tool_calls") or []:
+            text += (tool_call.get("function") or {}).get("arguments") or ""
+        if text and self.first_chunk_time is None:
+            self.first_chunk_time = time.perf_counter() - self.started
+        self.completion_chars += len(text)
+
+    def to_dict(self) -> dict:
+        total_time = time.perf_counter() - self.started
+        tool_time = sum(call["duration"] for call in self.tool_calls)
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "agent": self.agent,
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_chars // 4,
+            "first_chunk_time": self.first_chunk_time,
+            "total_time": total_time,
+            "llm_time": total_time - tool_time,
+            "tool_time": tool_time,
+            "tool_calls": self.tool_calls,
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_chars(function: Callable) -> int:
+    # The schema sent to the model (cached by the runner, without context_variables)
+    from ai_agent.runner import tool_schema
+    return len(json.dumps(tool_schema(function)))
+
+
+def _instruction_tokens(agent) -> int:
+    """Estimate the tokens of the agent instructions and tool schemas sent each call."""
+    instructions = agent.instructions if isinstance(agent.instructions, str) else ""
+    try:
+        schema_chars = sum(_schema_chars(f) for f in agent.functions)
+    except Exception:
+        schema_chars = 0
+    return (len(instructions) + schema_chars) // 4
+
+
+def _start_log_writer() -> None:
+    global _log_listener
+    with _lock:
+        if _log_listener is not None:
+            return
+        handler = logging.FileHandler(TELEMETRY_LOG)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        queue = SimpleQueue()
+        _log_listener = QueueListener(queue, handler)
+        _log_listener.start()
+        turn_logger.addHandler(QueueHandler(queue))
+        turn_logger.setLevel(logging.INFO)
+        # Flush the queued records on exit
+        atexit.register(_log_listener.stop)
+
+
+def _record(record: dict) -> None:
+    with _lock:
+        counters["turns"] += 1
+        counters["llm_calls"] += record["llm_calls"]
+        counters["prompt_tokens"] += record["prompt_tokens"]
+        counters["completion_tokens"] += record["completion_tokens"]
+        counters["turn_time"] += record["total_time"]
+        counters["first_chunk_time"] += record["first_chunk_time"] or 0.0
+
+    if TELEMETRY_LOG:
+        if _log_listener is None:
+            _start_log_writer()
+        turn_logger.info(json.dumps(record))
+
+
+def instrument_stream(response: Iterator[dict], agent, messages: List[dict]) -> Iterator[dict]:
+    """
+    Wrap a streaming `client.run(...)` response to record the turn.
+
+    Tool calls made while the stream is consumed are attributed to this turn.
+
+    Args:
+        response (Iterator[dict]): The Swarm stream.
+        agent (Agent): The agent being run.
+        messages (List[dict]): The history sent to the agent.
+
+    Yields:
+        dict: The chunks of `response`, unchanged.
+    """
+    turn = TurnMetrics(agent, messages)
+    token = _current_turn.set(turn)
+    try:
+        for chunk in response:
+            turn.on_chunk(chunk)
+            yield chunk
+    finally:
+        try:
+            _current_turn.reset(token)
+        except ValueError:
+            # The stream was closed from another context (e.g. garbage collected)
+            pass
+        _record(turn.to_dict())
+
+
+def _record_tool(name: str, duration: float, error: Optional[str]) -> None:
+    turn = _current_turn.get()
+    if turn is not None:
+        turn.tool_calls.append({"name": name, "duration": duration, "error": error})
+
+    with _lock:
+        counters["tool_calls"] += 1
+        counters["tool_time"] += duration
+        stats = tool_counters.setdefault(name, {"calls": 0, "errors": 0, "time": 0.0, "max_time": 0.0})
+        stats["calls"] += 1
+        stats["errors"] += error is not None
+        stats["time"] += duration
+        stats["max_time"] = max(stats["max_time"], duration)
+
+
+def instrument_tool(fn: Callable) -> Callable:
+    """
+    Wrap a tool function (sync or async) to record its duration.
+
+    The wrapper keeps the name, docstring and signature of `fn`, so the
+    JSON schema Swarm derives from it is unchanged.
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def _async_tool(*args, **kwargs):
+            started = time.perf_counter()
+            error = None
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                _record_tool(fn.__name__, time.perf_counter() - started, error)
+
+        return _async_tool
+
+    @functools.wraps(fn)
+    def _tool(*args, **kwargs):
+        started = time.perf_counter()
+        error = None
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            _record_tool(fn.__name__, time.perf_counter() - started, error)
+
+    return _tool
+
+
+def telemetry_stats() -> dict:
+    """
+    Return the aggregated turn and per-tool counters.
+    """
+    with _lock:
+        turns = counters["turns"] or 1
+        return {
+            **counters,
+            "avg_turn_time": counters["turn_time"] / turns,
+            "avg_first_chunk_time": counters["first_chunk_time"] / turns,
+            "avg_prompt_tokens": counters["prompt_tokens"] / turns,
+            "tools": {name: dict(stats) for name, stats in tool_counters.items()},
+        }
@@ -0,0 +1,79 @@
+import asyncio
+import functools
+import threading
+from typing import Callable, List, Optional
+
+# Event loop that runs the async tool functions called by Swarm
+_tool_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def set_tool_loop(loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """
+    Run tool coroutines on `loop` (the server's event loop), so they share
+    its Motor client and executor queues. Pass None to go back to the
+    background loop used by the CLI.
+    """
+    global _tool_loop
+    with _lock:
+        _tool_loop = loop
+
+
+def get_tool_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the loop tool coroutines run on, starting a background loop
+    thread on first use when none was set.
+    """
+    global _tool_loop
+    with _lock:
+        if _tool_loop is None or _tool_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="tool-loop", daemon=True).start()
+            _tool_loop = loop
+        return _tool_loop
+
+
+def run_tool_coroutine(coro):
+    """
+    Run a coroutine on the tool loop from a synchronous caller and wait for it.
+
+    Context variables of the caller (e.g. the telemetry turn) are carried
+    into the coroutine.
+
+    Raises:
+        RuntimeError: If called from the tool loop itself, which would deadlock.
+    """
+    loop = get_tool_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("Synchronous tools cannot be called from the tool loop; await the tool instead.")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def sync_tool(fn: Callable) -> Callable:
+    """
+    Wrap an async tool function so Swarm, which calls tools synchronously,
+    gets its result instead of an un-awaited coroutine.
+
+    The wrapper keeps the name, docstring and signature of `fn`.
+    """
+    if not asyncio.iscoroutinefunction(fn):
+        return fn
+
+    @functools.wraps(fn)
+    def _tool(*args, **kwargs):
+        return run_tool_coroutine(fn(*args, **kwargs))
+
+    return _tool
+
+
+def sync_tools(functions: List[Callable]) -> List[Callable]:
+    """
+    Wrap every async function of a tool list with `sync_tool`.
+    """
+    return [sync_tool(fn) for fn in functions]
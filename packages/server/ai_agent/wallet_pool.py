@@ -0,0 +1,190 @@
+import os
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from ai_agent.db import agent_collection, get_collection
+from ai_agent.jobs import WORKER_ID
+
+# Wallets created ahead of time, claimed by new agents. Their seeds are
+# stored encrypted, like the wallet data of agents.
+wallet_pool_collection = get_collection("wallet_pool")
+# Leases of singleton background tasks, keyed by task name
+lease_collection = get_collection("leases")
+
+# The filler tops the pool up when fewer wallets than this are available (0 disables it)
+WALLET_POOL_LOW_WATER = int(os.getenv("WALLET_POOL_LOW_WATER", "10"))
+# Number of available wallets the filler tops the pool up to
+WALLET_POOL_HIGH_WATER = int(os.getenv("WALLET_POOL_HIGH_WATER", str(WALLET_POOL_LOW_WATER * 2)))
+# Maximum number of wallets the filler creates at the same time
+WALLET_POOL_FILL_CONCURRENCY = int(os.getenv("WALLET_POOL_FILL_CONCURRENCY", "4"))
+# Seconds between checks of the pool level
+WALLET_POOL_CHECK_INTERVAL = float(os.getenv("WALLET_POOL_CHECK_INTERVAL", "10"))
+# Seconds the filler of one process holds the pool; the others stand by meanwhile
+WALLET_POOL_FILLER_LEASE = float(os.getenv("WALLET_POOL_FILLER_LEASE", "60"))
+# Seconds after which a claimed wallet whose agent was never saved goes back to the pool
+WALLET_POOL_CLAIM_TIMEOUT = float(os.getenv("WALLET_POOL_CLAIM_TIMEOUT", "600"))
+
+# Woken up by claims so the pool is refilled without waiting for the next check
+_claimed = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def claim_wallet(agent_id: ObjectId) -> Optional[dict]:
+    """
+    Atomically take an available wallet from the pool for an agent.
+
+    Args:
+        agent_id (ObjectId): The ID the new agent will be saved with.
+
+    Returns:
+        dict: The pooled wallet (`address` and `wallet_data`), or None if
+            the pool is empty.
+    """
+    wallet = await wallet_pool_collection.find_one_and_update(
+        {"status": "available"},
+        {"$set": {"status": "claimed", "agent_id": agent_id, "claimed_at": _now()}},
+        sort=[("_id", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+    if _claimed is not None:
+        _claimed.set()
+    return wallet
+
+
+async def remove_claimed_wallets(agent_ids: List[ObjectId]) -> None:
+    """
+    Drop the pool entries of wallets whose agents were saved; their
+    wallet data lives with the agent from then on.
+    """
+    if agent_ids:
+        await wallet_pool_collection.delete_many({"status": "claimed", "agent_id": {"$in": list(agent_ids)}})
+
+
+async def release_wallet(agent_id: ObjectId, address: str, wallet_data: dict) -> None:
+    """
+    Return the wallet of an agent that could not be saved, so it is not
+    lost. A claimed wallet becomes available again; one created on
+    demand is added to the pool.
+    """
+    result = await wallet_pool_collection.update_one(
+        {"status": "claimed", "agent_id": agent_id},
+        {"$set": {"status": "available"}, "$unset": {"agent_id": "", "claimed_at": ""}},
+    )
+    if not result.modified_count:
+        await wallet_pool_collection.insert_one(
+            {"address": address, "wallet_data": wallet_data, "status": "available", "created_at": _now()})
+
+
+async def _release_orphaned_claims() -> int:
+    """
+    Release the wallets claimed for agents that were never saved (their
+    process stopped between the claim and the insert).
+    """
+    released = 0
+    expired = _now() - timedelta(seconds=WALLET_POOL_CLAIM_TIMEOUT)
+    async for wallet in wallet_pool_collection.find({"status": "claimed", "claimed_at": {"$lt": expired}}):
+        if await agent_collection.find_one({"_id": wallet["agent_id"]}, {"_id": 1}):
+            # Saved, but its pool entry was not removed
+            await wallet_pool_collection.delete_one({"_id": wallet["_id"]})
+        else:
+            await release_wallet(wallet["agent_id"], wallet["address"], wallet["wallet_data"])
+            released += 1
+    return released
+
+
+async def _acquire_filler_lease() -> bool:
+    """
+    Take or renew the filler lease. Only its holder fills the pool, so
+    several server processes do not each top it up.
+    """
+    now = _now()
+    try:
+        await lease_collection.update_one(
+            {"_id": "wallet_pool_filler", "$or": [{"owner": WORKER_ID}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"owner": WORKER_ID, "lease_until": now + timedelta(seconds=WALLET_POOL_FILLER_LEASE)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Another process holds a live lease
+        return False
+    return True
+
+
+async def wallet_pool_stats() -> dict:
+    """
+    Return the number of pooled wallets by status and the pool settings.
+    """
+    counts = {}
+    pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    async for row in wallet_pool_collection.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return {
+        "available": counts.get("available", 0),
+        "claimed": counts.get("claimed", 0),
+        "low_water": WALLET_POOL_LOW_WATER,
+        "high_water": WALLET_POOL_HIGH_WATER,
+    }
+
+
+async def _fill(create_wallet: Callable[[], Awaitable[dict]], count: int) -> int:
+    slots = asyncio.Semaphore(WALLET_POOL_FILL_CONCURRENCY)
+
+    async def _create():
+        async with slots:
+            try:
+                return await create_wallet()
+            except Exception as e:
+                print(f"Failed to create pooled wallet: {str(e)}")
+                return None
+
+    wallets = [wallet for wallet in await asyncio.gather(*(_create() for _ in range(count))) if wallet]
+    if wallets:
+        await wallet_pool_collection.insert_many([
+            {**wallet, "status": "available", "created_at": _now()} for wallet in wallets
+        ], ordered=False)
+    return len(wallets)
+
+
+async def run_wallet_pool_filler(create_wallet: Callable[[], Awaitable[dict]]) -> None:
+    """
+    Keep at least `WALLET_POOL_LOW_WATER` wallets available in the pool.
+
+    When the pool falls below the low-water mark it is topped up to
+    `WALLET_POOL_HIGH_WATER` wallets, `WALLET_POOL_FILL_CONCURRENCY` at a time.
+    Every process runs the filler, but only the one holding the filler
+    lease fills the pool; it also releases wallets claimed for agents that
+    were never saved.
+
+    Args:
+        create_wallet (Callable): Coroutine function creating a wallet and
+            returning its `address` and exported `wallet_data`.
+    """
+    global _claimed
+    if WALLET_POOL_LOW_WATER <= 0:
+        return
+
+    _claimed = asyncio.Event()
+    await wallet_pool_collection.create_index([("status", 1), ("_id", 1)])
+    while True:
+        try:
+            if await _acquire_filler_lease():
+                await _release_orphaned_claims()
+                available = await wallet_pool_collection.count_documents({"status": "available"})
+                if available < WALLET_POOL_LOW_WATER:
+                    await _fill(create_wallet, max(WALLET_POOL_HIGH_WATER, WALLET_POOL_LOW_WATER) - available)
+        except Exception as e:
+            print(f"Wallet pool filler error: {str(e)}")
+
+        _claimed.clear()
+        try:
+            await asyncio.wait_for(_claimed.wait(), WALLET_POOL_CHECK_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,66 @@
+"""
+Microbenchmark for Basename registration calldata encoding.
+
+Compares the previous approach (a fresh `Web3()` and contract object per
+call) with the cached encoders of `ai_agent.abi`, after checking that
+both produce the same calldata.
+
+    python -m tests.bench_abi_encoding --names 200
+"""
+import sys
+import time
+import argparse
+
+from ai_agent.agents import (
+    L2_RESOLVER_ADDRESS_TESTNET,
+    create_register_contract_method_args,
+    l2_resolver_abi,
+)
+
+ADDRESS = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+
+
+def uncached_register_args(base_name: str, address_id: str) -> dict:
+    """The encoding as it was done before the encoder registry."""
+    from web3 import Web3
+    w3 = Web3()
+    resolver_contract = w3.eth.contract(abi=l2_resolver_abi)
+    name_hash = w3.ens.namehash(base_name)
+    address_data = resolver_contract.encode_abi("setAddr", args=[name_hash, address_id])
+    name_data = resolver_contract.encode_abi("setName", args=[name_hash, base_name])
+    return {"request": [base_name.replace(".basetest.eth", ""), address_id, "31557600",
+                        L2_RESOLVER_ADDRESS_TESTNET, [address_data, name_data], True]}
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=200, help="Number of distinct names to encode.")
+    parser.add_argument("--rounds", type=int, default=3, help="Times each name is encoded.")
+    args = parser.parse_args()
+
+    registrations = [(f"agent{i}.basetest.eth", ADDRESS) for i in range(args.names)] * args.rounds
+
+    expected = [uncached_register_args(name, address) for name, address in registrations[:args.names]]
+    single = [create_register_contract_method_args(name, address, False) for name, address in registrations[:args.names]]
+    if expected != single:
+        print("Encoders disagree with web3's encode_abi")
+        return 1
+
+    results = {
+        "uncached": timed(lambda: [uncached_register_args(n, a) for n, a in registrations]),
+        "cached": timed(lambda: [create_register_contract_method_args(n, a, False) for n, a in registrations]),
+    }
+    for name, seconds in results.items():
+        per_call = seconds / len(registrations) * 1e6
+        print(f"{name:9} {per_call:9.1f} us/name  ({results['uncached'] / seconds:5.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Cold-start benchmark for the server and the CLI.
+
+Each target is imported in a fresh interpreter, the way `uvicorn
+ai_agent.server:app` and the `ai_agent` script load it, and the median
+wall time over several runs is reported. With `--baseline` the results
+are compared against a stored run and the script fails on regressions.
+
+    python -m tests.bench_import_time --runs 5 --save import_baseline.json
+    python -m tests.bench_import_time --baseline import_baseline.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# Name -> statement run in a fresh interpreter
+TARGETS = {
+    "server": "from uvicorn.importer import import_from_string; import_from_string('ai_agent.server:app')",
+    "cli": "from ai_agent.main import main",
+}
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(statement: str, runs: int) -> float:
+    """
+    Return the median seconds taken to run `statement` in a new interpreter.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SERVER_DIR, env.get("PYTHONPATH")]))
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, cwd=SERVER_DIR, env=env)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per target (the median is reported).")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the baseline (0.2 = 20%%).")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    # Interpreter start-up alone, subtracted so the numbers show the import cost
+    interpreter = measure("pass", args.runs)
+    results = {name: measure(statement, args.runs) - interpreter for name, statement in TARGETS.items()}
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    failed = False
+    for name, seconds in results.items():
+        line = f"{name:8} {seconds * 1000:8.1f} ms"
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f"  ({change:+.0%} vs baseline)"
+            if change > args.tolerance:
+                line += "  REGRESSION"
+                failed = True
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
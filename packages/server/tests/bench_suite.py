@@ -0,0 +1,264 @@
+"""
+Offline benchmark suite for the tools, the API and the agent runtime.
+
+CDP wallets, the OpenAI model and MongoDB are replaced by the fakes of
+`tests.fakes` (turns run on the real `AgentRunner`), so the numbers show
+the overhead of our own code on top of the configured network and model
+latencies:
+
+- tools:   latency of each tool function (p50/p95, sequential calls)
+- server:  requests/s and latency of the API at several concurrency levels,
+           and how fast the accepted transfer jobs drain
+- runtime: autonomous turn time and turns/s across many active agents
+
+With `--baseline` the results are compared against a stored run and the
+script fails on regressions.
+
+    python -m tests.bench_suite --save tests/bench_baseline.json
+    python -m tests.bench_suite --baseline tests/bench_baseline.json
+"""
+import os
+
+# Settings read when ai_agent is imported: no telemetry log file, no wallet pool filler
+os.environ.setdefault("AGENT_TELEMETRY_LOG", "")
+os.environ.setdefault("WALLET_POOL_LOW_WATER", "0")
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Awaitable, Callable, Dict, List
+
+from tests.fakes import create_agents, install_fakes, reply, tool_call
+
+DESTINATION = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+NFT_CONTRACT = "0x2f0DfD2a9AF8b8E1a5D2F0b3D36c1aA1aA5bD0F1"
+
+# Turn replayed by the fake model: check the balance, send some ETH, then answer
+SCRIPT = [[
+    tool_call("get_balance", asset_id="eth"),
+    tool_call("transfer_asset", amount=0.001, asset_id="eth", destination_address=DESTINATION),
+    reply("I checked my balance and sent 0.001 ETH to my partner."),
+]]
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """
+    Return the p50 and p95 of a list of durations, in milliseconds.
+    """
+    timings = sorted(timings)
+    p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+    return {"p50_ms": statistics.median(timings) * 1000, "p95_ms": p95 * 1000}
+
+
+async def bench_tools(agent_ids: List[str], calls: int) -> Dict[str, float]:
+    from ai_agent.agents import (
+        create_token, deploy_nft, get_balance, mint_nft, register_basename,
+        request_eth_from_faucet, transfer_asset, transfer_batch,
+    )
+
+    tools: Dict[str, Callable[[str, int], Awaitable]] = {
+        "get_balance": lambda agent_id, i: get_balance(agent_id, "eth"),
+        "transfer_asset": lambda agent_id, i: transfer_asset(agent_id, 0.001, "eth", DESTINATION),
+        "create_token": lambda agent_id, i: create_token(agent_id, "Bench", "BNCH", 1000000),
+        "deploy_nft": lambda agent_id, i: deploy_nft(agent_id, "Bench", "BNFT", "https://example.com/"),
+        "mint_nft": lambda agent_id, i: mint_nft(agent_id, NFT_CONTRACT, DESTINATION),
+        "request_eth_from_faucet": lambda agent_id, i: request_eth_from_faucet(agent_id),
+        "register_basename": lambda agent_id, i: register_basename(agent_id, f"bench{i}"),
+        "transfer_batch": lambda agent_id, i: transfer_batch([
+            {"agent_id": agent_id, "amount": 0.001, "asset_id": "eth", "destination_address": DESTINATION}
+        ] * 10),
+    }
+
+    results = {}
+    for name, call in tools.items():
+        # The first call loads the wallet; the rest hit the wallet cache
+        await call(agent_ids[0], -1)
+        timings = []
+        for i in range(calls):
+            started = time.perf_counter()
+            result = await call(agent_ids[i % len(agent_ids)], i)
+            timings.append(time.perf_counter() - started)
+            if isinstance(result, str) and result.startswith(("Error", "Unexpected error")):
+                raise RuntimeError(f"{name} failed: {result}")
+        for metric, value in summarize(timings).items():
+            results[f"tools.{name}.{metric}"] = value
+    return results
+
+
+async def _load(send: Callable[[int], Awaitable], concurrency: int, requests: int) -> Dict[str, float]:
+    """
+    Send `requests` requests, `concurrency` at a time, and return the
+    throughput and latency.
+    """
+    timings = []
+    pending = iter(range(requests))
+
+    async def _client():
+        for i in pending:
+            started = time.perf_counter()
+            await send(i)
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_client() for _ in range(concurrency)))
+    return {"req_per_s": requests / (time.perf_counter() - started), **summarize(timings)}
+
+
+async def bench_server(fakes, agent_ids: List[str], levels: List[int], requests: int,
+                       repeat: int) -> Dict[str, float]:
+    import httpx
+    from ai_agent.server import app
+
+    async def _balance(client, i):
+        response = await client.get("/balance/eth", params={"agent_id": agent_ids[i % len(agent_ids)]})
+        response.raise_for_status()
+
+    async def _transfer(client, i):
+        response = await client.post("/transfer_asset", json={
+            "agent_id": agent_ids[i % len(agent_ids)], "amount": 0.001,
+            "asset_id": "eth", "destination_address": DESTINATION,
+        })
+        response.raise_for_status()
+
+    async def _chat(client, i):
+        response = await client.post(f"/chat/{agent_ids[i % len(agent_ids)]}", json={
+            "messages": [{"role": "user", "content": "Check your balance and pay your partner."}],
+        })
+        response.raise_for_status()
+        if "event: done" not in response.text:
+            raise RuntimeError(f"Chat did not finish: {response.text[-200:]}")
+
+    jobs = fakes.db.get_collection("jobs")
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for level in levels:
+                for name, send in (("balance", _balance), ("transfer_asset", _transfer), ("chat", _chat)):
+                    # Best of several rounds, so a noisy neighbour does not fail the comparison
+                    best = {}
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        stats = await _load(lambda i: send(client, i), level, requests)
+                        if name == "transfer_asset":
+                            # Accepting a job is cheap; measure until the workers finished them all
+                            while await jobs.count_documents({"state": {"$in": ["queued", "running"]}}):
+                                await asyncio.sleep(0.005)
+                            stats["jobs_per_s"] = requests / (time.perf_counter() - started)
+                        if stats["req_per_s"] > best.get("req_per_s", 0):
+                            best = stats
+
+                    if "jobs_per_s" in best:
+                        results[f"server.transfer_jobs.c{level}.jobs_per_s"] = best.pop("jobs_per_s")
+                    for metric, value in best.items():
+                        results[f"server.{name}.c{level}.{metric}"] = value
+    return results
+
+
+async def bench_runtime(turns: int, agents: int, duration: float, in_flight: int) -> Dict[str, float]:
+    from bson import ObjectId
+    from ai_agent.agents import agent_context
+    from ai_agent.db import agent_collection
+    from ai_agent.runtime import AgentRuntime, _AgentState
+
+    loop = asyncio.get_running_loop()
+    runtime = AgentRuntime(max_in_flight=in_flight)
+
+    # Turn time of one agent, turns back to back
+    agent_id = (await create_agents(1))[0]
+    state = _AgentState(await agent_collection.find_one({"_id": ObjectId(agent_id)}))
+    timings = []
+    for _ in range(turns):
+        started = time.perf_counter()
+        context_variables = await agent_context(agent_id)
+        await loop.run_in_executor(None, runtime._run_turn, state, context_variables)
+        timings.append(time.perf_counter() - started)
+    results = {f"runtime.turn.{metric}": value for metric, value in summarize(timings).items()}
+
+    # Many active agents with short intervals, scheduled by the runtime
+    await create_agents(agents, active=True, interval=0.05)
+    runtime.start()
+    await asyncio.sleep(duration)
+    results["runtime.agents.turns_per_s"] = runtime.stats()["turns"] / duration
+    await runtime.stop()
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> bool:
+    """
+    Print the results next to the baseline and return whether a median
+    latency rose or a throughput fell by more than `tolerance`. Tail
+    latencies (p95) are too noisy to gate on and are only reported.
+    """
+    failed = False
+    for name, value in results.items():
+        line = f"{name:45} {value:10.2f}"
+        if baseline.get(name):
+            if name.endswith("_per_s"):
+                change = baseline[name] / value - 1 if value else float("inf")
+            else:
+                change = value / baseline[name] - 1
+            line += f"  ({change:+.0%} slower)" if change > 0 else f"  ({-change:.0%} faster)"
+            # Sub-millisecond latencies move by more than the tolerance on noise alone
+            gated = name.endswith("_per_s") or (name.endswith("p50_ms") and value - baseline[name] > 1)
+            if gated and change > tolerance:
+                line += "  REGRESSION"
+                failed = True
+        print(line)
+    return failed
+
+
+async def run(args) -> Dict[str, float]:
+    from ai_agent.tool_loop import set_tool_loop
+
+    fakes = install_fakes(confirmation_delay=args.confirmation_delay, submit_delay=args.submit_delay,
+                          read_delay=args.read_delay, script=SCRIPT, llm_delay=args.llm_delay)
+    # Tools called by Swarm from worker threads run on this loop, like in the server
+    set_tool_loop(asyncio.get_running_loop())
+    agent_ids = await create_agents(args.agents)
+
+    results = {}
+    results.update(await bench_tools(agent_ids, args.calls))
+    results.update(await bench_server(fakes, agent_ids, args.concurrency, args.requests, args.repeat))
+    results.update(await bench_runtime(args.calls, args.agents, args.duration, args.in_flight))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--confirmation-delay", type=float, default=0.02, help="Seconds a fake transaction takes to confirm.")
+    parser.add_argument("--submit-delay", type=float, default=0.005, help="Seconds a fake transaction takes to submit.")
+    parser.add_argument("--read-delay", type=float, default=0.005, help="Seconds a fake balance read takes.")
+    parser.add_argument("--llm-delay", type=float, default=0.01, help="Seconds a fake model call takes.")
+    parser.add_argument("--agents", type=int, default=20, help="Number of agents.")
+    parser.add_argument("--calls", type=int, default=30, help="Sequential calls per tool and runtime turns timed.")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint and concurrency level.")
+    parser.add_argument("--repeat", type=int, default=3, help="Rounds per endpoint and level (the best is reported).")
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")],
+                        default=[1, 8, 32], help="Comma-separated concurrency levels.")
+    parser.add_argument("--duration", type=float, default=2, help="Seconds the runtime runs the active agents.")
+    parser.add_argument("--in-flight", type=int, default=16, help="Maximum runtime turns in flight.")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the baseline (0.2 = 20%%).")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failed = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
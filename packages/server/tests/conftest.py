@@ -0,0 +1,22 @@
+import os
+
+# Settings read when ai_agent is imported: no telemetry log file, no wallet pool filler
+os.environ.setdefault("AGENT_TELEMETRY_LOG", "")
+os.environ.setdefault("WALLET_POOL_LOW_WATER", "0")
+
+import pytest
+
+from tests.fakes import install_fakes, reset_fakes
+
+
+@pytest.fixture(scope="session")
+def _installed_fakes():
+    # Collections are resolved once per process, so the fakes are installed once
+    return install_fakes()
+
+
+@pytest.fixture
+def fakes(_installed_fakes):
+    """The fakes of `tests.fakes`, emptied before each test."""
+    reset_fakes(_installed_fakes)
+    return _installed_fakes
@@ -0,0 +1,598 @@
+"""
+In-process fakes for the services the server talks to, so benchmarks
+run offline without testnet funds or API credits:
+
+- `FakeWallet`: a CDP wallet whose writes confirm after a configurable delay.
+- `FakeModel`: an OpenAI client replaying scripted turns to the real `AgentRunner`.
+- `FakeOpenAI`: an OpenAI client answering summaries with a fixed text.
+- `FakeDatabase`: an in-memory stand-in for the Motor database.
+
+`install_fakes` wires them into `ai_agent`, `create_agents` creates
+agents through `ai_agent.agents.create_agent` and `reset_fakes` empties
+the fakes between tests.
+"""
+import os
+import copy
+import json
+import hashlib
+import time
+import functools
+import threading
+import contextlib
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+_MISSING = object()
+
+
+# --- CDP ---
+
+class FakeOperation:
+    """A submitted transfer, deployment, invocation or trade."""
+
+    def __init__(self, confirmation_delay: float, **attributes):
+        self.confirmation_delay = confirmation_delay
+        self.transaction_hash = "0x" + os.urandom(32).hex()
+        self.transaction = self
+        self.contract_address = "0x" + os.urandom(20).hex()
+        self.invocation = None
+        self.__dict__.update(attributes)
+
+    def wait(self, *args, **kwargs) -> "FakeOperation":
+        time.sleep(self.confirmation_delay)
+        if self.invocation is not None:
+            self.invocation["status"] = "complete"
+        return self
+
+    def __str__(self) -> str:
+        return self.transaction_hash
+
+
+class FakeWallet:
+    """
+    A CDP `Wallet` with in-memory balances.
+
+    Reads take `read_delay` seconds, submissions `submit_delay` and
+    confirmations (`wait()`) `confirmation_delay`. Contract invocations
+    are recorded in `invocations`, like CDP does.
+    """
+
+    def __init__(self, address: str, network_id: str = "base-sepolia", confirmation_delay: float = 0.0,
+                 submit_delay: float = 0.0, read_delay: float = 0.0, balances: Dict[str, Decimal] = None,
+                 invocations: List[dict] = None):
+        self.id = address
+        self.network_id = network_id
+        self.default_address = SimpleNamespace(address_id=address)
+        self.confirmation_delay = confirmation_delay
+        self.submit_delay = submit_delay
+        self.read_delay = read_delay
+        self._balances = balances or {"eth": Decimal("1000"), "usdc": Decimal("1000000")}
+        self.invocations = invocations if invocations is not None else []
+
+    def _submit(self, **attributes) -> FakeOperation:
+        time.sleep(self.submit_delay)
+        return FakeOperation(self.confirmation_delay, **attributes)
+
+    def balance(self, asset_id: str) -> Decimal:
+        time.sleep(self.read_delay)
+        return self._balances.get(asset_id.lower(), Decimal(0))
+
+    def balances(self) -> Dict[str, Decimal]:
+        time.sleep(self.read_delay)
+        return dict(self._balances)
+
+    def transfer(self, amount, asset_id, destination, gasless=False) -> FakeOperation:
+        self._balances[asset_id.lower()] = self._balances.get(asset_id.lower(), Decimal(0)) - Decimal(str(amount))
+        return self._submit()
+
+    def deploy_token(self, name, symbol, total_supply) -> FakeOperation:
+        return self._submit()
+
+    def deploy_nft(self, name, symbol, base_uri) -> FakeOperation:
+        return self._submit()
+
+    def invoke_contract(self, contract_address, method, args=None, abi=None, amount=None, asset_id=None) -> FakeOperation:
+        operation = self._submit()
+        operation.invocation = {"contract_address": contract_address, "method": method, "args": dict(args or {}),
+                                "status": "broadcast", "tx_hash": operation.transaction_hash}
+        self.invocations.append(operation.invocation)
+        return operation
+
+    def trade(self, amount, from_asset_id, to_asset_id) -> FakeOperation:
+        return self._submit()
+
+    def faucet(self, asset_id=None, **kwargs) -> FakeOperation:
+        return self._submit()
+
+    def export_data(self):
+        return SimpleNamespace(to_dict=lambda: {"wallet_id": self.id, "seed": fake_seed(self.id)})
+
+
+def fake_seed(wallet_id: str) -> str:
+    """The hex seed a fake wallet exports; importing checks it."""
+    return hashlib.sha512(wallet_id.encode()).hexdigest()
+
+
+class FakeWalletFactory:
+    """
+    Creates and imports `FakeWallet`s with shared delays, keeping the
+    contract invocations of each address across imports.
+    """
+
+    def __init__(self, **delays):
+        self.delays = delays
+        self.created = 0
+        self.invocations: Dict[str, List[dict]] = {}
+
+    def _wallet(self, address: str) -> FakeWallet:
+        return FakeWallet(address, invocations=self.invocations.setdefault(address, []), **self.delays)
+
+    def create_wallet(self) -> FakeWallet:
+        from eth_utils import to_checksum_address
+        self.created += 1
+        # Checksummed, like the addresses CDP returns
+        return self._wallet(to_checksum_address("0x" + os.urandom(20).hex()))
+
+    def import_wallet(self, wallet_data: dict) -> FakeWallet:
+        if wallet_data.get("seed") != fake_seed(wallet_data["wallet_id"]):
+            raise ValueError(f"Invalid seed for wallet {wallet_data['wallet_id']}")
+        return self._wallet(wallet_data["wallet_id"])
+
+    def list_contract_invocations(self, wallet: FakeWallet, limit: int) -> tuple:
+        invocations = self.invocations.get(wallet.id, [])
+        return copy.deepcopy(invocations[:limit]), len(invocations) <= limit
+
+
+# --- Swarm / OpenAI ---
+
+def tool_call(name: str, **arguments) -> dict:
+    """A scripted step in which the model calls a tool."""
+    return {"tool": name, "arguments": arguments}
+
+
+def reply(content: str) -> dict:
+    """A scripted step in which the model answers with text."""
+    return {"content": content}
+
+
+def tool_calls(*calls: dict) -> List[dict]:
+    """A scripted step in which the model calls several tools in one message."""
+    return list(calls)
+
+
+class FakeModel:
+    """
+    An OpenAI client replaying scripted turns as chat completions, for the
+    real `AgentRunner` (and Swarm loop) to run.
+
+    Each turn is a list of steps (`tool_call`, `tool_calls` or `reply`);
+    every step answers one completion request after `llm_delay` seconds,
+    streamed in `ChatCompletionChunk`s like the OpenAI API does. A request
+    whose history ends with tool results continues the turn of those
+    calls; any other request starts the next turn. Turns are replayed in a
+    cycle.
+    """
+
+    def __init__(self, script: List[List[dict]], llm_delay: float = 0.0, chunk_size: int = 16):
+        self.script = script
+        self.llm_delay = llm_delay
+        self.chunk_size = chunk_size
+        self.turns = 0
+        # System prompt and tool schemas of every turn, as the model received them
+        self.instructions: List[str] = []
+        self.tools: List[list] = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _step(self, messages: List[dict], tools: Optional[list]) -> tuple:
+        last = messages[-1]
+        if last.get("role") == "tool":
+            # Call IDs carry the turn and step they were made in
+            turn, step = (int(part) for part in last["tool_call_id"].split("_")[1:3])
+            step += 1
+        else:
+            with self._lock:
+                turn, step = self.turns, 0
+                self.turns += 1
+                self.instructions.append(messages[0]["content"])
+                self.tools.append(tools or [])
+        return turn, step, self.script[turn % len(self.script)][step]
+
+    def _create(self, model: str, messages: List[dict], tools: list = None, stream: bool = False, **kwargs):
+        from openai.types.chat import ChatCompletion
+
+        turn, step, scripted = self._step(messages, tools)
+        time.sleep(self.llm_delay)
+        calls = [scripted] if "tool" in scripted else scripted if isinstance(scripted, list) else []
+        calls = [{"id": f"call_{turn}_{step}_{index}_{os.urandom(4).hex()}", "type": "function",
+                  "function": {"name": call["tool"], "arguments": json.dumps(call["arguments"])}}
+                 for index, call in enumerate(calls)]
+        content = None if calls else scripted["content"]
+        if stream:
+            return self._chunks(model, content, calls)
+        return ChatCompletion.model_validate({
+            "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": model,
+            "choices": [{"index": 0, "finish_reason": "tool_calls" if calls else "stop",
+                         "message": {"role": "assistant", "content": content, "tool_calls": calls or None}}],
+        })
+
+    def _chunks(self, model: str, content: Optional[str], calls: List[dict]):
+        from openai.types.chat import ChatCompletionChunk
+
+        def _chunk(delta: dict, finish_reason: str = None) -> ChatCompletionChunk:
+            return ChatCompletionChunk.model_validate({
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            })
+
+        size = self.chunk_size
+        yield _chunk({"role": "assistant", "content": "" if content is not None else None})
+        for start in range(0, len(content or ""), size):
+            yield _chunk({"content": content[start:start + size]})
+        for index, call in enumerate(calls):
+            # Like the API: the name in the first delta of a call, then its arguments in pieces
+            yield _chunk({"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                          "function": {"name": call["function"]["name"], "arguments": ""}}]})
+            arguments = call["function"]["arguments"]
+            for start in range(0, len(arguments), size):
+                yield _chunk({"tool_calls": [{"index": index, "function": {"arguments": arguments[start:start + size]}}]})
+        yield _chunk({}, "tool_calls" if calls else "stop")
+
+
+class FakeOpenAI:
+    """An OpenAI client answering chat completions with a fixed text."""
+
+    def __init__(self, content: str = "Summary.", delay: float = 0.0):
+        def _create(**kwargs):
+            time.sleep(delay)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=_create))
+
+
+# --- Motor ---
+
+def _get(document: dict, path: str) -> Any:
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set(document: dict, path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[last] = value
+
+
+def _compare(value, op: str, argument) -> bool:
+    if op == "$ne":
+        return value != argument
+    if op == "$in":
+        return value in argument
+    if value is _MISSING or value is None:
+        return False
+    if op == "$lt":
+        return value < argument
+    if op == "$lte":
+        return value <= argument
+    if op == "$gt":
+        return value > argument
+    if op == "$gte":
+        return value >= argument
+    raise NotImplementedError(f"Query operator {op} is not supported by the fake.")
+
+
+def _matches(document: dict, query: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, clause) for clause in condition):
+                return False
+            continue
+        value = _get(document, key)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not all(_compare(value, op, argument) for op, argument in condition.items()):
+                return False
+        elif condition is None:
+            # Like MongoDB, null also matches a missing field
+            if value is not _MISSING and value is not None:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _project(document: dict, projection) -> dict:
+    if not projection:
+        return copy.deepcopy(document)
+    if not isinstance(projection, dict):
+        projection = {field: 1 for field in projection}
+    if any(projection.values()):
+        fields = ["_id", *(field for field, included in projection.items() if included)]
+        return {field: copy.deepcopy(document[field]) for field in fields if field in document}
+
+    projected = copy.deepcopy(document)
+    for path in projection:
+        *parents, last = path.split(".")
+        parent = projected
+        for part in parents:
+            parent = parent.get(part) if isinstance(parent, dict) else None
+        if isinstance(parent, dict):
+            parent.pop(last, None)
+    return projected
+
+
+def _apply_update(document: dict, update: dict) -> None:
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if op == "$set":
+                _set(document, path, copy.deepcopy(value))
+            elif op == "$inc":
+                current = _get(document, path)
+                _set(document, path, (0 if current is _MISSING else current) + value)
+            elif op == "$unset":
+                *parents, last = path.split(".")
+                parent = document
+                for part in parents:
+                    parent = parent.get(part, {})
+                parent.pop(last, None)
+            else:
+                raise NotImplementedError(f"Update operator {op} is not supported by the fake.")
+
+
+def _sort_key(value):
+    # Missing and None sort first, like in MongoDB
+    return (value is not _MISSING and value is not None, value if value is not _MISSING else None)
+
+
+class FakeCursor:
+    def __init__(self, documents: List[dict], projection=None):
+        self._documents = documents
+        self._projection = projection
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1) -> "FakeCursor":
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self._documents.sort(key=lambda document: _sort_key(_get(document, field)), reverse=order < 0)
+        return self
+
+    def limit(self, limit: int) -> "FakeCursor":
+        self._limit = limit
+        return self
+
+    def _results(self) -> List[dict]:
+        documents = self._documents[:self._limit] if self._limit else self._documents
+        return [_project(document, self._projection) for document in documents]
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        results = self._results()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        async def _iterate():
+            for document in self._results():
+                yield document
+        return _iterate()
+
+
+class FakeCollection:
+    """The subset of a Motor collection used by `ai_agent`, in memory."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.documents: Dict[Any, dict] = {}
+        self.operations = 0
+
+    def _find(self, query: dict) -> List[dict]:
+        self.operations += 1
+        return [document for document in self.documents.values() if _matches(document, query or {})]
+
+    async def create_index(self, keys, **kwargs) -> str:
+        return str(keys)
+
+    async def insert_one(self, document: dict):
+        document.setdefault("_id", ObjectId())
+        if document["_id"] in self.documents:
+            raise DuplicateKeyError(f"Duplicate _id {document['_id']}")
+        self.operations += 1
+        self.documents[document["_id"]] = copy.deepcopy(document)
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def insert_many(self, documents: List[dict], ordered: bool = True):
+        inserted_ids = [(await self.insert_one(document)).inserted_id for document in documents]
+        return SimpleNamespace(inserted_ids=inserted_ids)
+
+    async def find_one(self, query: dict = None, projection=None, sort=None) -> Optional[dict]:
+        documents = self._find(query)
+        if sort:
+            documents = FakeCursor(documents).sort(sort)._documents
+        return _project(documents[0], projection) if documents else None
+
+    def find(self, query: dict = None, projection=None) -> FakeCursor:
+        return FakeCursor(self._find(query), projection)
+
+    async def count_documents(self, query: dict) -> int:
+        return len(self._find(query))
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        documents = self._find(query)
+        if documents:
+            _apply_update(documents[0], update)
+        elif upsert:
+            # Like MongoDB, the new document starts from the equality conditions of the query
+            document = {key: value for key, value in query.items()
+                        if not key.startswith("$") and not isinstance(value, dict)}
+            _apply_update(document, update)
+            await self.insert_one(document)
+        return SimpleNamespace(matched_count=len(documents[:1]), modified_count=len(documents[:1]))
+
+    async def update_many(self, query: dict, update: dict):
+        documents = self._find(query)
+        for document in documents:
+            _apply_update(document, update)
+        return SimpleNamespace(matched_count=len(documents), modified_count=len(documents))
+
+    async def find_one_and_update(self, query: dict, update: dict, sort=None, return_document: bool = False,
+                                  projection=None) -> Optional[dict]:
+        documents = self._find(query)
+        if sort:
+            documents = FakeCursor(documents).sort(sort)._documents
+        if not documents:
+            return None
+        before = copy.deepcopy(documents[0])
+        _apply_update(documents[0], update)
+        return _project(documents[0] if return_document else before, projection)
+
+    async def delete_many(self, query: dict):
+        documents = self._find(query)
+        for document in documents:
+            del self.documents[document["_id"]]
+        return SimpleNamespace(deleted_count=len(documents))
+
+    async def delete_one(self, query: dict):
+        documents = self._find(query)
+        if documents:
+            del self.documents[documents[0]["_id"]]
+        return SimpleNamespace(deleted_count=len(documents[:1]))
+
+    async def bulk_write(self, operations: list, ordered: bool = True):
+        for operation in operations:
+            await self.update_one(operation._filter, operation._doc)
+
+    def aggregate(self, pipeline: List[dict]):
+        async def _aggregate():
+            documents = list(self.documents.values())
+            for stage in pipeline:
+                if "$match" in stage:
+                    documents = [document for document in documents if _matches(document, stage["$match"])]
+                elif "$group" in stage:
+                    group = stage["$group"]
+                    rows = {}
+                    for document in documents:
+                        key = _get(document, group["_id"].lstrip("$"))
+                        row = rows.setdefault(key, {"_id": key, **{field: 0 for field in group if field != "_id"}})
+                        for field in group:
+                            if field != "_id":
+                                row[field] += 1
+                    documents = list(rows.values())
+                else:
+                    raise NotImplementedError(f"Aggregation stage {stage} is not supported by the fake.")
+            for document in documents:
+                yield copy.deepcopy(document)
+        return _aggregate()
+
+    def watch(self, *args, **kwargs):
+        # Like a standalone server, so the registry falls back to polling
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+
+class FakeDatabase:
+    """An in-memory stand-in for the `ai` Motor database."""
+
+    def __init__(self):
+        self.collections: Dict[str, FakeCollection] = {}
+
+    def get_collection(self, name: str) -> FakeCollection:
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(name)
+        return self.collections[name]
+
+
+def install_fakes(confirmation_delay: float = 0.0, submit_delay: float = 0.0, read_delay: float = 0.0,
+                  script: List[List[dict]] = None, llm_delay: float = 0.0) -> SimpleNamespace:
+    """
+    Wire the fakes into `ai_agent`. Must be called before any collection
+    of `ai_agent.db` is used.
+
+    Returns:
+        SimpleNamespace: The `db`, `wallets` factory, scripted `model` and
+        summarizer `openai` clients.
+    """
+    import ai_agent.db
+    import ai_agent.agents
+    import ai_agent.memory
+    import ai_agent.runner
+    import ai_agent.runtime
+
+    fakes = SimpleNamespace(
+        db=FakeDatabase(),
+        wallets=FakeWalletFactory(confirmation_delay=confirmation_delay, submit_delay=submit_delay,
+                                  read_delay=read_delay),
+        model=FakeModel(script or [[reply("Nothing to do.")]], llm_delay=llm_delay),
+        openai=FakeOpenAI(),
+    )
+    ai_agent.db.get_database = lambda: fakes.db
+    ai_agent.agents.configure_cdp = lambda: None
+    # Wallet seeds are encrypted with a key derived from the CDP API key
+    from cdp import Cdp
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    Cdp.private_key = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+    ai_agent.agents._create_wallet = fakes.wallets.create_wallet
+    ai_agent.agents._import_wallet = fakes.wallets.import_wallet
+    ai_agent.agents._list_contract_invocations = fakes.wallets.list_contract_invocations
+    ai_agent.runtime.AgentRunner = functools.partial(ai_agent.runner.AgentRunner, client=fakes.model)
+    ai_agent.runtime.ConversationMemory = functools.partial(
+        ai_agent.memory.ConversationMemory, summarizer=ai_agent.memory.openai_summarizer(fakes.openai))
+
+    import ai_agent.server
+    ai_agent.server._swarm_client = ai_agent.runner.AgentRunner(client=fakes.model)
+    return fakes
+
+
+def reset_fakes(fakes: SimpleNamespace) -> None:
+    """
+    Empty the fake database, the scripted turns counter and the in-process
+    caches, so each test starts from a clean state.
+    """
+    from ai_agent.agents import agent_cache, balance_cache, wallet_cache
+    from ai_agent.registry import agent_registry
+
+    for collection in fakes.db.collections.values():
+        collection.documents.clear()
+    fakes.wallets.delays = dict.fromkeys(fakes.wallets.delays, 0.0)
+    fakes.wallets.invocations.clear()
+    fakes.model.script = [[reply("Nothing to do.")]]
+    fakes.model.turns = 0
+    fakes.model.instructions.clear()
+    fakes.model.tools.clear()
+    for cache in (agent_cache, balance_cache, wallet_cache, agent_registry):
+        cache.clear()
+
+
+async def create_agents(count: int, **fields) -> List[str]:
+    """
+    Create `count` agents with fake wallets through `create_agent` and
+    return their IDs. `fields` are passed on (`active`, `interval`, `tools`).
+    """
+    from ai_agent.agents import create_agent
+
+    agent_ids = []
+    for index in range(count):
+        agent_data = await create_agent(f"Agent {index}", "You are a benchmark agent.", **fields)
+        agent_ids.append(agent_data["_id"])
+    return agent_ids
+
+
+@contextlib.asynccontextmanager
+async def api_client():
+    """
+    Run the server lifespan (job workers, registry watcher, ...) and yield
+    an httpx client calling the app in process.
+    """
+    import httpx
+    from ai_agent.server import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            yield client
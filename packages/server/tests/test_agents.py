@@ -0,0 +1,136 @@
+import asyncio
+
+from tests.fakes import api_client, create_agents, fake_seed, reply, tool_call
+
+DESTINATION = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+
+
+def test_created_agent_stores_its_wallet_data(fakes):
+    async def scenario():
+        from ai_agent.agents import find_agent_by_address, load_wallet
+
+        [agent_id] = await create_agents(1)
+        document = next(iter(fakes.db.get_collection("agents").documents.values()))
+        assert document["wallet"]["wallet_id"] == document["address"]
+        # The seed is stored encrypted and decrypted when the wallet is loaded
+        assert document["wallet"]["encrypted"]
+        assert document["wallet"]["seed"] != fake_seed(document["address"])
+        assert (await load_wallet(agent_id)).id == document["address"]
+
+        found = await find_agent_by_address(document["address"].lower())
+        assert str(found["_id"]) == agent_id
+        assert "seed" not in found["wallet"]
+
+    asyncio.run(scenario())
+
+
+def test_new_agent_tools_over_the_api(fakes):
+    async def scenario():
+        async with api_client() as client:
+            response = await client.post("/create_agent", json={"name": "Ada", "instructions": "Be brief."})
+            assert response.status_code == 200
+            agent = response.json()["agent"]
+            assert "seed" not in agent["wallet"]
+
+            response = await client.get("/balance/eth", params={"agent_id": agent["_id"]})
+            assert response.status_code == 200
+            assert response.json() == {"result": "Current balance of eth: 1000"}
+
+            response = await client.get(f"/balances/{agent['_id']}")
+            assert response.status_code == 200
+
+            response = await client.get(f"/agents/{agent['_id']}")
+            assert "seed" not in response.json()["result"]["wallet"]
+
+    asyncio.run(scenario())
+
+
+def test_chat_runs_bound_tools_of_a_new_agent(fakes):
+    fakes.model.script = [[
+        tool_call("get_balance", asset_id="eth"),
+        tool_call("transfer_asset", amount=1, asset_id="eth", destination_address=DESTINATION),
+        reply("Sent."),
+    ]]
+
+    async def scenario():
+        async with api_client() as client:
+            response = await client.post("/create_agent", json={"name": "Ada", "instructions": "Be brief."})
+            agent = response.json()["agent"]
+
+            response = await client.post(f"/chat/{agent['_id']}", json={
+                "messages": [{"role": "user", "content": "Pay your partner."}],
+            })
+            assert "event: done" in response.text
+            assert "Current balance of eth: 1000" in response.text
+            assert f"Transferred 1 eth to {DESTINATION}" in response.text
+
+            response = await client.get("/balance/eth", params={"agent_id": agent["_id"]})
+            assert response.json() == {"result": "Current balance of eth: 999"}
+
+        # The model sees the address, never the wallet data
+        [instructions] = fakes.model.instructions
+        assert agent["address"] in instructions
+        assert fake_seed(agent["address"]) not in instructions
+
+    asyncio.run(scenario())
+
+
+def test_agent_changes_drop_the_cached_wallet(fakes):
+    async def scenario():
+        from ai_agent.agents import load_wallet, set_agent_active, set_agent_tools, wallet_cache
+
+        [agent_id] = await create_agents(1)
+        for change in (lambda: set_agent_active(agent_id, True), lambda: set_agent_tools(agent_id, ["get_balance"])):
+            await load_wallet(agent_id)
+            assert wallet_cache.get(agent_id) is not None
+            await change()
+            assert wallet_cache.get(agent_id) is None
+
+    asyncio.run(scenario())
+
+
+def test_bound_tools_get_the_wallet_of_the_turn(fakes, monkeypatch):
+    import ai_agent.agents
+
+    fakes.model.script = [[
+        tool_call("get_balance", asset_id="eth"),
+        tool_call("transfer_asset", amount=1, asset_id="eth", destination_address=DESTINATION),
+        reply("Sent."),
+    ]]
+    load_wallet = ai_agent.agents.load_wallet
+    loads = []
+
+    async def _load_wallet(agent_id):
+        loads.append(agent_id)
+        return await load_wallet(agent_id)
+
+    monkeypatch.setattr(ai_agent.agents, "load_wallet", _load_wallet)
+
+    async def scenario():
+        [agent_id] = await create_agents(1)
+        async with api_client() as client:
+            response = await client.post(f"/chat/{agent_id}", json={
+                "messages": [{"role": "user", "content": "Pay your partner."}],
+            })
+            assert f"Transferred 1 eth to {DESTINATION}" in response.text
+        # Resolved once for the turn, then handed to each tool
+        assert loads == [agent_id]
+
+    asyncio.run(scenario())
+
+
+def test_unloadable_wallet_is_logged(fakes, caplog):
+    async def scenario():
+        from bson import ObjectId
+        from ai_agent.agents import agent_context
+
+        agents = fakes.db.get_collection("agents")
+        agent_id = ObjectId()
+        # Saved before wallet data was stored: only the address
+        await agents.insert_one({"_id": agent_id, "name": "Old", "instructions": "", "wallet": DESTINATION})
+        assert await agent_context(str(agent_id)) == {"agent_id": str(agent_id)}
+
+    with caplog.at_level("WARNING", logger="ai_agent.agents"):
+        asyncio.run(scenario())
+    assert "Failed to load the wallet of agent" in caplog.text
+    assert "Wallet data not found" in caplog.text
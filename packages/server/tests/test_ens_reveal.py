@@ -0,0 +1,59 @@
+import asyncio
+from datetime import timedelta
+
+from tests.fakes import FakeWallet, create_agents
+
+OWNER = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+SECRET = "0x" + "ab" * 32
+
+
+def test_retried_reveal_checks_the_sent_registration(fakes, monkeypatch):
+    from cdp import SmartContract
+
+    invoke_contract = FakeWallet.invoke_contract
+    sent = []
+    available = {"value": True}
+
+    def _invoke_contract(self, contract_address, method, args=None, **kwargs):
+        sent.append(args["name"])
+        operation = invoke_contract(self, contract_address, method, args, **kwargs)
+        if len(sent) == 1:
+            def _wait(*wait_args, **wait_kwargs):
+                raise TimeoutError("Not confirmed in time")
+            operation.wait = _wait
+        return operation
+
+    monkeypatch.setattr(FakeWallet, "invoke_contract", _invoke_contract)
+    monkeypatch.setattr(SmartContract, "read", lambda *args, **kwargs: available["value"])
+
+    async def scenario():
+        from ai_agent.agents import reveal_ens_domain
+        from ai_agent.ens_scheduler import _now, _process_reveal, claim_due_reveal, reveal_collection, schedule_reveal
+
+        [agent_id] = await create_agents(1)
+
+        async def _attempt():
+            await reveal_collection.update_many({"status": "pending"}, {"$set": {"due_at": _now() - timedelta(seconds=1)}})
+            reveal = await claim_due_reveal()
+            await _process_reveal(reveal, reveal_ens_domain)
+            return await reveal_collection.find_one({"_id": reveal["_id"]})
+
+        # The first register transaction is sent but its confirmation times out
+        await schedule_reveal(agent_id, "first.eth", OWNER, 31536000, SECRET, 0.01, _now())
+        reveal = await _attempt()
+        assert reveal["status"] == "pending" and reveal["tx_hash"]
+        # It went through after all: the retry sees the name taken and sends nothing
+        available["value"] = False
+        reveal = await _attempt()
+        assert reveal["status"] == "done" and reveal["tx_hash"] in reveal["result"]
+        assert sent == ["first"]
+
+        # A sent registration that never landed leaves the name available and is sent again
+        await schedule_reveal(agent_id, "second.eth", OWNER, 31536000, SECRET, 0.01, _now())
+        available["value"] = True
+        await reveal_collection.update_one({"domain": "second.eth"}, {"$set": {"tx_hash": "0xdropped"}})
+        reveal = await _attempt()
+        assert reveal["status"] == "done" and reveal["tx_hash"] != "0xdropped"
+        assert sent == ["first", "second"]
+
+    asyncio.run(scenario())
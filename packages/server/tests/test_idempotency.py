@@ -0,0 +1,75 @@
+import asyncio
+from datetime import timedelta
+
+from tests.fakes import api_client, create_agents
+
+DESTINATION = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+
+
+async def _wait_for_jobs(fakes):
+    jobs = fakes.db.get_collection("jobs")
+    while await jobs.count_documents({"state": {"$in": ["queued", "running"]}}):
+        await asyncio.sleep(0.005)
+
+
+def test_idempotency_key_replays_the_first_job(fakes):
+    async def scenario():
+        [agent_id] = await create_agents(1)
+        body = {"agent_id": agent_id, "amount": 1, "asset_id": "eth", "destination_address": DESTINATION}
+        headers = {"Idempotency-Key": "transfer-1"}
+
+        async with api_client() as client:
+            responses = await asyncio.gather(*(
+                client.post("/transfer_asset", json=body, headers=headers) for _ in range(5)
+            ))
+            assert {response.status_code for response in responses} == {202}
+            assert len({response.json()["job_id"] for response in responses}) == 1
+            assert sum(response.headers.get("Idempotent-Replayed") == "true" for response in responses) == 4
+
+            await _wait_for_jobs(fakes)
+            response = await client.post("/transfer_asset", json=body, headers=headers)
+            assert response.json()["state"] == "succeeded"
+            assert response.json()["result"] == f"Transferred 1.0 eth to {DESTINATION}"
+
+            response = await client.post("/transfer_asset", json={**body, "amount": 2}, headers=headers)
+            assert response.status_code == 422
+
+            response = await client.get("/balance/eth", params={"agent_id": agent_id})
+            assert response.json() == {"result": "Current balance of eth: 999.0"}
+
+        assert await fakes.db.get_collection("jobs").count_documents({}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_reservation_is_taken_over(fakes):
+    async def scenario():
+        from ai_agent.idempotency import IDEMPOTENCY_RESERVATION_GRACE, _now, reserve_idempotency_key
+        from ai_agent.server import TransferRequest
+
+        [agent_id] = await create_agents(1)
+        body = {"agent_id": agent_id, "amount": 1, "asset_id": "eth", "destination_address": DESTINATION}
+        # The process reserving the key died before submitting the job
+        abandoned_id, _ = await reserve_idempotency_key("transfer-1", "transfer_asset",
+                                                        TransferRequest(**body).model_dump())
+        keys = fakes.db.get_collection("idempotency_keys")
+
+        async with api_client() as client:
+            headers = {"Idempotency-Key": "transfer-1"}
+            response = await client.post("/transfer_asset", json=body, headers=headers)
+            # Within the grace period the first request may still be submitting
+            assert response.json() == {"job_id": str(abandoned_id), "status_url": f"/jobs/{abandoned_id}",
+                                       "state": "queued"}
+
+            stale = _now() - timedelta(seconds=IDEMPOTENCY_RESERVATION_GRACE + 1)
+            await keys.update_one({"_id": "transfer-1"}, {"$set": {"created_at": stale}})
+            responses = await asyncio.gather(*(
+                client.post("/transfer_asset", json=body, headers=headers) for _ in range(3)
+            ))
+            job_ids = {response.json()["job_id"] for response in responses}
+            assert len(job_ids) == 1 and str(abandoned_id) not in job_ids
+            await _wait_for_jobs(fakes)
+
+        assert await fakes.db.get_collection("jobs").count_documents({"state": "succeeded"}) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+import asyncio
+from datetime import timedelta
+
+from tests.fakes import api_client, create_agents
+
+DESTINATION = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+
+
+async def _wait_for_job(client, job_id: str) -> dict:
+    while True:
+        job = (await client.get(f"/jobs/{job_id}")).json()["result"]
+        if job["state"] not in ("queued", "running"):
+            return job
+        await asyncio.sleep(0.005)
+
+
+def test_only_jobs_with_an_expired_lease_are_recovered(fakes):
+    async def scenario():
+        from ai_agent.jobs import _now, recover_interrupted_jobs
+
+        jobs = fakes.db.get_collection("jobs")
+        await jobs.insert_many([
+            {"_id": "live", "state": "running", "lease_until": _now() + timedelta(seconds=60)},
+            {"_id": "expired", "state": "running", "lease_until": _now() - timedelta(seconds=1)},
+            {"_id": "legacy", "state": "running"},
+        ])
+        assert await recover_interrupted_jobs() == 2
+        states = {job["_id"]: job["state"] for job in await jobs.find({}).to_list(length=None)}
+        assert states == {"live": "running", "expired": "failed", "legacy": "failed"}
+
+    asyncio.run(scenario())
+
+
+def test_transfer_batch_job_state_follows_its_items(fakes):
+    async def scenario():
+        [agent_id] = await create_agents(1)
+        transfer = {"agent_id": agent_id, "asset_id": "eth", "destination_address": DESTINATION}
+
+        async with api_client() as client:
+            states = []
+            for amounts in ([1, 2], [1, 5000], [5000, 6000]):
+                response = await client.post("/transfer_batch", json={
+                    "transfers": [{**transfer, "amount": amount} for amount in amounts],
+                })
+                job = await _wait_for_job(client, response.json()["job_id"])
+                states.append((job["state"], job.get("error")))
+
+        assert states == [("succeeded", None), ("partial", "1 of 2 items failed."),
+                          ("failed", "2 of 2 items failed.")]
+
+    asyncio.run(scenario())
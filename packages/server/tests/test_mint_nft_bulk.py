@@ -0,0 +1,147 @@
+import json
+import asyncio
+
+import pytest
+
+from tests.fakes import FakeWallet, api_client, create_agents
+
+CONTRACT = "0x2f0DfD2a9AF8b8E1a5D2F0b3D36c1aA1aA5bD0F1"
+MINTED = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+UNCONFIRMED = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+FAILED = "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359"
+
+
+@pytest.fixture(autouse=True)
+def _fast_polling(monkeypatch):
+    monkeypatch.setattr("ai_agent.agents.BULK_MINT_POLL_INTERVAL", 0.005)
+
+
+async def _mint(client, **params) -> list:
+    if "run_id" in params:
+        response = await client.post("/mint_nft_bulk", params=params)
+    else:
+        response = await client.post("/mint_nft_bulk", json=params)
+    assert response.status_code == 200, response.text
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_resume_never_mints_a_sent_item_twice(fakes, monkeypatch):
+    invoke_contract = FakeWallet.invoke_contract
+    sent = []
+
+    def _invoke_contract(self, contract_address, method, args=None, **kwargs):
+        if args["to"] == FAILED:
+            raise RuntimeError("Submission rejected")
+        sent.append(args["to"])
+        operation = invoke_contract(self, contract_address, method, args, **kwargs)
+        if args["to"] == UNCONFIRMED:
+            def _wait(*wait_args, **wait_kwargs):
+                raise TimeoutError("Not confirmed in time")
+            operation.wait = _wait
+        return operation
+
+    monkeypatch.setattr(FakeWallet, "invoke_contract", _invoke_contract)
+
+    async def scenario():
+        [agent_id] = await create_agents(1)
+        async with api_client() as client:
+            recipients = [{"to": MINTED}, {"to": UNCONFIRMED}, {"to": FAILED}]
+            events = await _mint(client, agent_id=agent_id, contract_address=CONTRACT, recipients=recipients)
+            run_id = events[0]["run_id"]
+            by_recipient = {event["to"]: event for event in events if "to" in event}
+            assert by_recipient[MINTED]["event"] == "minted"
+            assert by_recipient[UNCONFIRMED]["event"] == "unconfirmed"
+            assert by_recipient[UNCONFIRMED]["tx_hash"]
+            assert by_recipient[FAILED]["event"] == "failed"
+            assert events[-1] == {"event": "finished", "run_id": run_id, "total": 3,
+                                  "minted": 1, "submitted": 1, "failed": 1}
+            job = (await client.get(f"/jobs/{events[0]['job_id']}")).json()["result"]
+            assert (job["state"], job["error"]) == ("partial", "1 of 3 items failed.")
+
+            monkeypatch.setattr(FakeWallet, "invoke_contract", invoke_contract)
+            events = await _mint(client, run_id=run_id)
+            by_recipient = {event["to"]: event for event in events if "to" in event}
+            assert set(by_recipient) == {UNCONFIRMED, FAILED}
+            # Still pending on chain: reported, never sent again
+            assert by_recipient[UNCONFIRMED]["event"] == "skipped"
+            assert by_recipient[FAILED]["event"] == "minted"
+            assert sent == [MINTED, UNCONFIRMED]
+
+    asyncio.run(scenario())
+
+
+def test_resume_checks_items_interrupted_while_submitting(fakes):
+    async def scenario():
+        from ai_agent.agents import load_wallet
+        from ai_agent.mint_runs import create_mint_run, mint_item_collection
+
+        [agent_id] = await create_agents(1)
+        recipients = [{"to": MINTED}, {"to": UNCONFIRMED}, {"to": FAILED}]
+        run_id = await create_mint_run(agent_id, CONTRACT, recipients)
+        # The process died while the first two mints were being sent: the
+        # first reached the chain, the second was never signed
+        wallet = await load_wallet(agent_id)
+        wallet.invocations.append({"contract_address": CONTRACT, "method": "mint",
+                                   "args": {"to": MINTED, "quantity": "1"},
+                                   "status": "complete", "tx_hash": "0xlanded"})
+        await mint_item_collection.update_many({"index": {"$lt": 2}}, {"$set": {"status": "submitting"}})
+
+        async with api_client() as client:
+            events = await _mint(client, run_id=run_id)
+
+        assert [(event["event"], event["to"]) for event in events if "to" in event] == [
+            ("minted", MINTED), ("minted", UNCONFIRMED), ("minted", FAILED),
+        ]
+        assert events[1]["tx_hash"] == "0xlanded"
+        assert [invocation["args"]["to"] for invocation in wallet.invocations] == [MINTED, UNCONFIRMED, FAILED]
+
+    asyncio.run(scenario())
+
+
+def test_disconnecting_does_not_stop_the_run(fakes):
+    async def scenario():
+        from ai_agent.agents import mint_nft_bulk
+
+        fakes.wallets.delays["confirmation_delay"] = 0.02
+        [agent_id] = await create_agents(1)
+        recipients = [{"to": MINTED, "quantity": 2}, {"to": UNCONFIRMED}, {"to": FAILED}]
+        async with api_client() as client:
+            events = mint_nft_bulk(agent_id, CONTRACT, recipients, concurrency=1)
+            started = await events.__anext__()
+            await events.aclose()
+
+            while True:
+                job = (await client.get(f"/jobs/{started['job_id']}")).json()["result"]
+                if job["state"] not in ("queued", "running"):
+                    break
+                await asyncio.sleep(0.01)
+            assert job["state"] == "succeeded"
+            assert job["result"]["minted"] == 3
+
+            # Watching the finished run again only reports its state
+            events = await _mint(client, run_id=started["run_id"])
+            assert events[-1] == {"event": "finished", "run_id": started["run_id"], "total": 3, "minted": 3}
+
+    asyncio.run(scenario())
+
+
+def test_invalid_recipients_are_rejected_before_the_run_starts(fakes):
+    async def scenario():
+        [agent_id] = await create_agents(1)
+        async with api_client() as client:
+            response = await client.post("/mint_nft_bulk", json={
+                "agent_id": agent_id, "contract_address": CONTRACT,
+                "recipients": [{"to": MINTED}, {"to": "0xnot-an-address"}],
+            })
+            assert response.status_code == 400
+            assert "Recipient 1" in response.json()["detail"]
+
+            response = await client.post("/mint_nft_bulk", params={"agent_id": agent_id, "contract_address": CONTRACT},
+                                         content=json.dumps({"to": MINTED}) + "\n{broken\n",
+                                         headers={"content-type": "application/x-ndjson"})
+            assert response.status_code == 400
+
+        assert not fakes.db.get_collection("mint_runs").documents
+        assert not fakes.db.get_collection("mint_items").documents
+
+    asyncio.run(scenario())
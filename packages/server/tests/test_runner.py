@@ -0,0 +1,135 @@
+import json
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from ai_agent.runner import AgentRunner, _get_tool_pool, read_only
+from tests.fakes import api_client, create_agents, reply, tool_call, tool_calls
+
+DESTINATION = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+
+
+def _tool_call(index: int, name: str, **arguments) -> SimpleNamespace:
+    return SimpleNamespace(id=f"call-{index}", function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+def test_tool_calls_run_in_lanes_on_a_shared_pool():
+    log, lock = [], threading.Lock()
+
+    def _record(name: str, value: int) -> str:
+        with lock:
+            log.append(("start", name, value))
+        time.sleep(0.05)
+        with lock:
+            log.append(("end", name, value))
+        return f"{name} {value}"
+
+    @read_only
+    def get_balance(asset_id: str, context_variables: dict = None):
+        return _record("get_balance", int(asset_id))
+
+    def transfer_asset(amount: int, context_variables: dict = None):
+        return _record("transfer_asset", amount)
+
+    runner = AgentRunner(client=object(), max_tool_concurrency=4)
+    tool_calls = [_tool_call(0, "transfer_asset", amount=1), _tool_call(1, "get_balance", asset_id="1"),
+                  _tool_call(2, "transfer_asset", amount=2), _tool_call(3, "get_balance", asset_id="2")]
+
+    started = time.perf_counter()
+    response = runner.handle_tool_calls(tool_calls, [get_balance, transfer_asset], {"agent_id": "a"}, False)
+    elapsed = time.perf_counter() - started
+
+    assert [message["content"] for message in response.messages] == [
+        "transfer_asset 1", "get_balance 1", "transfer_asset 2", "get_balance 2"]
+    # Both reads overlap the writes, which run one after the other in their lane
+    assert elapsed < 0.14
+    writes = [entry for entry in log if entry[1] == "transfer_asset"]
+    assert writes == [("start", "transfer_asset", 1), ("end", "transfer_asset", 1),
+                      ("start", "transfer_asset", 2), ("end", "transfer_asset", 2)]
+
+    pool = _get_tool_pool()
+    runner.handle_tool_calls(tool_calls, [get_balance, transfer_asset], {"agent_id": "a"}, False)
+    assert _get_tool_pool() is pool
+
+
+def test_lanes_of_one_message_are_capped():
+    running, peak, lock = [0], [0], threading.Lock()
+
+    @read_only
+    def get_balance(asset_id: str):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return asset_id
+
+    runner = AgentRunner(client=object(), max_tool_concurrency=2)
+    tool_calls = [_tool_call(index, "get_balance", asset_id=str(index)) for index in range(6)]
+    response = runner.handle_tool_calls(tool_calls, [get_balance], {}, False)
+    assert [message["content"] for message in response.messages] == [str(index) for index in range(6)]
+    assert peak[0] == 2
+
+
+async def _chat(client, agent_id: str) -> list:
+    response = await client.post(f"/chat/{agent_id}", json={"messages": [{"role": "user", "content": "Go."}]})
+    for event in response.text.split("\n\n"):
+        if event.startswith("event: done"):
+            return json.loads(event.split("data: ", 1)[1])["messages"]
+    raise AssertionError(response.text)
+
+
+def test_model_gets_the_cached_schemas_of_the_agent_tools(fakes):
+    fakes.model.script = [[tool_call("get_balance", asset_id="eth"), reply("Done.")]]
+
+    async def scenario():
+        [agent_id] = await create_agents(1, tools=["transfer_asset", "get_balance"])
+        async with api_client() as client:
+            for _ in range(2):
+                messages = await _chat(client, agent_id)
+                assert messages[1]["content"] == "Current balance of eth: 1000"
+
+        first, second = fakes.model.tools
+        # Only the selected tools, in the Based Agent order, without the bound parameters
+        assert [schema["function"]["name"] for schema in first] == ["transfer_asset", "get_balance"]
+        for schema in first:
+            assert not {"agent_id", "agent_wallet", "context_variables"} & set(schema["function"]["parameters"]["properties"])
+        assert first[1]["function"]["parameters"]["required"] == ["asset_id"]
+        # Built once, not per completion request
+        assert all(a is b for a, b in zip(first, second))
+
+    asyncio.run(scenario())
+
+
+def test_chat_runs_the_tool_calls_of_a_message_in_lanes(fakes):
+    fakes.model.script = [[
+        tool_calls(
+            tool_call("get_balance", asset_id="eth"),
+            tool_call("transfer_asset", amount=1, asset_id="eth", destination_address=DESTINATION),
+            tool_call("get_balance", asset_id="usdc"),
+            tool_call("transfer_asset", amount=2, asset_id="eth", destination_address=DESTINATION),
+        ),
+        reply("Done."),
+    ]]
+
+    async def scenario():
+        fakes.wallets.delays["read_delay"] = 0.2
+        [agent_id] = await create_agents(1)
+        async with api_client() as client:
+            started = time.perf_counter()
+            messages = await _chat(client, agent_id)
+            elapsed = time.perf_counter() - started
+
+        [call_message] = [message for message in messages if message.get("tool_calls")]
+        results = [message for message in messages if message["role"] == "tool"]
+        # One result per call, in the order the model made them
+        assert [result["tool_call_id"] for result in results] == [call["id"] for call in call_message["tool_calls"]]
+        assert results[2]["content"] == "Current balance of usdc: 1000000"
+        assert [result["content"] for result in results[1::2]] == [
+            f"Transferred 1 eth to {DESTINATION}", f"Transferred 2 eth to {DESTINATION}"]
+        # The two reads run at the same time
+        assert elapsed < 0.35
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+import asyncio
+
+from tests.fakes import api_client, create_agents
+
+
+def test_runtime_start_and_stop_over_the_api(fakes):
+    async def scenario():
+        from ai_agent.runtime import runtime
+
+        async with api_client() as client:
+            [agent_id] = await create_agents(1, active=True, interval=0.05)
+
+            response = await client.post("/runtime/start")
+            assert response.status_code == 200
+            assert runtime.running
+
+            await asyncio.sleep(0.3)
+            stats = (await client.get("/runtime")).json()["result"]
+            assert stats["agents"] == 1
+            assert stats["agent_stats"][agent_id]["turns"] > 0
+            assert stats["errors"] == 0
+
+            response = await client.post("/runtime/stop")
+            assert response.status_code == 200
+            assert not runtime.running
+            assert (await client.get("/runtime")).json()["result"]["agents"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_reactivated_agent_keeps_its_rate(fakes):
+    async def scenario():
+        from ai_agent.agents import set_agent_active
+        from ai_agent.runtime import AgentRuntime
+
+        runtime = AgentRuntime()
+        [agent_id] = await create_agents(1, active=True, interval=0.1)
+        runtime.start()
+        await runtime.refresh()
+        for _ in range(3):
+            await set_agent_active(agent_id, False)
+            await runtime.refresh()
+            await set_agent_active(agent_id, True)
+            await runtime.refresh()
+
+        turns = runtime.stats()["turns"]
+        await asyncio.sleep(1)
+        # One turn per interval, not one per stale schedule entry
+        assert runtime.stats()["turns"] - turns <= 11
+        await runtime.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+from tests.fakes import FakeWallet, create_agents
+
+DESTINATION = "0x49aE3cC2e3AA768B1e5654f5D3C6002144A59581"
+REJECTED = "0x000000000000000000000000000000000000dEaD"
+
+
+def test_failures_stay_with_their_items(fakes, monkeypatch):
+    transfer = FakeWallet.transfer
+
+    def _transfer(self, amount, asset_id, destination, gasless=False):
+        if destination == REJECTED:
+            raise RuntimeError("Transfer rejected")
+        return transfer(self, amount, asset_id, destination, gasless)
+
+    monkeypatch.setattr(FakeWallet, "transfer", _transfer)
+
+    async def scenario():
+        from ai_agent.agents import transfer_batch
+
+        first, second = await create_agents(2)
+        result = await transfer_batch([
+            {"agent_id": first, "amount": "abc", "asset_id": "eth", "destination_address": DESTINATION},
+            {"agent_id": first, "amount": 1, "asset_id": "eth", "destination_address": REJECTED},
+            {"agent_id": first, "amount": 1, "asset_id": "eth", "destination_address": DESTINATION},
+            {"agent_id": "not-an-id", "amount": 1, "asset_id": "eth", "destination_address": DESTINATION},
+            {"agent_id": second, "amount": 5000, "asset_id": "eth", "destination_address": DESTINATION},
+            {"agent_id": second, "amount": 1, "destination_address": DESTINATION},
+            {"agent_id": second, "amount": 2, "asset_id": "eth", "destination_address": DESTINATION},
+        ])
+
+        statuses = [item["status"] for item in result["results"]]
+        assert statuses == ["failed", "failed", "succeeded", "failed", "failed", "failed", "succeeded"]
+        assert (result["succeeded"], result["failed"]) == (2, 5)
+        assert "Invalid amount" in result["results"][0]["error"]
+        assert "Transfer rejected" in result["results"][1]["error"]
+        assert "Insufficient balance" in result["results"][4]["error"]
+        assert result["results"][2]["tx_hash"] and result["results"][6]["tx_hash"]
+
+    asyncio.run(scenario())
+
+
+def test_unconfirmed_transfer_keeps_its_tx_hash(fakes, monkeypatch):
+    transfer = FakeWallet.transfer
+
+    def _transfer(self, amount, asset_id, destination, gasless=False):
+        operation = transfer(self, amount, asset_id, destination, gasless)
+        if amount == 2:
+            def _wait(*args, **kwargs):
+                raise TimeoutError("Not confirmed in time")
+            operation.wait = _wait
+        return operation
+
+    monkeypatch.setattr(FakeWallet, "transfer", _transfer)
+
+    async def scenario():
+        from ai_agent.agents import transfer_batch
+
+        [agent_id] = await create_agents(1)
+        result = await transfer_batch([
+            {"agent_id": agent_id, "amount": amount, "asset_id": "eth", "destination_address": DESTINATION}
+            for amount in (1, 2, 3)
+        ])
+        assert [item["status"] for item in result["results"]] == ["succeeded", "failed", "succeeded"]
+        assert result["results"][1]["tx_hash"]
+        assert "not confirmed" in result["results"][1]["error"]
+
+    asyncio.run(scenario())
+
+
+def test_transfers_of_one_wallet_confirm_together(fakes):
+    fakes.wallets.delays["confirmation_delay"] = 0.1
+
+    async def scenario():
+        from ai_agent.agents import transfer_batch
+
+        [agent_id] = await create_agents(1)
+        started = time.perf_counter()
+        result = await transfer_batch([
+            {"agent_id": agent_id, "amount": 1, "asset_id": "eth", "destination_address": DESTINATION}
+        ] * 5)
+        elapsed = time.perf_counter() - started
+        assert result["succeeded"] == 5
+        # One after another they would take 5 confirmations
+        assert elapsed < 0.3
+
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from tests.fakes import create_agents
+
+
+def test_failed_agent_insert_gives_the_wallet_back(fakes, monkeypatch):
+    async def scenario():
+        from ai_agent.agents import create_agent
+        from ai_agent.db import agent_collection
+        from ai_agent.wallet_pool import wallet_pool_collection
+
+        created = fakes.wallets.created
+
+        async def _insert_one(document):
+            raise RuntimeError("Insert failed")
+
+        monkeypatch.setattr(agent_collection, "insert_one", _insert_one)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await create_agent("Ada", "Be brief.")
+        monkeypatch.undo()
+
+        # The wallet created on demand by the first attempt joined the pool, and the
+        # second attempt claimed it and gave it back
+        assert fakes.wallets.created - created == 1
+        [wallet] = await wallet_pool_collection.find({}).to_list(length=None)
+        assert wallet["status"] == "available" and "agent_id" not in wallet
+        assert wallet["wallet_data"]["encrypted"]
+
+        # A saved agent takes its wallet out of the pool
+        await create_agents(1)
+        assert await wallet_pool_collection.count_documents({}) == 0
+
+    asyncio.run(scenario())
+
+
+def test_orphaned_claims_are_released(fakes):
+    async def scenario():
+        from bson import ObjectId
+        from ai_agent.wallet_pool import (WALLET_POOL_CLAIM_TIMEOUT, _now, _release_orphaned_claims,
+                                          wallet_pool_collection)
+
+        [agent_id] = await create_agents(1)
+        expired = _now() - timedelta(seconds=WALLET_POOL_CLAIM_TIMEOUT + 1)
+        await wallet_pool_collection.insert_many([
+            # The process stopped between the claim and the agent insert
+            {"_id": "orphan", "address": "0xA", "wallet_data": {}, "status": "claimed",
+             "agent_id": ObjectId(), "claimed_at": expired},
+            # The agent was saved but its pool entry was not removed
+            {"_id": "saved", "address": "0xB", "wallet_data": {}, "status": "claimed",
+             "agent_id": ObjectId(agent_id), "claimed_at": expired},
+            {"_id": "in-flight", "address": "0xC", "wallet_data": {}, "status": "claimed",
+             "agent_id": ObjectId(), "claimed_at": _now()},
+        ])
+        assert await _release_orphaned_claims() == 1
+        statuses = {wallet["_id"]: wallet["status"] for wallet in await wallet_pool_collection.find({}).to_list(length=None)}
+        assert statuses == {"orphan": "available", "in-flight": "claimed"}
+
+    asyncio.run(scenario())
+
+
+def test_only_the_lease_holder_fills_the_pool(fakes):
+    async def scenario():
+        from ai_agent.wallet_pool import _acquire_filler_lease, _now, lease_collection
+
+        await lease_collection.insert_one({"_id": "wallet_pool_filler", "owner": "other",
+                                           "lease_until": _now() + timedelta(seconds=30)})
+        assert not await _acquire_filler_lease()
+
+        await lease_collection.update_one({"_id": "wallet_pool_filler"},
+                                          {"$set": {"lease_until": _now() - timedelta(seconds=1)}})
+        assert await _acquire_filler_lease()
+        # The holder renews its own lease
+        assert await _acquire_filler_lease()
+
+    asyncio.run(scenario())